@@ -0,0 +1,71 @@
+# benchmarks/bench_concurrent_checkout.py
+"""Throughput de préstamo/devolución concurrente con candados repartidos vs. uno global.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_concurrent_checkout --threads 1 2 4 8
+
+Cada hilo trabaja con sus propios lectores y títulos, así que con candados
+repartidos no debería esperar a los demás. Con ``lock_stripes=1`` todos los
+préstamos pasan por el mismo candado, como con un candado global. En CPython
+con GIL el throughput total no escala con los hilos; lo que se compara es el
+costo extra de la contención.
+"""
+import argparse
+import threading
+import time
+
+from library_system import Author, Book, BookCopy, Library, Reader
+
+COPIES_PER_TITLE = 4
+
+
+def build(threads: int, stripes: int):
+    library = Library(concurrent=True, lock_stripes=stripes)
+    author = Author("Benchmark", "1950-01-01")
+    work = []
+    for t in range(threads):
+        book = Book(f"Title {t}", 2020, author)
+        copies = [BookCopy(f"T{t}-C{i}", book) for i in range(COPIES_PER_TITLE)]
+        for copy in copies:
+            library.add_copy(copy)
+        reader = Reader(f"Reader {t}", f"reader{t}@example.com")
+        library.register_reader(reader)
+        work.append((reader, copies))
+    return library, work
+
+
+def run(threads: int, stripes: int, operations: int) -> float:
+    library, work = build(threads, stripes)
+
+    def worker(reader, copies):
+        for i in range(operations):
+            copy = copies[i % len(copies)]
+            if not library.borrow_book(reader, copy):
+                library.return_book(reader, copy)
+
+    pool = [threading.Thread(target=worker, args=item) for item in work]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return threads * operations / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--operations", type=int, default=50000)
+    parser.add_argument("--stripes", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'striped ops/s':>14} {'global ops/s':>14}")
+    for threads in args.threads:
+        striped = run(threads, args.stripes, args.operations)
+        single = run(threads, 1, args.operations)
+        print(f"{threads:>7} {striped:>14,.0f} {single:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/bench_copy_memory.py
+"""Compara la memoria de Library con copias como objetos y con CompactCopyStore.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_copy_memory --sizes 1000000 10000000
+
+Cada medición se hace en un subproceso propio para que el pico de RSS de una
+configuración no contamine a la siguiente.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+from library_system import Author, Book, BookCopy, Library
+
+COPIES_PER_BOOK = 10
+BOOKS_PER_AUTHOR = 20
+
+
+def build_library(size: int, compact: bool) -> Library:
+    library = Library(compact=compact)
+    authors = {}
+    book = None
+    for i in range(size):
+        if i % COPIES_PER_BOOK == 0:
+            book_number = i // COPIES_PER_BOOK
+            author_number = book_number // BOOKS_PER_AUTHOR
+            author = authors.get(author_number)
+            if author is None:
+                author = authors[author_number] = Author(f"Author {author_number}", "1950-01-01")
+            book = Book(f"Title {book_number}", 1950 + book_number % 70, author)
+        library.add_copy(BookCopy(f"C{i:08d}", book))
+    return library
+
+
+def measure(layout: str, size: int) -> dict:
+    tracemalloc.start()
+    library = build_library(size, compact=(layout == "compact"))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(library.copies) == size
+    return {
+        "layout": layout,
+        "copies": size,
+        "traced_bytes": current,
+        "bytes_per_copy": round(current / size, 1),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--child", nargs=2, metavar=("LAYOUT", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child[0], int(args.child[1]))))
+        return
+
+    print(f"{'layout':<8} {'copies':>10} {'MiB':>10} {'B/copy':>8} {'max RSS MiB':>12}")
+    for size in args.sizes:
+        for layout in ("objects", "compact"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_copy_memory", "--child", layout, str(size)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output)
+            print(f"{layout:<8} {size:>10} {result['traced_bytes'] / 2**20:>10.1f} "
+                  f"{result['bytes_per_copy']:>8} {result['max_rss_kb'] / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
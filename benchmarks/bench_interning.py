@@ -0,0 +1,72 @@
+# benchmarks/bench_interning.py
+"""Memoria y tiempo de carga cuando cada copia trae sus propios Author y Book.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_interning --copies 1000000 --books 20000
+
+Simula un importador ingenuo que crea Author(...) y Book(...) por cada fila
+(muchos duplicados) y agrega las copias con add_copy. Mide la memoria
+retenida por la Library, la cantidad de objetos Book distintos que quedan
+vivos y el tiempo de las consultas por autor y por título.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from library_system import Author, Book, BookCopy, Library
+
+BOOKS_PER_AUTHOR = 20
+
+
+def build(copies: int, books: int, compact: bool) -> Library:
+    library = Library(compact=compact)
+    for i in range(copies):
+        number = i % books
+        author = Author(f"Author {number // BOOKS_PER_AUTHOR}", "1950-01-01")
+        book = Book(f"Title {number}", 1950 + number % 70, author)
+        library.add_copy(BookCopy(f"C{i:09d}", book))
+    return library
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=1_000_000)
+    parser.add_argument("--books", type=int, default=20000, help="libros distintos")
+    parser.add_argument("--objects", action="store_true", help="copias como objetos en vez de compactas")
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    library = build(args.copies, args.books, not args.objects)
+    build_seconds = time.perf_counter() - started
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    distinct = len({id(copy.get_book()) for copy in library.copies})
+
+    authors = [f"author {i % (args.books // BOOKS_PER_AUTHOR)}" for i in range(args.queries)]
+    started = time.perf_counter()
+    for name in authors:
+        library.get_all_books_by_author(name)
+    books_seconds = time.perf_counter() - started
+    titles = [(f"Title {i % args.books}", 1950 + i % args.books % 70) for i in range(args.queries)]
+    started = time.perf_counter()
+    for title, year in titles:
+        library.find_available_copy(title, year)
+    find_seconds = time.perf_counter() - started
+
+    print(f"copies: {args.copies}  distinct books: {args.books}  layout: "
+          f"{'objects' if args.objects else 'compact'}")
+    print(f"build s: {build_seconds:.2f}")
+    print(f"retained MiB: {retained / 2 ** 20:.1f} ({retained / args.copies:.1f} bytes/copy)")
+    print(f"Book objects referenced by copies: {distinct}")
+    print(f"get_all_books_by_author us: {books_seconds / args.queries * 1e6:.2f}")
+    print(f"find_available_copy us: {find_seconds / args.queries * 1e6:.2f}")
+
+
+if __name__ == "__main__":
+    main()
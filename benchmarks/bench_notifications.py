@@ -0,0 +1,57 @@
+# benchmarks/bench_notifications.py
+"""Mide cuánto bloquea notify_availability y el throughput/latencia de entrega.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_notifications --subscribers 10000 --send-latency 0.001
+"""
+import argparse
+import statistics
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from library_system import BioAlert
+from library_notifications import NotificationDispatcher, OutboxBackend
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--send-latency", type=float, default=0.001,
+                        help="segundos simulados por envío en el outbox falso")
+    args = parser.parse_args()
+
+    bio_alert = BioAlert.get_instance()
+    title = "Benchmark Bestseller"
+    for i in range(args.subscribers):
+        bio_alert.subscribe(title, f"reader{i}@example.com")
+
+    started = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        bio_alert.notify_availability(title)
+    direct = time.perf_counter() - started
+    print(f"direct (print):      notify blocked {direct * 1000:9.1f} ms")
+
+    backend = OutboxBackend(latency=args.send_latency)
+    dispatcher = NotificationDispatcher(backend, workers=args.workers)
+    bio_alert.set_dispatcher(dispatcher)
+    started = time.perf_counter()
+    bio_alert.notify_availability(title)
+    queued = time.perf_counter() - started
+    dispatcher.join()
+    total = time.perf_counter() - started
+    dispatcher.close()
+    bio_alert.set_dispatcher(None)
+
+    latencies = sorted(dispatcher.latencies)
+    print(f"dispatcher (outbox): notify blocked {queued * 1000:9.1f} ms, "
+          f"delivered {backend.delivered()} in {total:.2f} s "
+          f"({backend.delivered() / total:,.0f} msg/s, {dispatcher.stats['batches']} batches)")
+    print(f"latency p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
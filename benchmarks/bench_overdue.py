@@ -0,0 +1,58 @@
+# benchmarks/bench_overdue.py
+"""Costo de process_overdue con muchos préstamos abiertos.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_overdue --loans 1000000 3000000
+
+Los préstamos se reparten en 1000 días de vencimiento, así que cada llamada
+diaria a process_overdue solo encuentra ~0,1 % de préstamos vencidos.
+"""
+import argparse
+import time
+
+from library_system import Library, Reader
+
+SPREAD_DAYS = 1000
+
+
+def build(loans: int) -> Library:
+    library = Library(compact=True)
+    library.bulk_load(({"author": f"Author {i % 5000}", "birth_date": "1950-01-01",
+                        "title": f"Title {i // 10}", "year": "2000", "copy_id": f"C{i:09d}"}
+                       for i in range(loans)), chunk_size=50000)
+    reader = None
+    for position, copy in enumerate(library.copies):
+        if position % Reader.MAX_BORROWED_BOOKS == 0:
+            reader = Reader(f"Reader {position}", f"reader{position}@example.com")
+            library.register_reader(reader)
+        library.clock = lambda day=position % SPREAD_DAYS: day * Library.DAY_SECONDS
+        library.borrow_book(reader, copy)
+    return library
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loans", type=int, nargs="+", default=[1_000_000])
+    args = parser.parse_args()
+
+    first_due = Library.MAX_LOAN_DAYS * Library.DAY_SECONDS
+    print(f"{'loans':>10} {'idle call us':>13} {'daily call ms':>14} {'loans/call':>11} {'us/loan':>8}")
+    for loans in args.loans:
+        library = build(loans)
+        started = time.perf_counter()
+        for _ in range(1000):
+            library.process_overdue(first_due - 1)
+        idle = (time.perf_counter() - started) / 1000
+
+        total, touched, days = 0.0, 0, 10
+        for day in range(days):
+            started = time.perf_counter()
+            touched += len(library.process_overdue(first_due + day * Library.DAY_SECONDS))
+            total += time.perf_counter() - started
+        print(f"{loans:>10} {idle * 1e6:>13.1f} {total / days * 1000:>14.1f} "
+              f"{touched // days:>11} {total / max(touched, 1) * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
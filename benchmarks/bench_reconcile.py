@@ -0,0 +1,57 @@
+# benchmarks/bench_reconcile.py
+"""Tiempo de Library.reconcile sobre un inventario escaneado.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_reconcile --copies 1000000 --missing 0.01 --unknown 0.005
+
+Carga el catálogo de benchmarks.catalog con ``borrow_ratio`` de copias
+prestadas y arma un escaneo con todas las copias que deberían estar en el
+estante, menos ``--missing`` de ellas, más ``--found`` de las prestadas y
+``--unknown`` ids que no existen. Mide la conciliación con y sin
+correcciones.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.catalog import CatalogSpec, build_library
+from library_system import CopyStatus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=1_000_000)
+    parser.add_argument("--borrow-ratio", type=float, default=0.3)
+    parser.add_argument("--missing", type=float, default=0.01, help="fracción del estante sin escanear")
+    parser.add_argument("--found", type=float, default=0.01, help="fracción de prestadas escaneadas")
+    parser.add_argument("--unknown", type=float, default=0.005, help="ids desconocidos por copia")
+    parser.add_argument("--objects", action="store_true", help="copias como objetos en vez de compactas")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    library, _ = build_library(CatalogSpec(args.copies, seed=args.seed, borrow_ratio=args.borrow_ratio),
+                               compact=not args.objects)
+    build_seconds = time.perf_counter() - started
+    rng = random.Random(args.seed + 3)
+    scanned = []
+    for copy in library.copies:
+        if copy.is_available():
+            if rng.random() >= args.missing:
+                scanned.append(copy.get_id())
+        elif rng.random() < args.found:
+            scanned.append(copy.get_id())
+    scanned.extend(f"X{i:09d}" for i in range(int(args.copies * args.unknown)))
+    rng.shuffle(scanned)
+
+    print(f"copies: {args.copies}  scanned: {len(scanned)}  build s: {build_seconds:.2f}")
+    report = library.reconcile(scanned)
+    print(f"report only s: {report['seconds']:.2f}  missing: {len(report['missing'])}  "
+          f"on shelf while loaned: {len(report['on_shelf_while_loaned'])}  unknown: {len(report['unknown'])}")
+    report = library.reconcile(scanned, missing_status=CopyStatus.IN_REPAIR, found_status=CopyStatus.AVAILABLE)
+    print(f"with corrections s: {report['seconds']:.2f}  corrected: {report['corrected']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_search.py
+"""Latencia de Library.search sobre catálogos grandes.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_search --titles 100000 1000000
+
+Los títulos combinan palabras de un vocabulario sintético con frecuencias
+sesgadas (unas pocas palabras muy comunes y muchas raras), como en un
+catálogo real. Se mide la construcción del índice y consultas exactas, por
+prefijo, de varios términos y con errores de tipeo.
+"""
+import argparse
+import random
+import time
+
+from library_system import Author, Book, Library
+from library_search import SearchIndex
+
+LETTERS = "etaoinshrdlcumwfgypbvkjxqz"
+LETTER_WEIGHTS = [12.7, 9.1, 8.2, 7.5, 7.0, 6.7, 6.3, 6.1, 6.0, 4.3, 4.0, 2.8, 2.8, 2.4,
+                  2.4, 2.2, 2.0, 2.0, 1.9, 1.5, 1.0, 0.8, 0.2, 0.2, 0.1, 0.1]
+
+
+def vocabulary(size: int, rng: random.Random) -> list:
+    """Palabras al azar con frecuencias de letras del inglés, en orden de rango."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choices(LETTERS, LETTER_WEIGHTS, k=rng.randint(3, 11))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def build(titles: int, seed: int = 7) -> Library:
+    rng = random.Random(seed)
+    words = vocabulary(200000, rng)
+    cumulative, total = [], 0.0
+    for rank in range(len(words)):
+        total += 1 / (rank + 1)
+        cumulative.append(total)
+    authors = [Author(f"{rng.choice(words).title()} {rng.choice(words).title()}", "1950-01-01")
+               for _ in range(titles // 20 + 1)]
+    library = Library()
+    for i in range(titles):
+        title = " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(2, 5))).title()
+        library.add_book(Book(title, 1950 + i % 70, authors[i % len(authors)]))
+    return library
+
+
+def timed(library: Library, query: str, repeat: int = 20) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        library.search(query)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, nargs="+", default=[100_000])
+    args = parser.parse_args()
+
+    for titles in args.titles:
+        library = build(titles)
+        start = time.perf_counter()
+        library.enable_search()
+        indexed = time.perf_counter() - start
+        index: SearchIndex = library._search
+        book = library.books[titles // 2]
+        words = book.get_title().lower().split()
+        author = book.get_author().get_name().split()[0].lower()
+        common = max(index._postings, key=lambda token: len(index._postings[token]))
+        queries = {
+            "common word": common,
+            "exact word": words[-1],
+            "prefix": words[-1][:3],
+            "two terms": f"{words[0]} {words[-1]}",
+            "title + author": f"{words[-1]} {author}",
+            "typo": words[-1][:-1] + "x" if len(words[-1]) >= 4 else words[-1],
+            "typo author": author[1:],
+        }
+        print(f"{titles} titles: index built in {indexed:.1f} s, "
+              f"{len(index._vocabulary)} distinct words")
+        for name, query in queries.items():
+            print(f"  {name:<15} {query!r:<28} {timed(library, query):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_sharding.py
+"""Throughput de lectura de ShardedLibrary según la cantidad de shards.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_sharding --copies 1000000 --shards 1 2 4 8 \\
+        --partition author --query details
+
+Varios hilos cliente (``--clients`` por shard) hacen consultas sobre autores
+elegidos con el mismo sesgo que benchmarks.catalog durante ``--seconds``. Con
+``--partition author`` cada consulta va a un solo shard; con ``book`` se
+reparte a todos y se combinan los resultados. La caché por autor se desactiva
+para que cada consulta trabaje en el shard. La escala depende de que haya al
+menos tantos núcleos libres como shards.
+"""
+import argparse
+import os
+import threading
+import time
+
+from benchmarks.catalog import Catalog, CatalogSpec
+from library_sharding import ShardedLibrary
+
+QUERIES = {
+    "details": "list_copies_details",
+    "books": "get_all_books_by_author",
+    "count": "count_copies_by_author",
+}
+
+
+def measure(catalog: Catalog, shards: int, partition: str, query: str,
+            clients: int, seconds: float) -> dict:
+    with ShardedLibrary(shards=shards, partition=partition, cache_size=0) as library:
+        started = time.perf_counter()
+        library.bulk_load(catalog.rows(), chunk_size=100000)
+        load_seconds = time.perf_counter() - started
+        call = getattr(library, QUERIES[query])
+        # Argumentos preparados de antemano, una lista por cliente.
+        authors = [[catalog.random_author() for _ in range(2000)] for _ in range(clients)]
+        done = [0] * clients
+        stop = threading.Event()
+
+        def client(index: int) -> None:
+            names = authors[index]
+            calls = 0
+            while not stop.is_set():
+                call(names[calls % len(names)])
+                calls += 1
+            done[index] = calls
+
+        threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    return {"shards": shards, "load_seconds": load_seconds, "queries_per_s": sum(done) / elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=200000)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--partition", choices=ShardedLibrary.PARTITIONS, default="author")
+    parser.add_argument("--query", choices=sorted(QUERIES), default="details")
+    parser.add_argument("--clients", type=int, default=2, help="hilos cliente por shard")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    catalog = Catalog(CatalogSpec(args.copies, seed=args.seed))
+    print(f"cpus: {os.cpu_count()}  partition: {args.partition}  query: {args.query}")
+    print(f"{'shards':>6} {'load s':>8} {'queries/s':>11} {'speedup':>8}")
+    baseline = None
+    for shards in args.shards:
+        result = measure(catalog, shards, args.partition, args.query,
+                         args.clients * shards, args.seconds)
+        baseline = baseline or result["queries_per_s"]
+        print(f"{shards:>6} {result['load_seconds']:>8.2f} {result['queries_per_s']:>11.0f} "
+              f"{result['queries_per_s'] / baseline:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
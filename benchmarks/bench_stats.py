@@ -0,0 +1,60 @@
+# benchmarks/bench_stats.py
+"""Tiempo de Library.stats() sobre catálogos grandes.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_stats --copies 1000000 10000000 [--no-numpy]
+
+Mide el primer reporte (arma las columnas de todo el catálogo) y un reporte
+posterior después de cambiar el estado de 1 % de las copias y agregar otro
+1 % de copias nuevas.
+"""
+import argparse
+import random
+import time
+
+import library_stats
+from library_system import CopyStatus, Library
+
+STATUSES = ["", "borrowed", "delayed", "in_repair"]
+
+
+def rows(start: int, count: int, rng: random.Random):
+    for i in range(start, start + count):
+        book = int(rng.paretovariate(0.4)) % 200000
+        yield {"author": f"Author {book % 20000}", "birth_date": "1950-01-01",
+               "title": f"Title {book}", "year": str(1950 + book % 70),
+               "copy_id": f"C{i:09d}", "status": rng.choice(STATUSES)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--no-numpy", action="store_true", help="usa solo la biblioteca estándar")
+    args = parser.parse_args()
+    if args.no_numpy:
+        library_stats.np = None
+    print(f"numpy: {'no' if library_stats.np is None else library_stats.np.__version__}")
+
+    print(f"{'copies':>10} {'books':>8} {'first report s':>15} {'after changes s':>16}")
+    for copies in args.copies:
+        rng = random.Random(11)
+        library = Library(compact=True)
+        library.bulk_load(rows(0, copies, rng), chunk_size=100000)
+        start = time.perf_counter()
+        report = library.stats()
+        first = time.perf_counter() - start
+
+        changes = copies // 100
+        statuses = list(CopyStatus)
+        for position in rng.sample(range(copies), changes):
+            library.copies[position].set_status(rng.choice(statuses))
+        library.bulk_load(rows(copies, changes, rng), chunk_size=100000)
+        start = time.perf_counter()
+        report = library.stats()
+        incremental = time.perf_counter() - start
+        print(f"{report['copies']:>10} {report['books']:>8} {first:>15.3f} {incremental:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# benchmarks/bench_storage.py
+"""Library en memoria contra Library guardada en SQLite, según el tamaño del catálogo.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_storage --sizes 100000 1000000 10000000 \\
+        --memory-limit 512 --directory /tmp/library-bench
+
+Cada combinación de backend y tamaño corre en un subproceso propio. Con
+``--memory-limit`` (MiB) el subproceso no puede pasar de esa memoria
+virtual, así que un catálogo más grande que el límite solo se puede abrir
+con el backend SQLite: la corrida en memoria se informa como ``out of
+memory``. Las bases quedan en ``--directory`` y se reutilizan si ya tienen
+el tamaño pedido (``--rebuild`` las vuelve a cargar). La caché por autor se
+desactiva para medir las consultas contra el almacén.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_suite import timed
+from benchmarks.catalog import Catalog, CatalogSpec
+from library_system import Library, Reader
+
+BACKENDS = ("memory", "sqlite")
+
+
+def open_library(backend: str, spec: CatalogSpec, directory: str, object_cache_size: int,
+                 rebuild: bool) -> Library:
+    catalog = Catalog(spec)
+    if backend == "memory":
+        library = Library(compact=True, cache_size=0)
+        library.bulk_load(catalog.rows(), chunk_size=100000)
+        return library
+    path = os.path.join(directory, f"library-{spec.copies}-{spec.seed}.db")
+    if rebuild:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    library = Library.open_database(path, cache_size=0, object_cache_size=object_cache_size)
+    if len(library.copies) != spec.copies:
+        if len(library.copies):
+            raise ValueError(f"{path} has {len(library.copies)} copies, use --rebuild")
+        library.bulk_load(catalog.rows(), chunk_size=100000)
+    return library
+
+
+def measure(backend: str, spec: CatalogSpec, samples: int, directory: str,
+            object_cache_size: int, rebuild: bool) -> dict:
+    started = time.perf_counter()
+    library = open_library(backend, spec, directory, object_cache_size, rebuild)
+    open_seconds = time.perf_counter() - started
+    catalog = Catalog(spec)
+    rng = random.Random(spec.seed + 2)
+
+    authors = [(catalog.random_author(),) for _ in range(samples)]
+    titles = [catalog.random_title() for _ in range(samples)]
+    results = {
+        "count_copies_by_author": timed(library.count_copies_by_author, authors),
+        "find_available_copy": timed(library.find_available_copy, titles),
+        "get_all_books_by_author": timed(library.get_all_books_by_author, authors),
+        "page_copies_by_author": timed(library.page_copies_by_author, authors),
+        "copy_by_position": timed(library.copies.__getitem__,
+                                  [(rng.randrange(spec.copies),) for _ in range(samples)]),
+    }
+
+    loans = []
+    for title in titles:
+        copy = library.find_available_copy(*title)
+        if copy is None:
+            continue
+        if len(loans) % Reader.MAX_BORROWED_BOOKS == 0:
+            reader = Reader(f"Bench {len(loans)}", f"bench{len(loans)}-{time.time_ns()}@example.com")
+            library.register_reader(reader)
+        library.borrow_book(reader, copy)
+        loans.append((reader, copy))
+    for reader, copy in loans:
+        library.return_book(reader, copy)
+    results["borrow_book"] = timed(library.borrow_book, loans)
+    results["return_book"] = timed(library.return_book, loans)
+
+    result = {
+        "backend": backend,
+        "copies": spec.copies,
+        "open_seconds": round(open_seconds, 3),
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "file_mib": 0.0,
+        "operations": results,
+    }
+    if backend == "sqlite":
+        library.close()
+        path = os.path.join(directory, f"library-{spec.copies}-{spec.seed}.db")
+        result["file_mib"] = round(os.path.getsize(path) / 2 ** 20, 1)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--samples", type=int, default=2000, help="llamadas por operación")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--memory-limit", type=int, help="MiB de memoria virtual por subproceso")
+    parser.add_argument("--object-cache-size", type=int, default=100000)
+    parser.add_argument("--directory", default=".", help="dónde guardar las bases SQLite")
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        if args.memory_limit:
+            limit = args.memory_limit * 2 ** 20
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        backend, size = args.child[0], int(args.child[1])
+        try:
+            result = measure(backend, CatalogSpec(size, seed=args.seed), args.samples, args.directory,
+                             args.object_cache_size, args.rebuild)
+        except MemoryError:
+            result = {"backend": backend, "copies": size, "error": "out of memory"}
+        print(json.dumps(result))
+        return
+
+    os.makedirs(args.directory, exist_ok=True)
+    options = ["--samples", str(args.samples), "--seed", str(args.seed), "--directory", args.directory,
+               "--object-cache-size", str(args.object_cache_size)]
+    if args.memory_limit:
+        options += ["--memory-limit", str(args.memory_limit)]
+    if args.rebuild:
+        options.append("--rebuild")
+    print(f"{'copies':>10} {'backend':<7} {'operation':<24} {'p50 us':>9} {'p99 us':>9} "
+          f"{'open s':>8} {'RSS MiB':>8} {'file MiB':>9}")
+    for size in args.sizes:
+        for backend in args.backends:
+            output = subprocess.run([sys.executable, "-m", "benchmarks.bench_storage",
+                                     "--child", backend, str(size)] + options,
+                                    check=True, capture_output=True, text=True).stdout
+            result = json.loads(output)
+            if "error" in result:
+                print(f"{size:>10} {backend:<7} {result['error']}")
+                continue
+            for name, stats in result["operations"].items():
+                print(f"{size:>10} {backend:<7} {name:<24} {stats['p50_us']:>9.2f} {stats['p99_us']:>9.2f} "
+                      f"{result['open_seconds']:>8.2f} {result['peak_rss_mib']:>8.1f} {result['file_mib']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# benchmarks/bench_suite.py
+"""Latencia, throughput y memoria de las operaciones de Library según el tamaño.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.bench_suite --sizes 1000 10000 100000 1000000 10000000 \\
+        --output results.json
+    python -m benchmarks.bench_suite --sizes 1000 10000 --compare results.json
+
+Cada tamaño corre en un subproceso propio (el pico de RSS es el de ese
+catálogo). Los resultados se escriben en JSON; con ``--compare`` se listan las
+operaciones cuya mediana o throughput empeoró más que ``--threshold``
+respecto de un archivo anterior.
+"""
+import argparse
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Sequence
+
+from benchmarks.catalog import CatalogSpec, build_library
+from library_system import BioAlert, Reader
+
+def summarize(latencies_ns: List[int], elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies_ns)
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] / 1000
+
+    return {
+        "ops": len(ordered),
+        "throughput_per_s": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_us": round(percentile(50), 2),
+        "p90_us": round(percentile(90), 2),
+        "p99_us": round(percentile(99), 2),
+        "max_us": round(ordered[-1] / 1000, 2),
+    }
+
+
+def timed(call: Callable, arguments: Sequence[tuple]) -> Dict[str, float]:
+    """Llama a ``call`` con cada tupla de argumentos, ya preparadas de antemano."""
+    clock = time.perf_counter_ns
+    latencies = []
+    started = time.perf_counter()
+    for args in arguments:
+        before = clock()
+        call(*args)
+        latencies.append(clock() - before)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def measure(spec: CatalogSpec, samples: int, compact: bool, cache_size: int) -> dict:
+    started = time.perf_counter()
+    library, catalog = build_library(spec, compact=compact, cache_size=cache_size)
+    build_seconds = time.perf_counter() - started
+    rng = random.Random(spec.seed + 2)
+
+    authors = [(catalog.random_author(),) for _ in range(samples)]
+    titles = [catalog.random_title() for _ in range(samples)]
+    results = {
+        "count_copies_by_author": timed(library.count_copies_by_author, authors),
+        "find_available_copy": timed(library.find_available_copy, titles),
+        "get_all_books_by_author": timed(library.get_all_books_by_author, authors),
+    }
+
+    # Préstamos de copias distintas a lectores nuevos: se toman primero para
+    # que find_available_copy no repita copias y se devuelven antes de medir.
+    loans = []
+    for title in titles:
+        copy = library.find_available_copy(*title)
+        if copy is None:
+            continue
+        if len(loans) % Reader.MAX_BORROWED_BOOKS == 0:
+            reader = Reader(f"Bench {len(loans)}", f"bench{len(loans)}@example.com")
+            library.register_reader(reader)
+        library.borrow_book(reader, copy)
+        loans.append((reader, copy))
+    for reader, copy in loans:
+        library.return_book(reader, copy)
+    results["borrow_book"] = timed(library.borrow_book, loans)
+    results["return_book"] = timed(library.return_book, loans)
+    emails = [(rng.choice(library.readers).get_email(),) for _ in range(samples)]
+    results["get_reader"] = timed(library.get_reader, emails)
+
+    subscriptions = [(catalog.random_title()[0], f"user{rng.randrange(spec.copies)}@example.com")
+                     for _ in range(samples)]
+    results["bio_alert_subscribe"] = timed(BioAlert.get_instance().subscribe, subscriptions)
+
+    return {
+        "copies": spec.copies,
+        "spec": spec.as_dict(),
+        "build_seconds": round(build_seconds, 3),
+        "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "operations": results,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Operaciones que empeoraron respecto de ``baseline``."""
+    previous = {(run["copies"], name): stats for run in baseline["results"]
+                for name, stats in run["operations"].items()}
+    regressions = []
+    for run in current["results"]:
+        for name, stats in run["operations"].items():
+            old = previous.get((run["copies"], name))
+            if old is None:
+                continue
+            slower = stats["p50_us"] / old["p50_us"] if old["p50_us"] else 1.0
+            fewer = old["throughput_per_s"] / stats["throughput_per_s"] if stats["throughput_per_s"] else 1.0
+            if max(slower, fewer) > threshold:
+                regressions.append(f"{name} @ {run['copies']}: p50 x{slower:.2f}, "
+                                   f"throughput x{1 / fewer:.2f}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--samples", type=int, default=2000, help="llamadas por operación")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skew", type=float, default=1.1, help="exponente de Zipf")
+    parser.add_argument("--borrow-ratio", type=float, default=0.3)
+    parser.add_argument("--objects", action="store_true", help="copias como objetos en vez de compactas")
+    parser.add_argument("--cache-size", type=int, default=1024, help="0 desactiva la caché por autor")
+    parser.add_argument("--output", help="archivo JSON de resultados")
+    parser.add_argument("--compare", help="JSON de una corrida anterior")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        spec = CatalogSpec(args.child, seed=args.seed, skew=args.skew, borrow_ratio=args.borrow_ratio)
+        print(json.dumps(measure(spec, args.samples, not args.objects, args.cache_size)))
+        return
+
+    options = ["--samples", str(args.samples), "--seed", str(args.seed), "--skew", str(args.skew),
+               "--borrow-ratio", str(args.borrow_ratio), "--cache-size", str(args.cache_size)]
+    if args.objects:
+        options.append("--objects")
+    report = {
+        "meta": {"revision": git_revision(), "python": platform.python_version(),
+                 "platform": platform.platform(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "options": options},
+        "results": [],
+    }
+    print(f"{'copies':>10} {'operation':<24} {'p50 us':>9} {'p99 us':>9} {'ops/s':>11} {'RSS MiB':>8}")
+    for size in args.sizes:
+        output = subprocess.run([sys.executable, "-m", "benchmarks.bench_suite", "--child", str(size)]
+                                + options, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output)
+        report["results"].append(result)
+        for name, stats in result["operations"].items():
+            print(f"{size:>10} {name:<24} {stats['p50_us']:>9.2f} {stats['p99_us']:>9.2f} "
+                  f"{stats['throughput_per_s']:>11.0f} {result['peak_rss_mib']:>8.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            regressions = compare(report, json.load(handle), args.threshold)
+        print("\n".join(["Regressions:"] + regressions) if regressions else "No regressions")
+
+
+if __name__ == "__main__":
+    main()
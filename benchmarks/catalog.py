@@ -0,0 +1,93 @@
+# benchmarks/catalog.py
+"""Generador determinista de catálogos sintéticos para los benchmarks.
+
+Los autores y los títulos siguen distribuciones de Zipf (pocos autores con
+muchos libros y pocos títulos con muchas copias), y una fracción de las
+copias queda prestada a lectores reales. La misma semilla produce siempre
+el mismo catálogo.
+"""
+import random
+from bisect import bisect
+from itertools import accumulate
+from typing import Dict, Iterator, List, Tuple
+
+from library_system import Library, Reader
+
+
+class CatalogSpec:
+    """Parámetros del catálogo; los valores por defecto escalan con ``copies``."""
+
+    def __init__(self, copies: int, seed: int = 42, skew: float = 1.1,
+                 borrow_ratio: float = 0.3, copies_per_title: int = 8, titles_per_author: int = 12):
+        self.copies = copies
+        self.seed = seed
+        self.skew = skew
+        self.borrow_ratio = borrow_ratio
+        self.titles = max(1, copies // copies_per_title)
+        self.authors = max(1, self.titles // titles_per_author)
+
+    def as_dict(self) -> Dict[str, object]:
+        return dict(vars(self))
+
+
+class ZipfSampler:
+    """Muestrea rangos 0..n-1 con probabilidad proporcional a 1 / (rango + 1) ** skew."""
+
+    def __init__(self, size: int, skew: float, rng: random.Random):
+        self._cumulative = list(accumulate(1 / (rank + 1) ** skew for rank in range(size)))
+        self._total = self._cumulative[-1]
+        self._rng = rng
+
+    def sample(self) -> int:
+        return bisect(self._cumulative, self._rng.random() * self._total)
+
+
+def author_name(author: int) -> str:
+    return f"Author {author:07d}"
+
+
+def title_of(title: int) -> Tuple[str, int]:
+    return f"Title {title:08d}", 1950 + title % 70
+
+
+class Catalog:
+    """Filas del catálogo y muestreadores para elegir argumentos de consultas."""
+
+    def __init__(self, spec: CatalogSpec):
+        self.spec = spec
+        rng = random.Random(spec.seed)
+        author_sampler = ZipfSampler(spec.authors, spec.skew, rng)
+        self.title_authors: List[int] = [author_sampler.sample() for _ in range(spec.titles)]
+        self._title_sampler = ZipfSampler(spec.titles, spec.skew, rng)
+        self._author_sampler = author_sampler
+        self._rng = rng
+
+    def rows(self) -> Iterator[Dict[str, str]]:
+        for copy in range(self.spec.copies):
+            title = self._title_sampler.sample()
+            name, year = title_of(title)
+            yield {"author": author_name(self.title_authors[title]), "birth_date": "1950-01-01",
+                   "title": name, "year": str(year), "copy_id": f"C{copy:09d}", "status": ""}
+
+    def random_author(self) -> str:
+        """Un autor elegido como lo haría un usuario: los populares más seguido."""
+        return author_name(self._author_sampler.sample())
+
+    def random_title(self) -> Tuple[str, int]:
+        return title_of(self._title_sampler.sample())
+
+
+def build_library(spec: CatalogSpec, compact: bool = True, **options) -> Tuple[Library, Catalog]:
+    """Carga el catálogo y presta ``borrow_ratio`` de las copias a lectores nuevos."""
+    catalog = Catalog(spec)
+    library = Library(compact=compact, **options)
+    library.bulk_load(catalog.rows(), chunk_size=100000)
+    rng = random.Random(spec.seed + 1)
+    borrowed = int(spec.copies * spec.borrow_ratio)
+    reader = None
+    for count, position in enumerate(sorted(rng.sample(range(spec.copies), borrowed))):
+        if count % Reader.MAX_BORROWED_BOOKS == 0:
+            reader = Reader(f"Reader {count}", f"reader{count}@example.com")
+            library.register_reader(reader)
+        library.borrow_book(reader, library.copies[position])
+    return library, catalog
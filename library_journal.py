@@ -0,0 +1,200 @@
+# library_journal.py
+"""Journal de solo anexado para los cambios de circulación de una Library.
+
+Cada evento es un registro binario: longitud (u32), CRC32 (u32) y los campos
+en UTF-8 separados por ``\\x1f``. Los eventos guardan valores absolutos
+(estado final de la copia, días de multa resultantes), así que volver a
+aplicarlos no cambia el resultado.
+
+Recuperación típica al iniciar::
+
+    library = Library.open_snapshot(checkpoint_path)   # o la carga habitual
+    journal = Journal(journal_path)
+    journal.replay(library)
+    library.attach_journal(journal)
+
+y de vez en cuando ``journal.compact(library, checkpoint_path)``.
+"""
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from library_system import BookCopy, CopyStatus, Library, Reader, ReaderEvent
+
+_RECORD = struct.Struct("<II")
+_SEPARATOR = "\x1f"
+
+REGISTER = "N"
+BORROW = "B"
+RETURN = "R"
+PENALTY = "P"
+STATUS = "S"
+CHARGE = "C"
+
+_READER_EVENTS = {
+    ReaderEvent.BORROW: BORROW,
+    ReaderEvent.RETURN: RETURN,
+    ReaderEvent.PENALTY: PENALTY,
+}
+
+
+class Journal:
+    """Journal con group commit: agrupa los fsync por cantidad de eventos o por tiempo.
+
+    Un lote pendiente se confirma al llegar a ``max_batch`` eventos, a los
+    ``max_delay`` segundos de su primer evento, o al llamar a commit()/close().
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], max_batch: int = 256,
+                 max_delay: float = 0.05, fsync: bool = True):
+        self.path = path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._timer: Optional[threading.Timer] = None
+        self._truncate_torn_tail()
+        self._file = open(path, "ab")
+
+    def _truncate_torn_tail(self) -> None:
+        """Descarta un último registro incompleto que haya dejado una caída."""
+        if not os.path.exists(self.path):
+            return
+        valid = 0
+        for end, _ in self._iter_records():
+            valid = end
+        if valid != os.path.getsize(self.path):
+            with open(self.path, "r+b") as handle:
+                handle.truncate(valid)
+
+    def _iter_records(self) -> Iterator[Tuple[int, List[str]]]:
+        offset = 0
+        with open(self.path, "rb") as handle:
+            while True:
+                header = handle.read(_RECORD.size)
+                if len(header) < _RECORD.size:
+                    return
+                length, checksum = _RECORD.unpack(header)
+                payload = handle.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    return
+                offset += _RECORD.size + length
+                yield offset, payload.decode("utf-8").split(_SEPARATOR)
+
+    def append(self, kind: str, *fields: str) -> None:
+        payload = _SEPARATOR.join((kind,) + fields).encode("utf-8")
+        with self._lock:
+            self._file.write(_RECORD.pack(len(payload), zlib.crc32(payload)) + payload)
+            self._pending += 1
+            if self._pending >= self.max_batch:
+                self._commit_locked()
+            elif self._timer is None and self.max_delay > 0:
+                self._timer = threading.Timer(self.max_delay, self.commit)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def record_registration(self, reader: Reader) -> None:
+        self.append(REGISTER, reader.get_email(), reader.get_name())
+
+    def record_reader_event(self, reader: Reader, event: ReaderEvent, value: object,
+                            due: Optional[float] = None) -> None:
+        if event == ReaderEvent.PENALTY:
+            self.append(PENALTY, reader.get_email(), str(value))
+        elif due is not None:
+            self.append(_READER_EVENTS[event], reader.get_email(), value.get_id(), repr(due))
+        else:
+            self.append(_READER_EVENTS[event], reader.get_email(), value.get_id())
+
+    def record_charge(self, copy: BookCopy, charged_days: int) -> None:
+        self.append(CHARGE, copy.get_id(), str(charged_days))
+
+    def record_status(self, copy: BookCopy) -> None:
+        self.append(STATUS, copy.get_id(), copy.get_status().value)
+
+    def commit(self) -> None:
+        """Escribe y sincroniza con disco el lote pendiente."""
+        with self._lock:
+            self._commit_locked()
+
+    def _commit_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending == 0 or self._file.closed:
+            return
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit_locked()
+            self._file.close()
+
+    def replay(self, library: Library) -> int:
+        """Aplica sobre la biblioteca los eventos confirmados y devuelve cuántos hubo."""
+        copies: Dict[str, BookCopy] = {copy.get_id(): copy for copy in library.copies}
+        journal = library._journal
+        library.attach_journal(None)
+        count = 0
+        try:
+            for _, (kind, *fields) in self._iter_records():
+                if kind == REGISTER:
+                    email, name = fields
+                    if library.get_reader(email) is None:
+                        library.register_reader(Reader(name, email))
+                elif kind == PENALTY:
+                    self._reader(library, fields[0]).penalty_days = int(fields[1])
+                elif kind == STATUS:
+                    self._copy(copies, fields[0]).set_status(CopyStatus(fields[1]))
+                elif kind == CHARGE:
+                    library._set_charged_days(self._copy(copies, fields[0]), int(fields[1]))
+                else:
+                    reader = self._reader(library, fields[0])
+                    copy = self._copy(copies, fields[1])
+                    # El estado de la copia llega en su propio evento STATUS.
+                    if kind == BORROW:
+                        reader.borrowed_books[copy] = None
+                        if len(fields) > 2:
+                            library._start_loan(reader, copy, float(fields[2]))
+                    else:
+                        reader.borrowed_books.pop(copy, None)
+                        library._loans.pop(copy, None)
+                count += 1
+        finally:
+            library.attach_journal(journal)
+        # Las reservas no van al journal: las copias que quedaron RESERVED
+        # sin lector que las retire vuelven a estar disponibles.
+        library._release_orphaned_reservations()
+        return count
+
+    @staticmethod
+    def _reader(library: Library, email: str) -> Reader:
+        reader = library.get_reader(email)
+        if reader is None:
+            raise ValueError(f"Journal references unknown reader {email}")
+        return reader
+
+    @staticmethod
+    def _copy(copies: Dict[str, BookCopy], copy_id: str) -> BookCopy:
+        if copy_id not in copies:
+            raise ValueError(f"Journal references unknown copy {copy_id}")
+        return copies[copy_id]
+
+    def compact(self, library: Library, checkpoint_path: Union[str, os.PathLike]) -> None:
+        """Guarda un checkpoint de la biblioteca y vacía el journal.
+
+        Si el proceso cae entre ambos pasos, repetir el journal sobre el nuevo
+        checkpoint deja el mismo estado.
+        """
+        with self._lock:
+            self._commit_locked()
+            library.save_snapshot(checkpoint_path)
+            self._file.truncate(0)
+            self._file.seek(0)
+            if self.fsync:
+                os.fsync(self._file.fileno())
@@ -0,0 +1,343 @@
+# library_metrics.py
+"""Instrumentación opcional de Library y BioAlert.
+
+instrument() reemplaza, solo en la instancia indicada, cada método público
+por un envoltorio que mide la llamada y avisa a los collectors. Mientras no
+se instrumenta nada no hay ningún costo: los métodos son los de siempre.
+
+    collector = InMemoryCollector()
+    instrument(library, collector)
+    instrument(library.bio_alert, collector)
+    ...
+    collector.snapshot()["calls"]["Library.borrow_book"]
+
+profile() captura la traza de las llamadas hechas por el hilo actual dentro
+del bloque, útil para ver en qué se fue el tiempo de un pedido::
+
+    with profile(library) as trace:
+        handle_request(library)
+    for entry in trace:
+        print(entry)
+"""
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from library_system import BatchResult, Reader
+
+# Límites superiores (en segundos) de los buckets del histograma de latencia.
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                   1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 0.1, 1.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Collector:
+    """Interfaz de los destinos de métricas."""
+
+    def record_call(self, method: str, seconds: float, size: Optional[int]) -> None:
+        """Una llamada a ``method`` que tardó ``seconds`` y devolvió ``size`` elementos."""
+
+    def increment(self, event: str, amount: int = 1, **labels: str) -> None:
+        """Suma ``amount`` al contador ``event`` con esas etiquetas."""
+
+
+class _MethodStats:
+    __slots__ = ("calls", "seconds", "buckets", "size_total", "size_max", "sized_calls")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.size_total = 0
+        self.size_max = 0
+        self.sized_calls = 0
+
+
+class InMemoryCollector(Collector):
+    """Acumula cantidad de llamadas, histograma de latencia y tamaño de resultados."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._methods: Dict[str, _MethodStats] = {}
+        self._events: Dict[Tuple[str, Labels], int] = {}
+
+    def record_call(self, method: str, seconds: float, size: Optional[int]) -> None:
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = _MethodStats()
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            if size is not None:
+                stats.sized_calls += 1
+                stats.size_total += size
+                stats.size_max = max(stats.size_max, size)
+
+    def increment(self, event: str, amount: int = 1, **labels: str) -> None:
+        key = (event, tuple(sorted(labels.items())))
+        with self._lock:
+            self._events[key] = self._events.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Copia de las métricas acumuladas."""
+        with self._lock:
+            calls = {method: {"calls": stats.calls,
+                              "seconds": stats.seconds,
+                              "mean_seconds": stats.seconds / stats.calls,
+                              "latency_buckets": dict(zip(LATENCY_BUCKETS + (float("inf"),),
+                                                          stats.buckets)),
+                              "mean_size": (stats.size_total / stats.sized_calls
+                                            if stats.sized_calls else None),
+                              "max_size": stats.size_max if stats.sized_calls else None}
+                     for method, stats in self._methods.items()}
+            events = {event + "".join(f"[{name}={value}]" for name, value in labels): count
+                      for (event, labels), count in self._events.items()}
+        return {"calls": calls, "events": events}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._methods.clear()
+            self._events.clear()
+
+
+def _label_text(labels: Labels) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels)
+
+
+class PrometheusFileCollector(InMemoryCollector):
+    """InMemoryCollector que exporta en formato de texto de Prometheus.
+
+    write() reemplaza el archivo de forma atómica, así que puede leerlo el
+    textfile collector de node_exporter mientras se escribe.
+    """
+
+    def __init__(self, path: str, prefix: str = "library"):
+        super().__init__()
+        self.path = path
+        self.prefix = prefix
+
+    def render(self) -> str:
+        prefix = self.prefix
+        lines = [f"# TYPE {prefix}_call_seconds histogram",
+                 f"# TYPE {prefix}_result_items_total counter"]
+        with self._lock:
+            methods = sorted(self._methods.items())
+            events = sorted(self._events.items())
+            for method, stats in methods:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), stats.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{prefix}_call_seconds_bucket{{method="{method}",le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_call_seconds_sum{{method="{method}"}} {stats.seconds!r}')
+                lines.append(f'{prefix}_call_seconds_count{{method="{method}"}} {stats.calls}')
+                lines.append(f'{prefix}_result_items_total{{method="{method}"}} {stats.size_total}')
+        for (event, labels), count in events:
+            lines.append(f"{prefix}_{event}_total{{{_label_text(labels)}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            handle.write(self.render())
+        os.replace(temporary, self.path)
+
+
+class CallbackCollector(Collector):
+    """Pasa cada llamada y cada evento a funciones del usuario."""
+
+    def __init__(self, on_call: Callable[[str, float, Optional[int]], None],
+                 on_event: Optional[Callable[[str, int, Dict[str, str]], None]] = None):
+        self._on_call = on_call
+        self._on_event = on_event
+
+    def record_call(self, method: str, seconds: float, size: Optional[int]) -> None:
+        self._on_call(method, seconds, size)
+
+    def increment(self, event: str, amount: int = 1, **labels: str) -> None:
+        if self._on_event is not None:
+            self._on_event(event, amount, labels)
+
+
+class TraceEntry:
+    """Una llamada dentro de profile(): profundidad, inicio relativo y duración."""
+
+    __slots__ = ("method", "depth", "start", "seconds", "size")
+
+    def __init__(self, method: str, depth: int, start: float, seconds: float, size: Optional[int]):
+        self.method = method
+        self.depth = depth
+        self.start = start
+        self.seconds = seconds
+        self.size = size
+
+    def __repr__(self) -> str:
+        size = "" if self.size is None else f" -> {self.size}"
+        return f"{'  ' * self.depth}{self.method} {self.seconds * 1e6:.1f} us{size}"
+
+
+class _Instrumentation:
+    """Estado de una instancia instrumentada."""
+
+    def __init__(self, originals: Dict[str, Callable]):
+        self.originals = originals
+        self.collectors: List[Collector] = []
+        self.profiling = 0
+
+
+class _ThreadState(threading.local):
+    """Profundidad de llamadas y traza activa de cada hilo."""
+
+    depth = 0
+    trace: Optional[List[TraceEntry]] = None
+    trace_origin = 0.0
+
+
+_local = _ThreadState()
+_registry_lock = threading.Lock()
+
+
+def _borrow_rejection(args: tuple, result: object) -> Optional[str]:
+    """Motivo por el que Library.borrow_book rechazó el préstamo, si lo rechazó."""
+    if result is not False:
+        return None
+    reader: Reader = args[0]
+    if reader.get_penalty_days() > 0:
+        return "penalty"
+    if reader.borrowed_count() >= reader.MAX_BORROWED_BOOKS:
+        return "limit_reached"
+    return "unavailable"
+
+
+def _batch_rejection(args: tuple, result: object) -> Optional[str]:
+    outcome = result[0][1] if result else None
+    if outcome == BatchResult.PENALTY:
+        return "penalty"
+    if outcome == BatchResult.LIMIT_REACHED:
+        return "limit_reached"
+    return None
+
+
+_REJECTIONS: Dict[str, Callable[[tuple, object], Optional[str]]] = {
+    "borrow_book": _borrow_rejection,
+    "borrow_many": _batch_rejection,
+}
+_SIZED = (list, tuple, dict, set)
+
+
+def _wrap(owner: str, name: str, method: Callable, state: _Instrumentation) -> Callable:
+    qualified = f"{owner}.{name}"
+    clock = time.perf_counter
+    rejection = _REJECTIONS.get(name)
+    local = _local
+
+    def wrapper(*args, **kwargs):
+        if state.profiling:
+            return traced(*args, **kwargs)
+        started = clock()
+        try:
+            result = method(*args, **kwargs)
+        except BaseException:
+            for collector in state.collectors:
+                collector.increment("call_errors", method=qualified)
+            raise
+        record(clock() - started, args, result)
+        return result
+
+    def traced(*args, **kwargs):
+        # Solo mientras hay un profile() activo se lleva la profundidad por hilo.
+        depth = local.depth
+        local.depth = depth + 1
+        started = clock()
+        try:
+            result = method(*args, **kwargs)
+        except BaseException:
+            for collector in state.collectors:
+                collector.increment("call_errors", method=qualified)
+            raise
+        finally:
+            local.depth = depth
+        seconds = clock() - started
+        size = record(seconds, args, result)
+        if local.trace is not None:
+            local.trace.append(TraceEntry(qualified, depth, started - local.trace_origin, seconds, size))
+        return result
+
+    def record(seconds: float, args: tuple, result: object) -> Optional[int]:
+        size = len(result) if isinstance(result, _SIZED) else None
+        reason = rejection(args, result) if rejection is not None else None
+        for collector in state.collectors:
+            collector.record_call(qualified, seconds, size)
+            if reason is not None:
+                collector.increment("borrow_rejected", reason=reason)
+        return size
+
+    wrapper.__wrapped__ = method
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+def _install(target: object) -> _Instrumentation:
+    state = vars(target).get("_instrumentation")
+    if state is None:
+        owner = type(target).__name__
+        names = [name for name, _ in inspect.getmembers(type(target), inspect.isfunction)
+                 if not name.startswith("_")]
+        state = _Instrumentation({name: getattr(target, name) for name in names})
+        for name, method in state.originals.items():
+            setattr(target, name, _wrap(owner, name, method, state))
+        target._instrumentation = state
+    return state
+
+
+def _remove(target: object, state: _Instrumentation) -> None:
+    for name in state.originals:
+        # Borrar el atributo de la instancia deja visible el método de la clase.
+        delattr(target, name)
+    del target._instrumentation
+
+
+def instrument(target: object, *collectors: Collector) -> None:
+    """Empieza a medir los métodos públicos de ``target`` (Library o BioAlert)."""
+    with _registry_lock:
+        _install(target).collectors.extend(collectors)
+
+
+def uninstrument(target: object) -> None:
+    """Quita los envoltorios y los collectors de ``target``."""
+    with _registry_lock:
+        state = vars(target).get("_instrumentation")
+        if state is not None:
+            state.collectors.clear()
+            if not state.profiling:
+                _remove(target, state)
+
+
+@contextmanager
+def profile(*targets: object) -> Iterator[List[TraceEntry]]:
+    """Traza de las llamadas del hilo actual a ``targets`` dentro del bloque."""
+    trace: List[TraceEntry] = []
+    with _registry_lock:
+        states = [_install(target) for target in targets]
+        for state in states:
+            state.profiling += 1
+    previous = _local.trace, _local.trace_origin
+    _local.trace, _local.trace_origin = trace, time.perf_counter()
+    try:
+        yield trace
+    finally:
+        # Las llamadas se anotan al terminar; se ordenan por inicio.
+        trace.sort(key=lambda entry: entry.start)
+        _local.trace, _local.trace_origin = previous
+        with _registry_lock:
+            for target, state in zip(targets, states):
+                state.profiling -= 1
+                if not state.profiling and not state.collectors:
+                    _remove(target, state)
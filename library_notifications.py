@@ -0,0 +1,150 @@
+# library_notifications.py
+"""Envío asíncrono de avisos de BioAlert.
+
+NotificationDispatcher recibe avisos (destinatario, título) en una cola
+acotada y los entrega con un grupo fijo de hilos. Los avisos pendientes para
+un mismo destinatario se agrupan en un solo envío, los fallos se reintentan
+con espera exponencial y, si la cola se llena, submit() bloquea al llamador
+(o lanza queue.Full al vencer ``submit_timeout``).
+"""
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class DeliveryBackend(ABC):
+    """Interfaz de entrega: envía varios títulos a un mismo destinatario."""
+
+    @abstractmethod
+    def send_batch(self, recipient: str, titles: List[str]) -> None:
+        """Entrega el aviso; una excepción hace que el dispatcher lo reintente."""
+
+
+class PrintBackend(DeliveryBackend):
+    """Imprime los avisos, igual que BioAlert._send_email."""
+
+    def send_batch(self, recipient: str, titles: List[str]) -> None:
+        for title in titles:
+            print(f"Email sent to {recipient}: '{title}' is now available")
+
+
+class OutboxBackend(DeliveryBackend):
+    """SMTP falso en memoria para medir sin red.
+
+    ``latency`` simula el tiempo de cada envío y ``failures`` la cantidad de
+    envíos que fallan antes de empezar a funcionar.
+    """
+
+    def __init__(self, latency: float = 0.0, failures: int = 0):
+        self.latency = latency
+        self.failures = failures
+        self.outbox: List[Tuple[str, List[str], float]] = []
+        self._lock = threading.Lock()
+
+    def send_batch(self, recipient: str, titles: List[str]) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            if self.failures > 0:
+                self.failures -= 1
+                raise ConnectionError("outbox unavailable")
+            self.outbox.append((recipient, list(titles), time.perf_counter()))
+
+    def delivered(self) -> int:
+        """Cantidad de avisos (títulos) entregados."""
+        with self._lock:
+            return sum(len(titles) for _, titles, _ in self.outbox)
+
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """Cola acotada con un grupo de hilos que entregan avisos por lotes."""
+
+    def __init__(self, backend: DeliveryBackend, workers: int = 4, max_queue: int = 10000,
+                 max_batch: int = 100, max_retries: int = 3, backoff: float = 0.05,
+                 submit_timeout: Optional[float] = None):
+        self.backend = backend
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.submit_timeout = submit_timeout
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"queued": 0, "sent": 0, "batches": 0,
+                                      "retries": 0, "failed": 0}
+        self.latencies: Deque[float] = deque(maxlen=10000)
+        self.failed: List[Tuple[str, List[str]]] = []
+        self._workers = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, recipient: str, title: str) -> None:
+        """Encola un aviso; bloquea si la cola está llena (back-pressure)."""
+        self._queue.put((recipient, title, time.perf_counter()), timeout=self.submit_timeout)
+        with self._lock:
+            self.stats["queued"] += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            items = [item]
+            stop = False
+            while len(items) < self.max_batch:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is _STOP:
+                    stop = True
+                    break
+                items.append(extra)
+            grouped: Dict[str, List[Tuple[str, float]]] = {}
+            for recipient, title, queued_at in items:
+                grouped.setdefault(recipient, []).append((title, queued_at))
+            for recipient, entries in grouped.items():
+                self._deliver(recipient, entries)
+            for _ in range(len(items) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _deliver(self, recipient: str, entries: List[Tuple[str, float]]) -> None:
+        titles = [title for title, _ in entries]
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.backend.send_batch(recipient, titles)
+            except Exception:
+                if attempt == self.max_retries:
+                    with self._lock:
+                        self.stats["failed"] += len(titles)
+                        self.failed.append((recipient, titles))
+                    return
+                with self._lock:
+                    self.stats["retries"] += 1
+                time.sleep(self.backoff * 2 ** attempt)
+            else:
+                now = time.perf_counter()
+                with self._lock:
+                    self.stats["sent"] += len(titles)
+                    self.stats["batches"] += 1
+                    self.latencies.extend(now - queued_at for _, queued_at in entries)
+                return
+
+    def join(self) -> None:
+        """Espera a que se procesen todos los avisos encolados."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Procesa lo pendiente y detiene los hilos."""
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
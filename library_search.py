@@ -0,0 +1,240 @@
+# library_search.py
+"""Índice invertido sobre títulos y autores con búsqueda por prefijo y difusa.
+
+Los textos se separan en tokens normalizados con normalize_key (la misma
+clave de los índices de Library) y sin acentos. Cada token apunta a los
+libros donde aparece (con más peso en el título que en el autor). El
+vocabulario se mantiene ordenado para completar prefijos con bisect, y un
+índice de trigramas del vocabulario limita los candidatos de la búsqueda
+difusa antes de calcular la distancia de edición.
+"""
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from library_system import Book, normalize_key
+
+TITLE_WEIGHT = 2.0
+AUTHOR_WEIGHT = 1.0
+PREFIX_FACTOR = 0.8
+FUZZY_FACTOR = 0.6
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    folded = unicodedata.normalize("NFKD", normalize_key(text))
+    return _TOKEN.findall("".join(c for c in folded if not unicodedata.combining(c)))
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"$${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """Distancia de Levenshtein entre a y b, o None si supera ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, start=1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (char_a != char_b))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class SearchIndex:
+    """Índice de búsqueda incremental de libros."""
+
+    def __init__(self, max_expansions: int = 50):
+        self.max_expansions = max_expansions
+        self._books: List[Book] = []
+        self._book_ids: Dict[Tuple[str, int, str], int] = {}
+        self._known: Dict[Book, int] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        # Los mismos postings agrupados por peso, con ids crecientes: permiten
+        # sacar los mejores resultados de un solo término sin recorrerlos todos.
+        self._impacts: Dict[str, Dict[float, List[int]]] = {}
+        self._vocabulary: List[str] = []
+        self._token_ids: Dict[str, int] = {}
+        self._tokens: List[str] = []
+        self._grams: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def add_book(self, book: Book) -> int:
+        """Indexa el libro si no estaba (por título, año y autor) y devuelve su id."""
+        book_id = self._known.get(book)
+        if book_id is not None:
+            return book_id
+        key = (*book.title_key, book.get_author().key)
+        book_id = self._book_ids.get(key)
+        if book_id is None:
+            book_id = self._book_ids[key] = len(self._books)
+            self._books.append(book)
+            for token in tokenize(book.get_title()):
+                self._add_posting(token, book_id, TITLE_WEIGHT)
+            for token in tokenize(book.get_author().get_name()):
+                self._add_posting(token, book_id, AUTHOR_WEIGHT)
+        self._known[book] = book_id
+        return book_id
+
+    def _add_posting(self, token: str, book_id: int, weight: float) -> None:
+        postings = self._postings.get(token)
+        if postings is None:
+            postings = self._postings[token] = {}
+            self._impacts[token] = {}
+            insort(self._vocabulary, token)
+            token_id = self._token_ids[token] = len(self._tokens)
+            self._tokens.append(token)
+            for gram in _trigrams(token):
+                self._grams.setdefault(gram, []).append(token_id)
+        impacts = self._impacts[token]
+        previous = postings.get(book_id)
+        if previous is not None:
+            # El libro se está indexando ahora, así que es el último de su grupo.
+            impacts[previous].pop()
+            if not impacts[previous]:
+                del impacts[previous]
+            weight += previous
+        postings[book_id] = weight
+        impacts.setdefault(weight, []).append(book_id)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Tokens del vocabulario que empiezan con ``prefix``, los más frecuentes primero."""
+        folded = tokenize(prefix)
+        if not folded:
+            return []
+        matches = self._prefix_matches(folded[-1])
+        return sorted(matches, key=lambda token: (-len(self._postings[token]), token))[:limit]
+
+    def _prefix_matches(self, prefix: str) -> List[str]:
+        start = bisect_left(self._vocabulary, prefix)
+        matches = []
+        for token in self._vocabulary[start:start + self.max_expansions]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def _fuzzy_matches(self, term: str) -> Dict[str, int]:
+        limit = 1 if len(term) < 8 else 2
+        term_grams = _trigrams(term)
+        grams = sorted(term_grams, key=lambda gram: len(self._grams.get(gram, ())))
+        # Cada edición rompe a lo sumo 3 trigramas, así que un token a distancia
+        # <= limit comparte al menos ``needed`` y alguno de los
+        # len(grams) - needed + 1 más raros.
+        needed = len(grams) - 3 * limit
+        candidates: Set[int] = set()
+        for gram in grams[:len(grams) - max(needed, 1) + 1]:
+            candidates.update(self._grams.get(gram, ()))
+        matches = {}
+        for token_id in candidates:
+            token = self._tokens[token_id]
+            if abs(len(token) - len(term)) > limit or len(term_grams & _trigrams(token)) < needed:
+                continue
+            distance = bounded_edit_distance(term, token, limit)
+            if distance is not None:
+                matches[token] = distance
+        return matches
+
+    def _expand(self, term: str, fuzzy: bool, last: bool) -> Dict[str, float]:
+        """Tokens que aceptan el término, con el factor de calidad de cada uno.
+
+        Un término que está en el vocabulario solo se expande por prefijo si es
+        el último de la consulta (el que se está escribiendo); los demás se
+        buscan también por prefijo y, si ``fuzzy``, con errores de tipeo.
+        """
+        expansions: Dict[str, float] = {}
+        exact = term in self._postings
+        if fuzzy and not exact and len(term) >= 4:
+            for token, distance in self._fuzzy_matches(term).items():
+                expansions[token] = FUZZY_FACTOR / (1 + distance)
+        if last or not exact:
+            for token in self._prefix_matches(term):
+                expansions[token] = max(expansions.get(token, 0.0), PREFIX_FACTOR)
+        if exact:
+            expansions[term] = 1.0
+        return expansions
+
+    def search(self, query: str, limit: int = 20, fuzzy: bool = True) -> List[Tuple[Book, float]]:
+        """Libros que coinciden con todos los términos, ordenados por puntaje."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        total = len(self._books)
+        weighted_terms = []
+        for position, term in enumerate(terms, start=1):
+            expansions = self._expand(term, fuzzy, position == len(terms))
+            weighted = [(token, quality * math.log(1 + total / len(self._postings[token])))
+                        for token, quality in expansions.items()]
+            if not weighted:
+                return []
+            weighted_terms.append(weighted)
+        if len(weighted_terms) == 1:
+            return [(self._books[book_id], score)
+                    for book_id, score in self._top_single(weighted_terms[0], limit)]
+        # Se empieza por el término más selectivo; los siguientes solo se
+        # evalúan sobre los candidatos que quedan.
+        weighted_terms = [[(self._postings[token], factor) for token, factor in weighted]
+                          for weighted in weighted_terms]
+        weighted_terms.sort(key=lambda weighted: sum(len(postings) for postings, _ in weighted))
+        (postings, factor), *others = sorted(weighted_terms[0], key=lambda item: -item[1])
+        scores = {book_id: weight * factor for book_id, weight in postings.items()}
+        for postings, factor in others:
+            for book_id, weight in postings.items():
+                if weight * factor > scores.get(book_id, 0.0):
+                    scores[book_id] = weight * factor
+        for weighted in weighted_terms[1:]:
+            next_scores = {}
+            for book_id, score in scores.items():
+                best = max(postings.get(book_id, 0.0) * factor for postings, factor in weighted)
+                if best:
+                    next_scores[book_id] = score + best
+            scores = next_scores
+            if not scores:
+                return []
+        return [(self._books[book_id], score) for book_id, score in self._top(scores, limit)]
+
+    def _top_single(self, weighted: List[Tuple[str, float]], limit: int) -> List[Tuple[int, float]]:
+        """Mejores resultados de un solo término, recorriendo los pesos de mayor a menor."""
+        levels: Dict[float, List[List[int]]] = {}
+        for token, factor in weighted:
+            for weight, book_ids in self._impacts[token].items():
+                levels.setdefault(weight * factor, []).append(book_ids)
+        ranked: List[Tuple[int, float]] = []
+        seen: Set[int] = set()
+        for score in sorted(levels, reverse=True):
+            for book_id in heapq.merge(*levels[score]):
+                # Un libro ya visto tuvo un puntaje mayor por otra expansión.
+                if book_id not in seen:
+                    seen.add(book_id)
+                    ranked.append((book_id, score))
+                    if len(ranked) == limit:
+                        return ranked
+        return ranked
+
+    @staticmethod
+    def _top(scores: Dict[int, float], limit: int) -> List[Tuple[int, float]]:
+        """Los ``limit`` mejores puntajes; los empates se resuelven por id de libro."""
+        if len(scores) > limit:
+            # Con términos comunes hay muchos candidatos y pocos puntajes
+            # distintos: se corta por el puntaje límite antes de ordenar.
+            cutoff = heapq.nlargest(limit, scores.values())[-1]
+            above = [(book_id, score) for book_id, score in scores.items() if score > cutoff]
+            tied = sorted(book_id for book_id, score in scores.items() if score == cutoff)
+            above.sort(key=lambda item: (-item[1], item[0]))
+            return above + [(book_id, cutoff) for book_id in tied[:limit - len(above)]]
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def add_books(self, books: Iterable[Book]) -> None:
+        for book in books:
+            self.add_book(book)
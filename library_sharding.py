@@ -0,0 +1,453 @@
+# library_sharding.py
+"""Library repartida entre varios procesos.
+
+ShardedLibrary reparte las copias entre N procesos, cada uno con su propia
+Library, según el autor (``partition="author"``) o el libro (``"book"``).
+Las operaciones sobre un solo autor o un solo libro van al shard dueño; las
+que cruzan shards se envían a todos a la vez y se combinan los resultados.
+
+    with ShardedLibrary(shards=4, partition="author") as library:
+        library.bulk_load("catalog.csv")
+        copy = library.find_available_copy("Refactoring", 2018)
+        library.borrow_book(reader, copy)
+
+Los lectores viven en el proceso principal. Las copias que se devuelven son
+referencias a una fila de un shard: su estado se consulta y se cambia en el
+shard. Los libros se devuelven como los objetos Book registrados en el
+proceso principal (los que se pasaron a add_copy o los creados al cargar).
+"""
+import multiprocessing
+import threading
+import time
+import zlib
+from array import array
+from contextlib import ExitStack
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from library_system import (Author, BioAlert, Book, BookCopy, CatalogSource, CompactCopyStore,
+                            CopyStatus, Library, Reader, _iter_catalog_rows, normalize_key)
+
+# (título, año, autor, fecha de nacimiento): identifica un libro entre procesos.
+BookKey = Tuple[str, int, str, str]
+# (copy_id, clave del libro, estado) de una copia enviada a un shard.
+CopyRow = Tuple[str, BookKey, CopyStatus]
+
+
+def _book_key(book: Book) -> BookKey:
+    author = book.get_author()
+    return book.get_title(), book.get_year(), author.get_name(), author.get_birth_date()
+
+
+class _ShardServer:
+    """Lado del proceso trabajador: una Library y las operaciones que atiende."""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.library = Library(**options)
+        self._authors: Dict[Tuple[str, str], Author] = {}
+        self._books: Dict[BookKey, Book] = {}
+
+    def _book(self, key: BookKey) -> Book:
+        book = self._books.get(key)
+        if book is None:
+            title, year, name, birth_date = key
+            author = self._authors.get((name, birth_date))
+            if author is None:
+                author = self._authors[(name, birth_date)] = Author(name, birth_date)
+            book = self._books[key] = Book(title, year, author)
+        return book
+
+    def load(self, rows: List[CopyRow]) -> Dict[str, int]:
+        """Agrega las filas; devuelve cuántas eran y cuántos autores y libros tiene el shard."""
+        library = self.library
+        compact = isinstance(library.copies, CompactCopyStore)
+        for copy_id, key, status in rows:
+            book = self._book(key)
+            if compact:
+                library.copies.append_row(copy_id, book, status)
+            else:
+                copy = BookCopy(copy_id, book)
+                copy.status = status
+                library.copies.append(copy)
+        library._sync_indexes()
+        return {"rows": len(rows), "authors": len(self._authors), "books": len(self._books)}
+
+    def add_book(self, key: BookKey) -> None:
+        self.library.add_book(self._book(key))
+
+    def claim(self, position: int) -> bool:
+        """Marca la copia como prestada si estaba disponible."""
+        copy = self.library.copies[position]
+        if not copy.is_available():
+            return False
+        copy.set_status(CopyStatus.BORROWED)
+        return True
+
+    def get_status(self, position: int) -> CopyStatus:
+        return self.library.copies[position].get_status()
+
+    def set_status(self, position: int, status: CopyStatus) -> None:
+        self.library.copies[position].set_status(status)
+
+    def count_copies_by_author(self, author_name: str) -> int:
+        return self.library.count_copies_by_author(author_name)
+
+    def count_available(self, title: str, year: int) -> int:
+        return self.library.count_available(title, year)
+
+    def find_available(self, title: str, year: int) -> Optional[Tuple[int, str, BookKey]]:
+        library = self.library
+        library._sync_indexes()
+        pool = library._pools_by_title_year.get((library._normalize(title), year))
+        position = pool.peek() if pool is not None else None
+        if position is None:
+            return None
+        copy = library.copies[position]
+        return position, copy.get_id(), _book_key(copy.get_book())
+
+    def books_by_author(self, author_name: str) -> List[BookKey]:
+        return [_book_key(book) for book in self.library.get_all_books_by_author(author_name)]
+
+    def first_positions(self, author_name: str) -> List[Tuple[int, BookKey]]:
+        """Libros del autor con la posición de su primera copia en este shard."""
+        library = self.library
+        library._sync_indexes()
+        copies = library.copies
+        first: Dict[Tuple[str, int], Tuple[int, BookKey]] = {}
+        for position in library._copies_by_author.get(library._normalize(author_name), ()):
+            book = copies[position].get_book()
+            if (book.get_title(), book.get_year()) not in first:
+                first[(book.get_title(), book.get_year())] = (position, _book_key(book))
+        return list(first.values())
+
+    def copies_details(self, author_name: str) -> Tuple[array, List[str]]:
+        """Detalles de las copias del autor y sus posiciones, en el mismo orden."""
+        library = self.library
+        details = library.list_copies_details(author_name)
+        return library._copies_by_author.get(library._normalize(author_name), array('I')), details
+
+
+def _serve(connection, options: Dict[str, Any]) -> None:
+    """Bucle del proceso trabajador: recibe (operación, argumentos) hasta recibir None."""
+    server = _ShardServer(options)
+    while True:
+        request = connection.recv()
+        if request is None:
+            connection.close()
+            return
+        name, args = request
+        try:
+            result = getattr(server, name)(*args)
+        except Exception as error:
+            connection.send((False, error))
+        else:
+            connection.send((True, result))
+
+
+class _Shard:
+    """Lado del proceso principal: conexión al trabajador y orden global de sus copias."""
+
+    def __init__(self, context, options: Dict[str, Any]):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, options), daemon=True)
+        self.process.start()
+        child.close()
+        # Un pedido a la vez por conexión: se toma desde el envío hasta la respuesta.
+        self.lock = threading.Lock()
+        # Número de alta global de cada copia, por posición dentro del shard.
+        self.sequence = array('Q')
+
+    def call(self, name: str, *args) -> Any:
+        with self.lock:
+            self.connection.send((name, args))
+            return _unwrap(self.connection.recv())
+
+
+def _unwrap(reply: Tuple[bool, Any]) -> Any:
+    ok, value = reply
+    if not ok:
+        raise value
+    return value
+
+
+class _ShardCopy(BookCopy):
+    """Referencia a una copia guardada en un shard, con la interfaz de BookCopy."""
+
+    __slots__ = ('_shard', '_position', '_copy_id', '_book')
+
+    def __init__(self, shard: _Shard, position: int, copy_id: str, book: Book):
+        self._shard = shard
+        self._position = position
+        self._copy_id = copy_id
+        self._book = book
+
+    @property
+    def copy_id(self) -> str:
+        return self._copy_id
+
+    @property
+    def book(self) -> Book:
+        return self._book
+
+    @property
+    def status(self) -> CopyStatus:
+        return self._shard.call("get_status", self._position)
+
+    def set_status(self, status: CopyStatus) -> None:
+        self._shard.call("set_status", self._position, status)
+
+    def add_status_listener(self, listener: Callable[[BookCopy, CopyStatus], None]) -> None:
+        """No se admite: los cambios de estado ocurren en el shard, no en este proceso.
+
+        Lanza TypeError; quien necesite seguir los estados debe consultarlos
+        con get_status().
+        """
+        raise TypeError("shard copies do not support status listeners; "
+                        "their status changes inside the shard process")
+
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, _ShardCopy) and other._shard is self._shard
+                and other._position == self._position)
+
+    def __hash__(self) -> int:
+        return hash((id(self._shard), self._position))
+
+
+class ShardedLibrary:
+    """Library repartida en ``shards`` procesos por autor o por (título, año)."""
+
+    PARTITIONS = ("author", "book")
+
+    def __init__(self, shards: int = 4, partition: str = "author", compact: bool = True,
+                 cache_size: int = 1024, start_method: Optional[str] = None, lock_stripes: int = 64):
+        if partition not in self.PARTITIONS:
+            raise ValueError(f"Unsupported partition: {partition}")
+        if shards < 1:
+            raise ValueError("At least one shard is required")
+        self.partition = partition
+        self.readers: List[Reader] = []
+        self._readers_by_email: Dict[str, Reader] = {}
+        self.bio_alert = BioAlert.get_instance()
+        context = multiprocessing.get_context(start_method)
+        options = {"compact": compact, "cache_size": cache_size}
+        self._shards = [_Shard(context, options) for _ in range(shards)]
+        self._authors: Dict[Tuple[str, str], Author] = {}
+        self._books: Dict[BookKey, Book] = {}
+        self._copies = 0
+        self._add_lock = threading.Lock()
+        self._reader_locks = [threading.Lock() for _ in range(lock_stripes)]
+        self._closed = False
+
+    # Reparto
+
+    def _shard_index(self, author_name: str, title: str, year: int) -> int:
+        if self.partition == "author":
+            key = normalize_key(author_name)
+        else:
+            key = f"{normalize_key(title)}\x1f{year}"
+        # crc32 y no hash(): el reparto no depende de PYTHONHASHSEED.
+        return zlib.crc32(key.encode("utf-8")) % len(self._shards)
+
+    def _shard_for_book(self, key: BookKey) -> int:
+        return self._shard_index(key[2], key[0], key[1])
+
+    def _book_for(self, key: BookKey) -> Book:
+        """El Book del proceso principal para la clave, creado si hace falta."""
+        book = self._books.get(key)
+        if book is None:
+            title, year, name, birth_date = key
+            author = self._authors.get((name, birth_date))
+            if author is None:
+                author = self._authors[(name, birth_date)] = Author(name, birth_date)
+            book = self._books.setdefault(key, Book(title, year, author))
+        return book
+
+    def _register_book(self, book: Book) -> BookKey:
+        key = _book_key(book)
+        self._books.setdefault(key, book)
+        return key
+
+    def _fan_out(self, name: str, *args) -> List[Any]:
+        """Envía el pedido a todos los shards y luego junta las respuestas."""
+        with ExitStack() as stack:
+            for shard in self._shards:
+                stack.enter_context(shard.lock)
+            for shard in self._shards:
+                shard.connection.send((name, args))
+            replies = [shard.connection.recv() for shard in self._shards]
+        return [_unwrap(reply) for reply in replies]
+
+    def _send_rows(self, rows: List[CopyRow]) -> Dict[int, Dict[str, int]]:
+        """Manda las copias a sus shards en paralelo, conservando el orden de alta.
+
+        Devuelve la respuesta de load() de cada shard que recibió filas.
+        """
+        batches: List[List[CopyRow]] = [[] for _ in self._shards]
+        with self._add_lock:
+            with ExitStack() as stack:
+                for shard in self._shards:
+                    stack.enter_context(shard.lock)
+                for row in rows:
+                    index = self._shard_for_book(row[1])
+                    batches[index].append(row)
+                    self._shards[index].sequence.append(self._copies)
+                    self._copies += 1
+                busy = [index for index, batch in enumerate(batches) if batch]
+                for index in busy:
+                    self._shards[index].connection.send(("load", (batches[index],)))
+                replies = [(index, self._shards[index].connection.recv()) for index in busy]
+        return {index: _unwrap(reply) for index, reply in replies}
+
+    # Carga
+
+    def add_book(self, book: Book) -> None:
+        key = self._register_book(book)
+        self._shards[self._shard_for_book(key)].call("add_book", key)
+
+    def add_copy(self, copy: BookCopy) -> None:
+        self._send_rows([(copy.get_id(), self._register_book(copy.get_book()), copy.get_status())])
+
+    def add_copies(self, copies: Iterable[BookCopy]) -> None:
+        """Agrega varias copias con un solo pedido por shard."""
+        self._send_rows([(copy.get_id(), self._register_book(copy.get_book()), copy.get_status())
+                         for copy in copies])
+
+    def bulk_load(self, source: CatalogSource, fmt: str = "csv", chunk_size: int = 10000) -> Dict[str, float]:
+        """Carga copias desde CSV o JSONL como Library.bulk_load y devuelve el mismo resumen.
+
+        Filas y libros se suman entre shards (cada libro vive en uno solo);
+        los autores se cuentan en el proceso principal, porque al repartir
+        por libro un autor puede estar en varios shards.
+        """
+        started = time.perf_counter()
+        shard_stats: Dict[int, Dict[str, int]] = {}
+        reader = _iter_catalog_rows(source, fmt)
+        while True:
+            chunk = list(islice(reader, chunk_size))
+            if not chunk:
+                break
+            batch = []
+            for row in chunk:
+                key = (row["title"], int(row["year"]), row["author"], row["birth_date"])
+                self._book_for(key)
+                status = CopyStatus(row.get("status") or CopyStatus.AVAILABLE.value)
+                batch.append((row["copy_id"], key, status))
+            for index, stats in self._send_rows(batch).items():
+                loaded = shard_stats.get(index, {}).get("rows", 0)
+                shard_stats[index] = dict(stats, rows=loaded + stats["rows"])
+        elapsed = time.perf_counter() - started
+        rows = sum(stats["rows"] for stats in shard_stats.values())
+        return {
+            "rows": rows,
+            "authors": len(self._authors),
+            "books": sum(stats["books"] for stats in shard_stats.values()),
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed if elapsed > 0 else float(rows),
+        }
+
+    def register_reader(self, reader: Reader) -> None:
+        """Registra al lector; su email no puede estar ya registrado."""
+        if reader.get_email() in self._readers_by_email:
+            raise ValueError(f"Reader {reader.get_email()} is already registered")
+        self._readers_by_email[reader.get_email()] = reader
+        self.readers.append(reader)
+
+    def get_reader(self, email: str) -> Optional[Reader]:
+        return self._readers_by_email.get(email)
+
+    def subscribe_to_book(self, book_title: str, email: str) -> None:
+        self.bio_alert.subscribe(book_title, email)
+
+    # Consultas
+
+    def count_copies_by_author(self, author_name: str) -> int:
+        if self.partition == "author":
+            return self._shards[self._shard_index(author_name, "", 0)].call(
+                "count_copies_by_author", author_name)
+        return sum(self._fan_out("count_copies_by_author", author_name))
+
+    def count_available(self, title: str, year: int) -> int:
+        if self.partition == "book":
+            return self._shards[self._shard_index("", title, year)].call("count_available", title, year)
+        return sum(self._fan_out("count_available", title, year))
+
+    def find_available_copy(self, title: str, year: int) -> Optional[BookCopy]:
+        """La copia disponible dada de alta primero, como en Library."""
+        if self.partition == "book":
+            index = self._shard_index("", title, year)
+            found = [(index, self._shards[index].call("find_available", title, year))]
+        else:
+            found = list(enumerate(self._fan_out("find_available", title, year)))
+        best = min(((self._shards[index].sequence[result[0]], index, result)
+                    for index, result in found if result is not None), default=None)
+        if best is None:
+            return None
+        _, index, (position, copy_id, key) = best
+        return _ShardCopy(self._shards[index], position, copy_id, self._book_for(key))
+
+    def get_all_books_by_author(self, author_name: str) -> List[Book]:
+        if self.partition == "author":
+            keys = self._shards[self._shard_index(author_name, "", 0)].call(
+                "books_by_author", author_name)
+            return [self._book_for(key) for key in keys]
+        # Cada libro vive en un solo shard; se ordenan por su primera copia.
+        found = []
+        for shard, results in zip(self._shards, self._fan_out("first_positions", author_name)):
+            found.extend((shard.sequence[position], key) for position, key in results)
+        found.sort()
+        return [self._book_for(key) for _, key in found]
+
+    def list_copies_details(self, author_name: str) -> List[str]:
+        if self.partition == "author":
+            return self._shards[self._shard_index(author_name, "", 0)].call(
+                "copies_details", author_name)[1]
+        merged = []
+        for shard, (positions, details) in zip(self._shards, self._fan_out("copies_details", author_name)):
+            sequence = shard.sequence
+            merged.extend(zip(map(sequence.__getitem__, positions), details))
+        merged.sort()
+        return [detail for _, detail in merged]
+
+    # Circulación
+
+    def borrow_book(self, reader: Reader, copy: BookCopy) -> bool:
+        """Presta la copia si el lector puede y el shard la marca como prestada."""
+        if not isinstance(copy, _ShardCopy) or copy._shard not in self._shards:
+            raise ValueError(f"Copy {copy.get_id()} does not belong to this library")
+        with self._reader_locks[hash(reader) % len(self._reader_locks)]:
+            if not reader.can_borrow() or not copy._shard.call("claim", copy._position):
+                return False
+            # claim ya la dejó BORROWED en el shard: no hace falta otro set_status.
+            reader._add_loan(copy)
+        return True
+
+    def return_book(self, reader: Reader, copy: BookCopy) -> None:
+        with self._reader_locks[hash(reader) % len(self._reader_locks)]:
+            reader.return_book(copy)
+
+    # Ciclo de vida
+
+    def __len__(self) -> int:
+        return self._copies
+
+    def shard_sizes(self) -> List[int]:
+        """Copias en cada shard."""
+        return [len(shard.sequence) for shard in self._shards]
+
+    def close(self) -> None:
+        """Detiene los procesos trabajadores."""
+        if self._closed:
+            return
+        self._closed = True
+        for shard in self._shards:
+            with shard.lock:
+                shard.connection.send(None)
+        for shard in self._shards:
+            shard.process.join()
+            shard.connection.close()
+
+    def __enter__(self) -> 'ShardedLibrary':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
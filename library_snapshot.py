@@ -0,0 +1,505 @@
+# library_snapshot.py
+"""Snapshot binario versionado de una Library, pensado para abrirse con mmap.
+
+Estructura del archivo:
+
+    cabecera   MAGIC (8 bytes), versión (u32), orden de bytes (u32)
+    tabla      por cada nombre de SECTIONS: offset (u64) y longitud (u64)
+    secciones  columnas alineadas a 8 bytes, en el orden de bytes de la cabecera
+
+Las columnas de texto son tablas de cadenas: cantidad (u64), offsets
+(u64 * (cantidad + 1)) y los bytes UTF-8 concatenados. Las copias y los
+préstamos se referencian por su posición en Library.copies, y library_books
+lista las filas de la tabla de libros que forman Library.books.
+
+Las secciones index_* guardan los índices por autor y por (título, año) ya
+agrupados: las claves ordenadas y, por clave, un tramo de posiciones (o de
+filas de libros) delimitado por una columna de offsets. Al abrir el snapshot
+cada clave se carga recién en su primera consulta.
+"""
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from library_system import (Author, Book, BookCopy, CompactCopyStore, CopyStatus, Reader, ReaderEvent,
+                            _AuthorBooks, _AvailabilityPool)
+
+MAGIC = b"LIBSNAP\0"
+VERSION = 3
+SECTIONS = (
+    "author_names", "author_birth_dates",
+    "book_titles", "book_years", "book_authors", "library_books",
+    "copy_ids", "copy_books", "copy_statuses",
+    "reader_names", "reader_emails", "reader_penalties",
+    "reader_loan_offsets", "reader_loans", "reader_loan_dues", "reader_loan_charged_days",
+    "subscription_titles", "subscription_emails",
+    "index_author_keys", "index_author_copy_offsets", "index_author_copies",
+    "index_author_book_offsets", "index_author_books",
+    "index_title_keys", "index_title_years", "index_title_copy_offsets", "index_title_copies",
+)
+_HEADER = struct.Struct("<8sII")
+_ENTRY = struct.Struct("<QQ")
+_BYTE_ORDERS = {"little": 0, "big": 1}
+
+
+def _string_table(values: Sequence[str]) -> bytes:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = array("Q", [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return array("Q", [len(encoded)]).tobytes() + offsets.tobytes() + b"".join(encoded)
+
+
+def _offsets(groups: List[array]) -> bytes:
+    return array("I", accumulate((len(group) for group in groups), initial=0)).tobytes()
+
+
+def _index_sections(books: List[Book], copy_books: array) -> Dict[str, bytes]:
+    """Los índices por autor y por (título, año) de Library, agrupados por clave."""
+    author_keys = [book.get_author().key for book in books]
+    by_author: Dict[str, array] = {}
+    author_books: Dict[str, Dict[Tuple[str, int], int]] = {}
+    by_title: Dict[Tuple[str, int], array] = {}
+    for position, row in enumerate(copy_books):
+        key = author_keys[row]
+        positions = by_author.get(key)
+        if positions is None:
+            positions = by_author[key] = array("I")
+            author_books[key] = {}
+        positions.append(position)
+        # Como _AuthorBooks: un libro por (título, año), en orden de primera copia.
+        book = books[row]
+        author_books[key].setdefault((book.get_title(), book.get_year()), row)
+        title_positions = by_title.get(book.title_key)
+        if title_positions is None:
+            title_positions = by_title[book.title_key] = array("I")
+        title_positions.append(position)
+
+    authors = sorted(by_author)
+    author_rows = [array("I", author_books[key].values()) for key in authors]
+    titles = sorted(by_title)
+    return {
+        "index_author_keys": _string_table(authors),
+        "index_author_copy_offsets": _offsets([by_author[key] for key in authors]),
+        "index_author_copies": b"".join(by_author[key].tobytes() for key in authors),
+        "index_author_book_offsets": _offsets(author_rows),
+        "index_author_books": b"".join(rows.tobytes() for rows in author_rows),
+        "index_title_keys": _string_table([title for title, _ in titles]),
+        "index_title_years": array("i", [year for _, year in titles]).tobytes(),
+        "index_title_copy_offsets": _offsets([by_title[key] for key in titles]),
+        "index_title_copies": b"".join(by_title[key].tobytes() for key in titles),
+    }
+
+
+def save_snapshot(library: Any, path: Union[str, os.PathLike]) -> None:
+    """Escribe el snapshot en un archivo temporal y lo renombra al terminar."""
+    author_rows: Dict[int, int] = {}
+    authors: List[Author] = []
+    book_rows: Dict[int, int] = {}
+    books: List[Book] = []
+
+    def book_row(book: Book) -> int:
+        row = book_rows.get(id(book))
+        if row is None:
+            author = book.get_author()
+            if id(author) not in author_rows:
+                author_rows[id(author)] = len(authors)
+                authors.append(author)
+            row = book_rows[id(book)] = len(books)
+            books.append(book)
+        return row
+
+    library._load_pending_loans()
+    library_books = array("I", [book_row(book) for book in library.books])
+    copy_ids: List[str] = []
+    copy_books = array("I")
+    copy_statuses = array("B")
+    loaned = {copy for reader in library.readers for copy in reader.get_borrowed_books()}
+    positions: Dict[BookCopy, int] = {}
+    for position, copy in enumerate(library.copies):
+        copy_ids.append(copy.get_id())
+        copy_books.append(book_row(copy.get_book()))
+        copy_statuses.append(CompactCopyStore.STATUS_CODES[copy.get_status()])
+        if copy in loaned:
+            positions[copy] = position
+
+    loan_offsets = array("I", [0])
+    loans = array("I")
+    loan_dues = array("d")
+    loan_charged_days = array("I")
+    for reader in library.readers:
+        for copy in reader.get_borrowed_books():
+            if copy not in positions:
+                raise ValueError(f"Reader {reader.get_email()} has a loan outside the library")
+            loans.append(positions[copy])
+            loan = library._loans.get(copy)
+            loan_dues.append(loan.due if loan is not None else math.nan)
+            loan_charged_days.append(loan.charged_days if loan is not None else 0)
+        loan_offsets.append(len(loans))
+
+    subscriptions = [(title, email)
+                     for title, emails in library.bio_alert.subscriptions.items()
+                     for email in emails]
+    sections = {
+        "author_names": _string_table([a.get_name() for a in authors]),
+        "author_birth_dates": _string_table([a.get_birth_date() for a in authors]),
+        "book_titles": _string_table([b.get_title() for b in books]),
+        "book_years": array("i", [b.get_year() for b in books]).tobytes(),
+        "book_authors": array("I", [author_rows[id(b.get_author())] for b in books]).tobytes(),
+        "library_books": library_books.tobytes(),
+        "copy_ids": _string_table(copy_ids),
+        "copy_books": copy_books.tobytes(),
+        "copy_statuses": copy_statuses.tobytes(),
+        "reader_names": _string_table([r.get_name() for r in library.readers]),
+        "reader_emails": _string_table([r.get_email() for r in library.readers]),
+        "reader_penalties": array("i", [r.get_penalty_days() for r in library.readers]).tobytes(),
+        "reader_loan_offsets": loan_offsets.tobytes(),
+        "reader_loans": loans.tobytes(),
+        "reader_loan_dues": loan_dues.tobytes(),
+        "reader_loan_charged_days": loan_charged_days.tobytes(),
+        "subscription_titles": _string_table([title for title, _ in subscriptions]),
+        "subscription_emails": _string_table([email for _, email in subscriptions]),
+    }
+    sections.update(_index_sections(books, copy_books))
+
+    offset = _HEADER.size + _ENTRY.size * len(SECTIONS)
+    table = []
+    for name in SECTIONS:
+        offset += -offset % 8
+        table.append((offset, len(sections[name])))
+        offset += len(sections[name])
+
+    temp_path = f"{os.fspath(path)}.tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, VERSION, _BYTE_ORDERS[sys.byteorder]))
+        for entry in table:
+            handle.write(_ENTRY.pack(*entry))
+        for name, (start, _) in zip(SECTIONS, table):
+            handle.write(b"\0" * (start - handle.tell()))
+            handle.write(sections[name])
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp_path, path)
+
+
+class _StringTable:
+    """Tabla de cadenas que decodifica cada valor recién al leerlo."""
+
+    def __init__(self, view: memoryview):
+        count = view[:8].cast("Q")[0]
+        self._offsets = view[8:8 * (count + 2)].cast("Q")
+        self._blob = view[8 * (count + 2):]
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+
+class _MaterializingTable:
+    """Secuencia de solo lectura que crea cada objeto en su primer acceso."""
+
+    def __init__(self, count: int, factory: Callable[[int], Any]):
+        self._count = count
+        self._factory = factory
+        self._cache: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Any:
+        item = self._cache.get(index)
+        if item is None:
+            if not 0 <= index < self._count:
+                raise IndexError("snapshot index out of range")
+            item = self._cache[index] = self._factory(index)
+        return item
+
+
+class _TitleYearKeys:
+    """Claves (título normalizado, año) del índice por título, en orden."""
+
+    def __init__(self, titles: _StringTable, years: memoryview):
+        self._titles = titles
+        self._years = years
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def __getitem__(self, index: int) -> Tuple[str, int]:
+        return self._titles[index], self._years[index]
+
+
+class _LazyIndex(dict):
+    """Índice de Library que trae cada clave del snapshot en su primer acceso.
+
+    Las claves del snapshot están ordenadas y se buscan con bisect. Una clave
+    cargada queda en el dict y desde ahí se actualiza como en un índice
+    normal (las copias agregadas después de abrir el snapshot se suman a
+    ella). values() carga antes todas las claves.
+    """
+
+    def __init__(self, keys: Sequence[Any], load: Callable[[int], Any]):
+        super().__init__()
+        self._keys = keys
+        self._load = load
+        self._lock = threading.Lock()
+        self._complete = False
+
+    def _find(self, key: Any) -> Optional[int]:
+        index = bisect_left(self._keys, key)
+        return index if index < len(self._keys) and self._keys[index] == key else None
+
+    def __missing__(self, key: Any) -> Any:
+        index = self._find(key)
+        if index is None:
+            raise KeyError(key)
+        with self._lock:
+            if not dict.__contains__(self, key):
+                dict.__setitem__(self, key, self._load(index))
+            return dict.__getitem__(self, key)
+
+    def __contains__(self, key: Any) -> bool:
+        return dict.__contains__(self, key) or self._find(key) is not None
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        dict.__setitem__(self, key, default)
+        return default
+
+    def values(self) -> Any:
+        if not self._complete:
+            for index in range(len(self._keys)):
+                self.get(self._keys[index])
+            self._complete = True
+        return dict.values(self)
+
+
+class _ExtendableColumn:
+    """Columna con una parte fija del snapshot y una extensión en memoria."""
+
+    def __init__(self, base: Any, extension: Any):
+        self._base = base
+        self._extension = extension
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._extension)
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += len(self)
+        size = len(self._base)
+        return self._base[index] if index < size else self._extension[index - size]
+
+    def __setitem__(self, index: int, value: Any) -> None:
+        size = len(self._base)
+        if index < size:
+            self._base[index] = value
+        else:
+            self._extension[index - size] = value
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, value: Any) -> None:
+        self._extension.append(value)
+
+    def tail(self, start: int, typecode: str) -> array:
+        """Los valores desde ``start`` en un array nuevo."""
+        size = len(self._base)
+        result = array(typecode)
+        if start < size:
+            result.frombytes(self._base[start:].tobytes())
+        result.extend(self._extension[max(start - size, 0):])
+        return result
+
+
+class _Snapshot:
+
+    def __init__(self, path: Union[str, os.PathLike], writable: bool):
+        with open(path, "r+b" if writable else "rb") as handle:
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_COPY
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=access)
+        magic, version, byte_order = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a library snapshot")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version: {version}")
+        if byte_order != _BYTE_ORDERS[sys.byteorder]:
+            raise ValueError("Snapshot was written with a different byte order")
+        view = memoryview(self._mmap)
+        self._sections: Dict[str, memoryview] = {}
+        for index, name in enumerate(SECTIONS):
+            start, length = _ENTRY.unpack_from(self._mmap, _HEADER.size + index * _ENTRY.size)
+            self._sections[name] = view[start:start + length]
+
+    def strings(self, name: str) -> _StringTable:
+        return _StringTable(self._sections[name])
+
+    def numbers(self, name: str, typecode: str) -> memoryview:
+        return self._sections[name].cast(typecode)
+
+    def flush(self) -> None:
+        self._mmap.flush()
+
+
+class SnapshotCopyStore(CompactCopyStore):
+    """CompactCopyStore cuyas columnas viven en un snapshot mapeado en memoria.
+
+    Los estados se escriben en el mapa; las copias agregadas después de abrir
+    el snapshot quedan en memoria hasta el próximo save_snapshot.
+    """
+
+    def __init__(self, snapshot: _Snapshot):
+        super().__init__()
+        self._snapshot = snapshot
+        author_names = snapshot.strings("author_names")
+        birth_dates = snapshot.strings("author_birth_dates")
+        self._authors = _MaterializingTable(
+            len(author_names), lambda row: Author(author_names[row], birth_dates[row]))
+        self._titles = snapshot.strings("book_titles")
+        self._years = snapshot.numbers("book_years", "i")
+        self._book_authors = snapshot.numbers("book_authors", "I")
+        self._ids = _ExtendableColumn(snapshot.strings("copy_ids"), [])
+        self._books = _ExtendableColumn(_MaterializingTable(len(self._titles), self._load_book), [])
+        self._book_refs = _ExtendableColumn(snapshot.numbers("copy_books", "I"), array("I"))
+        self._statuses = _ExtendableColumn(snapshot.numbers("copy_statuses", "B"), array("B"))
+
+    def _load_book(self, row: int) -> Book:
+        book = Book(self._titles[row], self._years[row], self._authors[self._book_authors[row]])
+        self._book_rows[book] = row
+        return book
+
+    def export_columns(self, start: int = 0) -> Tuple[array, array]:
+        return self._book_refs.tail(start, "I"), self._statuses.tail(start, "B")
+
+    def _status_bytes(self) -> bytes:
+        return self._statuses.tail(0, "B").tobytes()
+
+    def lazy_indexes(self) -> Tuple[_LazyIndex, _LazyIndex, _LazyIndex]:
+        """Índices (copias por autor, libros por autor, disponibles por título y año)."""
+        snapshot = self._snapshot
+        author_keys = snapshot.strings("index_author_keys")
+        copy_offsets = snapshot.numbers("index_author_copy_offsets", "I")
+        author_copies = snapshot.numbers("index_author_copies", "I")
+        book_offsets = snapshot.numbers("index_author_book_offsets", "I")
+        book_rows = snapshot.numbers("index_author_books", "I")
+        title_keys = _TitleYearKeys(snapshot.strings("index_title_keys"),
+                                    snapshot.numbers("index_title_years", "i"))
+        title_offsets = snapshot.numbers("index_title_copy_offsets", "I")
+        title_copies = snapshot.numbers("index_title_copies", "I")
+        available = self.STATUS_CODES[CopyStatus.AVAILABLE]
+
+        def load_copies(index: int) -> array:
+            return array("I", author_copies[copy_offsets[index]:copy_offsets[index + 1]].tobytes())
+
+        def load_books(index: int) -> _AuthorBooks:
+            books = _AuthorBooks()
+            for row in book_rows[book_offsets[index]:book_offsets[index + 1]]:
+                books.add(self._books[row])
+            return books
+
+        def load_pool(index: int) -> _AvailabilityPool:
+            # El estado se lee al cargar: incluye los cambios hechos desde que se abrió.
+            statuses = self._statuses
+            return _AvailabilityPool([position for position in
+                                      title_copies[title_offsets[index]:title_offsets[index + 1]]
+                                      if statuses[position] == available])
+
+        return (_LazyIndex(author_keys, load_copies), _LazyIndex(author_keys, load_books),
+                _LazyIndex(title_keys, load_pool))
+
+    def flush(self) -> None:
+        """Asegura que los cambios escritos en el mapa lleguen al archivo."""
+        self._snapshot.flush()
+
+
+class _SnapshotReader(Reader):
+    """Lector cuyos días de multa se leen y escriben en el snapshot."""
+
+    def __init__(self, name: str, email: str, borrowed: Dict[BookCopy, None],
+                 penalties: memoryview, row: int):
+        self.name = name
+        self.email = email
+        self.borrowed_books = borrowed
+        self._penalties = penalties
+        self._row = row
+        self._listeners: List[Callable[[Reader, ReaderEvent, object], None]] = []
+
+    @property
+    def penalty_days(self) -> int:
+        return self._penalties[self._row]
+
+    @penalty_days.setter
+    def penalty_days(self, days: int) -> None:
+        self._penalties[self._row] = days
+
+
+def load_snapshot(path: Union[str, os.PathLike], writable: bool = False,
+                  reader_listener: Optional[Callable[[Reader, ReaderEvent, object], None]] = None
+                  ) -> Tuple[SnapshotCopyStore, _ExtendableColumn, _ExtendableColumn,
+                             Sequence[str], List[Tuple[str, str]],
+                             Callable[[], Iterator[Tuple[Reader, BookCopy, float, int]]]]:
+    """Mapea el snapshot y devuelve (copias, libros, lectores, emails, suscripciones, préstamos).
+    
+    ``reader_listener`` se registra en cada lector al materializarlo. El
+    último elemento es una función que recorre los préstamos con vencimiento
+    como (lector, copia, vencimiento, días cobrados), materializando los
+    lectores que los tienen.
+    """
+    snapshot = _Snapshot(path, writable)
+    store = SnapshotCopyStore(snapshot)
+    library_books = snapshot.numbers("library_books", "I")
+    books = _ExtendableColumn(
+        _MaterializingTable(len(library_books), lambda row: store._books[library_books[row]]), [])
+
+    names = snapshot.strings("reader_names")
+    emails = snapshot.strings("reader_emails")
+    penalties = snapshot.numbers("reader_penalties", "i")
+    loan_offsets = snapshot.numbers("reader_loan_offsets", "I")
+    loans = snapshot.numbers("reader_loans", "I")
+
+    def load_reader(row: int) -> Reader:
+        borrowed = dict.fromkeys(store[position]
+                                 for position in loans[loan_offsets[row]:loan_offsets[row + 1]])
+        reader = _SnapshotReader(names[row], emails[row], borrowed, penalties, row)
+        if reader_listener is not None:
+            reader.add_listener(reader_listener)
+        return reader
+
+    readers = _ExtendableColumn(_MaterializingTable(len(names), load_reader), [])
+    titles = snapshot.strings("subscription_titles")
+    subscribers = snapshot.strings("subscription_emails")
+    subscriptions = [(titles[i], subscribers[i]) for i in range(len(titles))]
+    dues = snapshot.numbers("reader_loan_dues", "d")
+    charged_days = snapshot.numbers("reader_loan_charged_days", "I")
+
+    def iter_loans() -> Iterator[Tuple[Reader, BookCopy, float, int]]:
+        for row in range(len(names)):
+            start, end = loan_offsets[row], loan_offsets[row + 1]
+            if start == end:
+                continue
+            reader = readers[row]
+            for index in range(start, end):
+                copy = store[loans[index]]
+                if not math.isnan(dues[index]) and copy in reader.borrowed_books:
+                    yield reader, copy, dues[index], charged_days[index]
+
+    return store, books, readers, emails, subscriptions, iter_loans
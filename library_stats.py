@@ -0,0 +1,280 @@
+# library_stats.py
+"""Estadísticas de inventario calculadas sobre columnas.
+
+InventoryStats mantiene una columna por copia (libro y código de estado) y
+una tabla de conteos libro x estado. Las copias nuevas se agregan en bloque
+en refresh() y los cambios de estado ajustan los conteos al momento, así que
+un reporte solo recorre los libros, no las copias.
+
+Si NumPy está instalado las operaciones en bloque se vectorizan; si no, se
+usan arrays de la biblioteca estándar con el mismo resultado.
+"""
+import threading
+import time
+from array import array
+from collections import Counter
+from itertools import islice, repeat
+from operator import add, mul
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+from library_system import Book, BookCopy, CompactCopyStore, CopyStatus, normalize_key
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+if TYPE_CHECKING:
+    from library_system import Library
+
+STATUSES = CompactCopyStore.STATUSES
+STATUS_CODES = CompactCopyStore.STATUS_CODES
+IN_USE = (CopyStatus.BORROWED, CopyStatus.DELAYED)
+_WIDTH = len(STATUSES)
+
+
+def _gather(table: array, indexes: array) -> array:
+    """table[i] para cada i de indexes."""
+    if np is not None and len(indexes):
+        result = np.frombuffer(table, dtype=table.typecode)[np.frombuffer(indexes, dtype=indexes.typecode)]
+        return array(table.typecode, result.tobytes())
+    return array(table.typecode, map(table.__getitem__, indexes))
+
+
+def _utilization(counts: Sequence[int]) -> float:
+    total = sum(counts)
+    return sum(counts[STATUS_CODES[status]] for status in IN_USE) / total if total else 0.0
+
+
+class GroupCounts:
+    """Conteos por grupo y estado, guardados como una matriz plana grupos x estados.
+
+    Los grupos se buscan por la clave normalizada, igual que se agruparon:
+    get("FOWLER") y get("Fowler") dan el mismo grupo.
+    """
+
+    def __init__(self, labels: List[object], counts: array, keys: Dict[object, int]):
+        self.labels = labels
+        self._counts = counts
+        self._keys = keys
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def _group(self, label: object):
+        return self._keys.get(normalize_key(label) if isinstance(label, str) else label)
+
+    def _row(self, group: int) -> Sequence[int]:
+        return self._counts[group * _WIDTH:(group + 1) * _WIDTH]
+
+    def get(self, label: object) -> Dict[CopyStatus, int]:
+        """Copias del grupo por estado (todas en cero si el grupo no existe)."""
+        group = self._group(label)
+        row = self._row(group) if group is not None else [0] * _WIDTH
+        return {status: row[code] for code, status in enumerate(STATUSES)}
+
+    def total(self, label: object) -> int:
+        group = self._group(label)
+        return sum(self._row(group)) if group is not None else 0
+
+    def utilization(self, label: object) -> float:
+        """Fracción de copias del grupo prestadas o demoradas."""
+        group = self._group(label)
+        return _utilization(self._row(group)) if group is not None else 0.0
+
+    def top(self, limit: int = 10) -> List[Tuple[object, int]]:
+        """Los grupos con más copias."""
+        totals = [(label, sum(self._row(group))) for group, label in enumerate(self.labels)]
+        totals.sort(key=lambda item: -item[1])
+        return totals[:limit]
+
+    def as_dict(self) -> Dict[object, Dict[str, int]]:
+        return {label: {status.value: count for status, count in zip(STATUSES, self._row(group))}
+                for group, label in enumerate(self.labels)}
+
+
+class _Labels:
+    """Ids densos por clave normalizada, con la etiqueta vista primero."""
+
+    def __init__(self):
+        self.ids: Dict[object, int] = {}
+        self.labels: List[object] = []
+
+    def ids_for(self, keys: Iterable[object], labels: List[object]) -> List[int]:
+        ids = self.ids
+        known = len(ids)
+        groups = [ids.setdefault(key, len(ids)) for key in keys]
+        if len(ids) > known:
+            # Recorridos al revés, queda la primera etiqueta de cada grupo.
+            first = dict(zip(reversed(groups), reversed(labels)))
+            self.labels.extend(first[group] for group in range(known, len(ids)))
+        return groups
+
+
+class InventoryStats:
+    """Columnas y conteos del inventario de una Library, con actualización incremental."""
+
+    def __init__(self, library: 'Library'):
+        self._library = library
+        self._lock = threading.Lock()
+        self._rows = 0
+        # Una entrada por copia.
+        self._copy_book = array('I')
+        self._copy_status = array('B')
+        # Una entrada por libro distinto (por identidad del objeto Book).
+        self._book_ids: Dict[Book, int] = {}
+        self._store_books = array('I')
+        self._book_author = array('I')
+        self._book_year = array('i')
+        self._book_year_group = array('I')
+        self._book_title = array('I')
+        self._book_status = array('q')
+        self._authors = _Labels()
+        self._titles = _Labels()
+        self._years = _Labels()
+
+    def _book_ids_for(self, books: List[Book]) -> List[int]:
+        """Ids de los libros; los nuevos se agregan a las tablas por libro."""
+        book_ids = self._book_ids
+        known = len(book_ids)
+        ids = [book_ids.setdefault(book, len(book_ids)) for book in books]
+        if len(book_ids) > known:
+            new = list(islice(book_ids, known, None))
+            titles = [book.get_title() for book in new]
+            years = [book.get_year() for book in new]
+            authors = [book.get_author() for book in new]
+            self._book_author.extend(self._authors.ids_for([author.key for author in authors],
+                                                           [author.get_name() for author in authors]))
+            self._book_title.extend(self._titles.ids_for([book.title_key[0] for book in new], titles))
+            self._book_year.extend(years)
+            self._book_year_group.extend(self._years.ids_for(years, years))
+            self._book_status.frombytes(bytes(self._book_status.itemsize * _WIDTH * len(new)))
+        return ids
+
+    def refresh(self) -> int:
+        """Agrega las copias nuevas del catálogo y devuelve cuántas eran."""
+        # Las copias sin indexar todavía no avisan sus cambios de estado.
+        self._library._sync_indexes()
+        copies = self._library.copies
+        with self._lock:
+            start, end = self._rows, len(copies)
+            if start == end:
+                return 0
+            if isinstance(copies, CompactCopyStore):
+                refs, statuses = copies.export_columns(start)
+                del refs[end - start:], statuses[end - start:]
+                self._store_books.extend(self._book_ids_for(
+                    [copies.book_at(ref) for ref in range(len(self._store_books), copies.book_count())]))
+                books = _gather(self._store_books, refs)
+            else:
+                new = [copies[position] for position in range(start, end)]
+                books = array('I', self._book_ids_for([copy.get_book() for copy in new]))
+                statuses = array('B', [STATUS_CODES[copy.get_status()] for copy in new])
+            self._copy_book.extend(books)
+            self._copy_status.extend(statuses)
+            self._count(books, statuses)
+            self._rows = end
+            return end - start
+
+    def _count(self, books: array, statuses: array) -> None:
+        if np is not None:
+            keys = np.frombuffer(books, dtype=books.typecode).astype(np.int64) * _WIDTH
+            keys += np.frombuffer(statuses, dtype=np.uint8)
+            counts = np.frombuffer(self._book_status, dtype=np.int64)
+            counts += np.bincount(keys, minlength=len(counts))
+            return
+        for key, amount in Counter(map(add, map(mul, books, repeat(_WIDTH)), statuses)).items():
+            self._book_status[key] += amount
+
+    def on_status_change(self, position: int, copy: BookCopy) -> None:
+        """Ajusta los conteos al cambiar el estado de una copia ya agregada."""
+        with self._lock:
+            if position >= self._rows:
+                return
+            code = STATUS_CODES[copy.get_status()]
+            previous = self._copy_status[position]
+            # Se compara con la columna propia: un cambio que refresh() ya
+            # copió no se cuenta dos veces.
+            if previous == code:
+                return
+            base = self._copy_book[position] * _WIDTH
+            self._book_status[base + previous] -= 1
+            self._book_status[base + code] += 1
+            self._copy_status[position] = code
+
+    def columns(self) -> Dict[str, Union[array, 'np.ndarray']]:
+        """El catálogo como columnas por copia: status, book_id, author_id y year."""
+        with self._lock:
+            columns = {"status": array('B', self._copy_status),
+                       "book_id": array('I', self._copy_book),
+                       "author_id": _gather(self._book_author, self._copy_book),
+                       "year": _gather(self._book_year, self._copy_book)}
+        if np is not None:
+            return {name: np.frombuffer(column, dtype=column.typecode)
+                    for name, column in columns.items()}
+        return columns
+
+    def _group(self, groups: array, labels: _Labels) -> GroupCounts:
+        """Suma los conteos libro x estado por grupo."""
+        size = len(labels.labels) * _WIDTH
+        if np is not None and len(groups):
+            matrix = np.frombuffer(self._book_status, dtype=np.int64).reshape(-1, _WIDTH)
+            group_ids = np.frombuffer(groups, dtype=groups.typecode)
+            summed = np.zeros((len(labels.labels), _WIDTH), dtype=np.int64)
+            for code in range(_WIDTH):
+                summed[:, code] = np.bincount(group_ids, weights=matrix[:, code],
+                                              minlength=len(labels.labels))
+            return GroupCounts(list(labels.labels), array('q', summed.tobytes()), dict(labels.ids))
+        counts = array('q', repeat(0, size))
+        book_status = self._book_status
+        for book_id, group in enumerate(groups):
+            for code in range(_WIDTH):
+                counts[group * _WIDTH + code] += book_status[book_id * _WIDTH + code]
+        return GroupCounts(list(labels.labels), counts, dict(labels.ids))
+
+    def report(self) -> Dict[str, object]:
+        """Conteos por estado, autor, año y título, uso y distribución de multas."""
+        started = time.perf_counter()
+        self.refresh()
+        with self._lock:
+            by_status = [sum(self._book_status[code::_WIDTH]) for code in range(_WIDTH)]
+            report: Dict[str, object] = {
+                "copies": sum(by_status),
+                "books": len(self._book_author),
+                "by_status": dict(zip(STATUSES, by_status)),
+                "utilization": _utilization(by_status),
+                "by_author": self._group(self._book_author, self._authors),
+                "by_year": self._group(self._book_year_group, self._years),
+                "by_title": self._group(self._book_title, self._titles),
+            }
+        report["penalties"] = penalty_distribution(
+            reader.get_penalty_days() for reader in self._library.readers)
+        report["seconds"] = time.perf_counter() - started
+        return report
+
+
+def penalty_distribution(penalties: Iterator[int]) -> Dict[str, object]:
+    """Resumen de los días de multa de los lectores."""
+    histogram = Counter(penalties)
+    readers = sum(histogram.values())
+    total = sum(days * count for days, count in histogram.items())
+    percentiles = {}
+    if readers:
+        ordered = sorted(histogram.items())
+        for percentile in (50, 90, 99):
+            rank = max(1, -(-percentile * readers // 100))
+            seen = 0
+            for days, count in ordered:
+                seen += count
+                if seen >= rank:
+                    percentiles[percentile] = days
+                    break
+    return {
+        "readers": readers,
+        "with_penalty": readers - histogram.get(0, 0),
+        "total_days": total,
+        "mean_days": total / readers if readers else 0.0,
+        "max_days": max(histogram) if histogram else 0,
+        "percentiles": percentiles,
+        "histogram": dict(sorted(histogram.items())),
+    }
@@ -0,0 +1,702 @@
+# library_storage.py
+"""Library guardada en un archivo SQLite.
+
+SqliteCopyStore cumple la misma interfaz que CompactCopyStore (filas por
+posición, vistas _CopyView, listeners de estado), pero las filas viven en la
+base y en memoria solo queda una caché LRU acotada de filas y libros.
+SqliteLibrary responde las consultas con índices de la base en lugar de los
+índices en memoria de Library; el resto de la API no cambia.
+
+    library = Library.open_database("catalog.db")
+    library.bulk_load("catalog.csv")
+    copy = library.find_available_copy("Refactoring", 2018)
+    ...
+    library.close()
+
+Las escrituras se agrupan en transacciones de hasta ``commit_every``
+cambios; commit() y close() confirman lo pendiente. Los lectores y los
+préstamos abiertos también se guardan y se recuperan al abrir el archivo;
+las suscripciones de BioAlert y las colas de reserva quedan en memoria, así
+que al abrir el archivo las copias que estaban RESERVED vuelven a AVAILABLE.
+"""
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from itertools import count, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from library_system import (Author, Book, BookCopy, CatalogSource, CompactCopyStore, CopyStatus,
+                            Library, Reader, ReaderEvent, ScanSource, _Loan, _iter_catalog_rows)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    birth_date TEXT NOT NULL,
+    key TEXT NOT NULL,
+    UNIQUE (name, birth_date)
+);
+CREATE INDEX IF NOT EXISTS authors_by_key ON authors (key);
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    title_key TEXT NOT NULL,
+    listed INTEGER,
+    first_row INTEGER,
+    UNIQUE (title, year, author_id)
+);
+CREATE INDEX IF NOT EXISTS books_by_author ON books (author_id, first_row);
+CREATE INDEX IF NOT EXISTS books_by_title ON books (title_key, year);
+CREATE UNIQUE INDEX IF NOT EXISTS books_by_listing ON books (listed) WHERE listed IS NOT NULL;
+CREATE TABLE IF NOT EXISTS copies (
+    row INTEGER PRIMARY KEY,
+    copy_id TEXT NOT NULL,
+    book_id INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    status INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS copies_by_author ON copies (author_id);
+CREATE INDEX IF NOT EXISTS copies_by_book_status ON copies (book_id, status);
+CREATE INDEX IF NOT EXISTS copies_by_status ON copies (status);
+CREATE TABLE IF NOT EXISTS readers (
+    row INTEGER PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    penalty_days INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS loans (
+    copy_row INTEGER PRIMARY KEY,
+    reader_row INTEGER NOT NULL,
+    due REAL NOT NULL,
+    charged_days INTEGER NOT NULL,
+    sequence INTEGER NOT NULL
+);
+"""
+
+_AVAILABLE = CompactCopyStore.STATUS_CODES[CopyStatus.AVAILABLE]
+
+
+class _LRU:
+    """Diccionario acotado que descarta la entrada usada hace más tiempo."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Any, Any]' = OrderedDict()
+
+    def get(self, key: Any) -> Any:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Any, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _CopyColumn:
+    """Un campo de la tabla copies visto como secuencia por posición, para _CopyView."""
+
+    def __init__(self, store: 'SqliteCopyStore', field: int):
+        self._store = store
+        self._field = field
+
+    def __len__(self) -> int:
+        return self._store._count
+
+    def __getitem__(self, row: int) -> Any:
+        return self._store._row(row)[self._field]
+
+    def __setitem__(self, row: int, value: Any) -> None:
+        self._store._write_field(row, self._field, value)
+
+
+class _BookColumn:
+    """Libros por id, cargados bajo demanda."""
+
+    def __init__(self, store: 'SqliteCopyStore'):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store.book_count()
+
+    def __getitem__(self, book_id: int) -> Book:
+        return self._store.book_at(book_id)
+
+
+class _ListedBooks:
+    """Library.books de una base: los libros en el orden en que se agregaron al catálogo."""
+
+    def __init__(self, store: 'SqliteCopyStore'):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store._listed
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Book, List[Book]]:
+        if isinstance(index, slice):
+            positions = range(*index.indices(len(self)))
+            if not positions:
+                return []
+            ids = dict(self._store._query("SELECT listed, id FROM books WHERE listed BETWEEN ? AND ?",
+                                          (min(positions), max(positions))))
+            return [self._store.book_at(ids[position]) for position in positions]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("book index out of range")
+        (book_id,), = self._store._query("SELECT id FROM books WHERE listed = ?", (index,))
+        return self._store.book_at(book_id)
+
+    def __iter__(self) -> Iterator[Book]:
+        for book_id, in self._store._query("SELECT id FROM books WHERE listed IS NOT NULL ORDER BY listed"):
+            yield self._store.book_at(book_id)
+
+    def append(self, book: Book) -> None:
+        self._store.list_book(book)
+
+
+class SqliteCopyStore(CompactCopyStore):
+    """Almacén de copias en SQLite con una caché acotada de filas y libros."""
+
+    def __init__(self, path: Union[str, os.PathLike], object_cache_size: int = 100000,
+                 commit_every: int = 1000):
+        super().__init__()
+        # Una sola conexión compartida entre hilos, protegida por _lock.
+        self._connection = sqlite3.connect(os.fspath(path), isolation_level=None,
+                                           check_same_thread=False, cached_statements=256)
+        self._lock = threading.RLock()
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(SCHEMA)
+        self.commit_every = commit_every
+        self._pending = 0
+        # Mientras load_rows arma un bloque, _write no confirma por su cuenta.
+        self._deferred = False
+        self._rows = _LRU(object_cache_size)
+        self._book_cache = _LRU(object_cache_size)
+        self._book_ids = _LRU(object_cache_size)
+        self._author_ids = _LRU(object_cache_size)
+        self._ids_by_key = _LRU(object_cache_size)
+        (self._count,), = self._query("SELECT COUNT(*) FROM copies")
+        (self._book_total,), = self._query("SELECT COUNT(*) FROM books")
+        (self._author_total,), = self._query("SELECT COUNT(*) FROM authors")
+        (self._listed,), = self._query("SELECT COUNT(listed) FROM books")
+        self._ids = _CopyColumn(self, 0)
+        self._book_refs = _CopyColumn(self, 1)
+        self._statuses = _CopyColumn(self, 2)
+        self._books = _BookColumn(self)
+        self.listed_books = _ListedBooks(self)
+
+    # Acceso a la base
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _stream(self, sql: str, params: tuple = (), batch: int = 64) -> Iterator[tuple]:
+        """Filas del resultado de a bloques, sin tomar el candado entre bloques."""
+        with self._lock:
+            cursor = self._connection.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(batch)
+            if not rows:
+                return
+            yield from rows
+
+    def _write(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Ejecuta una escritura dentro de la transacción abierta, que se confirma cada commit_every."""
+        with self._lock:
+            if not self._connection.in_transaction:
+                self._connection.execute("BEGIN")
+            cursor = self._connection.execute(sql, params)
+            self._pending += 1
+            if self._pending >= self.commit_every and not self._deferred:
+                self.commit()
+            return cursor
+
+    def commit(self) -> None:
+        with self._lock:
+            if self._connection.in_transaction:
+                self._connection.execute("COMMIT")
+            self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self.commit()
+            self._connection.close()
+
+    # Filas
+
+    def _row(self, row: int) -> tuple:
+        with self._lock:
+            cached = self._rows.get(row)
+            if cached is None:
+                found = self._connection.execute(
+                    "SELECT copy_id, book_id, status FROM copies WHERE row = ?", (row,)).fetchone()
+                if found is None:
+                    raise IndexError("copy index out of range")
+                cached = found
+                self._rows.put(row, cached)
+            return cached
+
+    def _write_field(self, row: int, field: int, value: Any) -> None:
+        if field != 2:
+            raise TypeError("only copy statuses can be changed")
+        with self._lock:
+            self._write("UPDATE copies SET status = ? WHERE row = ?", (value, row))
+            cached = self._rows.get(row)
+            if cached is not None:
+                self._rows.put(row, cached[:2] + (value,))
+
+    def _author_id(self, author: Author) -> int:
+        identity = (author.get_name(), author.get_birth_date())
+        author_id = self._author_ids.get(identity)
+        if author_id is None:
+            found = self._connection.execute(
+                "SELECT id FROM authors WHERE name = ? AND birth_date = ?", identity).fetchone()
+            if found is None:
+                author_id = self._author_total
+                self._write("INSERT INTO authors (id, name, birth_date, key) VALUES (?, ?, ?, ?)",
+                            (author_id, *identity, author.key))
+                self._author_total += 1
+                ids = self._ids_by_key.get(author.key)
+                if ids is not None:
+                    self._ids_by_key.put(author.key, ids + (author_id,))
+            else:
+                author_id = found[0]
+            self._author_ids.put(identity, author_id)
+        return author_id
+
+    def _book_entry(self, book: Book) -> list:
+        """[id, id del autor, figura en Library.books, tiene copias] del libro, guardándolo si es nuevo."""
+        author_id = self._author_id(book.get_author())
+        identity = (book.get_title(), book.get_year(), author_id)
+        entry = self._book_ids.get(identity)
+        if entry is None:
+            found = self._connection.execute(
+                "SELECT id, listed, first_row FROM books WHERE title = ? AND year = ? AND author_id = ?",
+                identity).fetchone()
+            if found is None:
+                entry = [self._book_total, author_id, False, False]
+                self._write("INSERT INTO books (id, title, year, author_id, title_key) VALUES (?, ?, ?, ?, ?)",
+                            (self._book_total, *identity, book.title_key[0]))
+                self._book_total += 1
+            else:
+                entry = [found[0], author_id, found[1] is not None, found[2] is not None]
+            self._book_ids.put(identity, entry)
+            self._book_cache.put(entry[0], book)
+        return entry
+
+    def list_book(self, book: Book) -> bool:
+        """Agrega el libro a Library.books si no estaba; devuelve si era nuevo."""
+        with self._lock:
+            entry = self._book_entry(book)
+            if entry[2]:
+                return False
+            self._write("UPDATE books SET listed = ? WHERE id = ?", (self._listed, entry[0]))
+            self._listed += 1
+            entry[2] = True
+            return True
+
+    def _copy_values(self, row: int, copy_id: str, book: Book, status: CopyStatus) -> tuple:
+        book_id, author_id, _, has_copies = entry = self._book_entry(book)
+        if not has_copies:
+            # first_row ordena los libros de un autor como Library._books_by_author.
+            self._write("UPDATE books SET first_row = ? WHERE id = ?", (row, book_id))
+            entry[3] = True
+        return row, copy_id, book_id, author_id, self.STATUS_CODES[status]
+
+    def append_row(self, copy_id: str, book: Book, status: CopyStatus) -> int:
+        with self._lock:
+            row = self._count
+            values = self._copy_values(row, copy_id, book, status)
+            self._write("INSERT INTO copies (row, copy_id, book_id, author_id, status) VALUES (?, ?, ?, ?, ?)",
+                        values)
+            self._count += 1
+            self._rows.put(row, (copy_id, values[2], values[4]))
+            return row
+
+    def load_rows(self, rows: Iterable[Tuple[str, Book, CopyStatus]], list_books: bool = True) -> int:
+        """Guarda un bloque de copias en una sola transacción."""
+        with self._lock:
+            start = self._count
+            values = []
+            if not self._connection.in_transaction:
+                self._connection.execute("BEGIN")
+            # Los autores y libros nuevos del bloque van en la misma transacción.
+            self._deferred = True
+            try:
+                for copy_id, book, status in rows:
+                    if list_books:
+                        self.list_book(book)
+                    values.append(self._copy_values(start + len(values), copy_id, book, status))
+                self._connection.executemany(
+                    "INSERT INTO copies (row, copy_id, book_id, author_id, status) VALUES (?, ?, ?, ?, ?)",
+                    values)
+            finally:
+                self._deferred = False
+            self._count += len(values)
+            self.commit()
+            return len(values)
+
+    def book_count(self) -> int:
+        return self._book_total
+
+    def book_at(self, book_ref: int) -> Book:
+        with self._lock:
+            book = self._book_cache.get(book_ref)
+            if book is None:
+                found = self._connection.execute(
+                    "SELECT b.title, b.year, a.name, a.birth_date FROM books b "
+                    "JOIN authors a ON a.id = b.author_id WHERE b.id = ?", (book_ref,)).fetchone()
+                if found is None:
+                    raise IndexError("book index out of range")
+                title, year, name, birth_date = found
+                book = Book(title, year, Author(name, birth_date))
+                self._book_cache.put(book_ref, book)
+            return book
+
+    def export_columns(self, start: int = 0) -> Tuple[array, array]:
+        books, statuses = array('I'), array('B')
+        for book_id, status in self._stream("SELECT book_id, status FROM copies WHERE row >= ? ORDER BY row",
+                                            (start,), batch=10000):
+            books.append(book_id)
+            statuses.append(status)
+        return books, statuses
+
+    def __len__(self) -> int:
+        return self._count
+
+    # Consultas con índices
+
+    def _author_filter(self, author_key: str, column: str) -> Tuple[str, tuple]:
+        """Condición SQL sobre ``column`` para los autores con esa clave (puede haber homónimos)."""
+        with self._lock:
+            ids = self._ids_by_key.get(author_key)
+            if ids is None:
+                ids = tuple(author_id for author_id, in self._connection.execute(
+                    "SELECT id FROM authors WHERE key = ?", (author_key,)))
+                self._ids_by_key.put(author_key, ids)
+        if len(ids) == 1:
+            return f"{column} = ?", ids
+        return f"{column} IN ({', '.join('?' * len(ids))})", ids
+
+    def count_by_author(self, author_key: str) -> int:
+        condition, params = self._author_filter(author_key, "author_id")
+        (count,), = self._query(f"SELECT COUNT(*) FROM copies WHERE {condition}", params)
+        return count
+
+    def rows_by_author(self, author_key: str, after: Optional[int] = None,
+                       status: Optional[CopyStatus] = None, year: Optional[int] = None,
+                       columns: str = "c.row") -> Iterator[tuple]:
+        """Columnas pedidas de las copias del autor, en orden de alta y filtrando en la base."""
+        condition, author_ids = self._author_filter(author_key, "c.author_id")
+        sql = f"SELECT {columns} FROM copies c INDEXED BY copies_by_author"
+        params: List[Any] = list(author_ids)
+        if year is not None:
+            sql += " JOIN books b ON b.id = c.book_id AND b.year = ?"
+            params.insert(0, year)
+        sql += f" WHERE {condition}"
+        if after is not None:
+            sql += " AND c.row > ?"
+            params.append(after)
+        if status is not None:
+            sql += " AND c.status = ?"
+            params.append(self.STATUS_CODES[status])
+        return self._stream(sql + " ORDER BY c.row", tuple(params))
+
+    def books_by_author(self, author_key: str) -> List[Book]:
+        """Libros del autor con copias, ordenados por su primera copia."""
+        condition, params = self._author_filter(author_key, "author_id")
+        return self._load_books(f"SELECT id FROM books INDEXED BY books_by_author WHERE {condition} "
+                           "AND first_row IS NOT NULL ORDER BY first_row", params)
+
+    def _load_books(self, sql: str, params: tuple) -> List[Book]:
+        """Libros de una consulta que devuelve ids; solo se leen de la base los que no están en caché."""
+        with self._lock:
+            ids = [book_id for book_id, in self._connection.execute(sql, params)]
+            cache = self._book_cache
+            missing = [book_id for book_id in ids if cache.get(book_id) is None]
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                for book_id, title, year, name, birth_date in self._connection.execute(
+                        "SELECT b.id, b.title, b.year, a.name, a.birth_date FROM books b "
+                        f"JOIN authors a ON a.id = b.author_id WHERE b.id IN ({', '.join('?' * len(chunk))})",
+                        chunk):
+                    cache.put(book_id, Book(title, year, Author(name, birth_date)))
+            # Si la caché es más chica que el resultado, los faltantes se leen de a uno.
+            return [cache.get(book_id) or self.book_at(book_id) for book_id in ids]
+
+    def first_available(self, title_key: str, year: int) -> Optional[int]:
+        # La primera copia disponible de cada libro sale del extremo de su
+        # rango en copies_by_book_status, sin recorrer las demás.
+        (row,), = self._query(
+            "SELECT MIN((SELECT row FROM copies INDEXED BY copies_by_book_status "
+            "WHERE book_id = b.id AND status = ? ORDER BY row LIMIT 1)) "
+            "FROM books b WHERE b.title_key = ? AND b.year = ?", (_AVAILABLE, title_key, year))
+        return row
+
+    def count_available(self, title_key: str, year: int) -> int:
+        (count,), = self._query(
+            "SELECT COUNT(*) FROM books b JOIN copies c INDEXED BY copies_by_book_status "
+            "ON c.book_id = b.id AND c.status = ? WHERE b.title_key = ? AND b.year = ?",
+            (_AVAILABLE, title_key, year))
+        return count
+
+    def authors_since(self, start: int) -> List[str]:
+        """Claves de los autores con copias en posiciones >= ``start``."""
+        return [key for key, in self._query(
+            "SELECT DISTINCT a.key FROM copies c JOIN authors a ON a.id = c.author_id WHERE c.row >= ?",
+            (start,))]
+
+    def books_since(self, start: int) -> List[Book]:
+        return self._load_books("SELECT DISTINCT book_id FROM copies WHERE row >= ?", (start,))
+
+    def row_of(self, copy: BookCopy) -> Optional[int]:
+        """Fila de la copia en la base: la de la vista o, si no lo es, la de su copy_id.
+
+        La búsqueda por copy_id recorre la tabla (no tiene índice); solo la
+        usan copias que no quedaron como vista al agregarse, que son raras.
+        """
+        if getattr(copy, "_store", None) is self:
+            return copy._row
+        found = self._query("SELECT row FROM copies WHERE copy_id = ? ORDER BY row LIMIT 1",
+                            (copy.get_id(),))
+        return found[0][0] if found else None
+
+    def rows_with_status(self, status: CopyStatus) -> List[int]:
+        return [row for row, in self._query("SELECT row FROM copies INDEXED BY copies_by_status "
+                                            "WHERE status = ? ORDER BY row", (self.STATUS_CODES[status],))]
+
+    def iter_statuses(self) -> Iterator[Tuple[int, str, int]]:
+        return self._stream("SELECT row, copy_id, status FROM copies ORDER BY row", batch=10000)
+
+    def all_books(self) -> Iterator[Book]:
+        for book_id, in self._stream("SELECT id FROM books ORDER BY id"):
+            yield self.book_at(book_id)
+
+
+class SqliteLibrary(Library):
+    """Library cuyos libros, copias, lectores y préstamos viven en un archivo SQLite."""
+
+    def __init__(self, path: Union[str, os.PathLike], concurrent: bool = False, lock_stripes: int = 64,
+                 cache_size: int = 1024, object_cache_size: int = 100000, commit_every: int = 1000):
+        super().__init__(concurrent=concurrent, lock_stripes=lock_stripes, cache_size=cache_size)
+        store = SqliteCopyStore(path, object_cache_size, commit_every)
+        self._use_store(store)
+        self.books = store.listed_books
+        self._book_set = None
+        self._indexed_upto = len(store)
+        # Orden de alta de los préstamos en la base; sigue desde el último
+        # guardado, así que no se mezcla entre sesiones.
+        (last,), = store._query("SELECT MAX(sequence) FROM loans")
+        self._loan_rows = count(last + 1 if last is not None else 0)
+        self._load_readers()
+        # Las colas de reserva quedan en memoria; ver Library._release_orphaned_reservations.
+        self._release_orphaned_reservations()
+
+    def _load_readers(self) -> None:
+        store = self.copies
+        for _, email, name, penalty_days in store._query(
+                "SELECT row, email, name, penalty_days FROM readers ORDER BY row"):
+            reader = Reader(name, email)
+            reader.penalty_days = penalty_days
+            # Sin pasar por register_reader de esta clase: ya está en la base.
+            Library.register_reader(self, reader)
+        for copy_row, reader_row, due, charged_days in store._query(
+                "SELECT copy_row, reader_row, due, charged_days FROM loans ORDER BY sequence"):
+            reader, copy = self.readers[reader_row], store[copy_row]
+            reader.borrowed_books[copy] = None
+            self._start_loan(reader, copy, due, charged_days)
+
+    def commit(self) -> None:
+        """Confirma en el archivo los cambios pendientes."""
+        self.copies.commit()
+
+    def close(self) -> None:
+        self.copies.close()
+
+    # Índices: viven en la base, así que aquí solo se invalidan las cachés.
+
+    def _sync_indexes(self) -> None:
+        copies = self.copies
+        if self._indexed_upto == len(copies):
+            return
+        with self._index_lock:
+            start = self._indexed_upto
+            if start == len(copies):
+                return
+            if self._cache is not None:
+                for author_key in copies.authors_since(start):
+                    self._cache.invalidate(author_key)
+            if self._search is not None:
+                self._search.add_books(copies.books_since(start))
+            self._indexed_upto = len(copies)
+
+    def _on_copy_status_change(self, position: int, copy: BookCopy, previous: CopyStatus) -> None:
+        if self._journal is not None:
+            self._journal.record_status(copy)
+        if self._stats is not None:
+            self._stats.on_status_change(position, copy)
+        self._invalidate_author(copy.get_book())
+
+    def _register_book(self, book: Book) -> bool:
+        return self.copies.list_book(book)
+
+    def enable_search(self) -> None:
+        from library_search import SearchIndex
+        self._sync_indexes()
+        with self._index_lock:
+            if self._search is None:
+                search = SearchIndex()
+                search.add_books(self.copies.all_books())
+                self._search = search
+
+    def bulk_load(self, source: CatalogSource, fmt: str = "csv", chunk_size: int = 10000,
+                  progress: Optional[Callable[[int, float], None]] = None) -> Dict[str, float]:
+        """Como Library.bulk_load, con una transacción por bloque."""
+        started = time.perf_counter()
+        store = self.copies
+        rows = 0
+        try:
+            reader = _iter_catalog_rows(source, fmt)
+            while True:
+                chunk = list(islice(reader, chunk_size))
+                if not chunk:
+                    break
+                store.load_rows((row["copy_id"],
+                                 Book(row["title"], int(row["year"]), Author(row["author"], row["birth_date"])),
+                                 CopyStatus(row.get("status") or CopyStatus.AVAILABLE.value))
+                                for row in chunk)
+                rows += len(chunk)
+                if progress is not None:
+                    progress(rows, rows / max(time.perf_counter() - started, 1e-9))
+        finally:
+            self._sync_indexes()
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": rows,
+            "authors": store._author_total,
+            "books": store.book_count(),
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed if elapsed > 0 else float(rows),
+        }
+
+    # Consultas
+
+    def count_copies_by_author(self, author_name: str) -> int:
+        self._sync_indexes()
+        return self.copies.count_by_author(self._normalize(author_name))
+
+    def find_copies_by_author(self, author_name: str) -> List[BookCopy]:
+        self._sync_indexes()
+        copies = self.copies
+        return [copies[row] for row, in copies.rows_by_author(self._normalize(author_name))]
+
+    def find_available_copy(self, title: str, year: int) -> Optional[BookCopy]:
+        self._sync_indexes()
+        row = self.copies.first_available(self._normalize(title), year)
+        return self.copies[row] if row is not None else None
+
+    def count_available(self, title: str, year: int) -> int:
+        self._sync_indexes()
+        return self.copies.count_available(self._normalize(title), year)
+
+    def _books_by_author_uncached(self, author_key: str) -> tuple:
+        books: Dict[Tuple[str, int], Book] = {}
+        for book in self.copies.books_by_author(author_key):
+            books.setdefault((book.get_title(), book.get_year()), book)
+        return tuple(books.values())
+
+    def _copies_details_uncached(self, author_key: str) -> tuple:
+        copies = self.copies
+        return tuple(f"{copies.book_at(book_id).get_full_info()} - Copy {copy_id}"
+                     for copy_id, book_id in copies.rows_by_author(author_key, columns="c.copy_id, c.book_id"))
+
+    def _scan_author_copies(self, author_key: str, after: Optional[int], status: Optional[CopyStatus],
+                            year: Optional[int]) -> Iterator[Tuple[int, BookCopy]]:
+        self._sync_indexes()
+        copies = self.copies
+        for row, in copies.rows_by_author(author_key, after, status, year):
+            yield row, copies[row]
+
+    def _scan_author_books(self, author_key: str, after: Optional[int],
+                           year: Optional[int]) -> Iterator[Tuple[int, Book]]:
+        self._sync_indexes()
+        books = self._cached("books", author_key, self._books_by_author_uncached)
+        for ordinal in range(after + 1 if after is not None else 0, len(books)):
+            book = books[ordinal]
+            if year is None or book.get_year() == year:
+                yield ordinal, book
+
+    def reconcile(self, scanned: ScanSource, missing_status: Optional[CopyStatus] = None,
+                  found_status: Optional[CopyStatus] = None) -> Dict[str, object]:
+        report = super().reconcile(scanned, missing_status, found_status)
+        if report["corrected"]:
+            self.commit()
+        return report
+
+    # Lectores y préstamos
+
+    def register_reader(self, reader: Reader) -> None:
+        super().register_reader(reader)
+        self.copies._write("INSERT INTO readers (row, email, name, penalty_days) VALUES (?, ?, ?, ?)",
+                           (len(self.readers) - 1, reader.get_email(), reader.get_name(),
+                            reader.get_penalty_days()))
+
+    def _on_reader_event(self, reader: Reader, event: ReaderEvent, value: object) -> None:
+        super()._on_reader_event(reader, event, value)
+        store = self.copies
+        if event == ReaderEvent.PENALTY:
+            store._write("UPDATE readers SET penalty_days = ? WHERE row = ?",
+                         (value, self._reader_index()[reader.get_email()]))
+        elif isinstance(value, BookCopy):
+            # Por fila de la base, sea la vista o la BookCopy que se pasó al agregarla.
+            row = store.row_of(value)
+            if row is None:
+                return
+            if event == ReaderEvent.BORROW:
+                loan = self._loans[value]
+                store._write("INSERT OR REPLACE INTO loans VALUES (?, ?, ?, ?, ?)",
+                             (row, self._reader_index()[reader.get_email()], loan.due,
+                              loan.charged_days, next(self._loan_rows)))
+            else:
+                store._write("DELETE FROM loans WHERE copy_row = ?", (row,))
+
+    def _record_charge(self, copy: BookCopy, days: int) -> None:
+        super()._record_charge(copy, days)
+        # Los días ya cobrados se guardan para no volver a cobrarlos al reabrir.
+        row = self.copies.row_of(copy)
+        if row is not None:
+            self.copies._write("UPDATE loans SET charged_days = ? WHERE copy_row = ?", (days, row))
+
+    def _record_loan(self, reader: Reader, copy: BookCopy, loan: Optional[_Loan]) -> None:
+        super()._record_loan(reader, copy, loan)
+        store = self.copies
+        row = store.row_of(copy)
+        if row is None:
+            return
+        if loan is None:
+            store._write("DELETE FROM loans WHERE copy_row = ?", (row,))
+            return
+        store._write("INSERT OR REPLACE INTO loans VALUES (?, ?, ?, ?, ?)",
+                     (row, self._reader_index()[reader.get_email()], loan.due,
+                      loan.charged_days, next(self._loan_rows)))
+        # Se renumeran los préstamos del lector para que al reabrir sigan en su orden.
+        for borrowed in reader.borrowed_books:
+            borrowed_row = store.row_of(borrowed)
+            if borrowed_row is not None:
+                store._write("UPDATE loans SET sequence = ? WHERE copy_row = ?",
+                             (next(self._loan_rows), borrowed_row))
@@ -1,8 +1,30 @@
 # library_system.py
+import base64
+import csv
+import heapq
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from contextlib import ExitStack, contextmanager
 from enum import Enum
-from typing import List, Dict, Optional
+from functools import partial
+from itertools import chain, count, islice
+from typing import IO, TYPE_CHECKING, Callable, Deque, Iterable, Iterator, List, Dict, Optional, Sequence, Set, Tuple, Union
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from library_journal import Journal
+    from library_notifications import NotificationDispatcher
+    from library_search import SearchIndex
+    from library_stats import InventoryStats
+    from library_storage import SqliteLibrary
+
 class CopyStatus(Enum):
     AVAILABLE = "available"
     BORROWED = "borrowed"
@@ -11,11 +33,60 @@ class CopyStatus(Enum):
     IN_REPAIR = "in_repair"
 
 
+class ReaderEvent(Enum):
+    BORROW = "borrow"
+    RETURN = "return"
+    PENALTY = "penalty"
+
+
+class BatchResult(Enum):
+    OK = "ok"
+    ABORTED = "aborted"
+    UNAVAILABLE = "unavailable"
+    DUPLICATE = "duplicate"
+    LIMIT_REACHED = "limit_reached"
+    PENALTY = "penalty"
+    NOT_BORROWED = "not_borrowed"
+
+
+def normalize_key(text: str) -> str:
+    """Forma normalizada de un nombre o título: la clave de todos los índices."""
+    return text.casefold()
+
+
 class Author:
+    """Autor canónico: Author(nombre, fecha) con los mismos datos devuelve la misma instancia.
     
-    def __init__(self, name: str, birth_date: str):
-        self.name = name
-        self.birth_date = birth_date
+    Las instancias son compartidas, así que no deben modificarse. ``key`` es
+    el nombre normalizado que usan los índices de Library.
+    """
+    
+    __slots__ = ('name', 'birth_date', 'key', '_hash', '__weakref__')
+    
+    # Solo referencias débiles: un autor que nadie usa se libera.
+    _registry: 'weakref.WeakValueDictionary[Tuple[str, str], Author]' = weakref.WeakValueDictionary()
+    _registry_lock = threading.Lock()
+    
+    def __new__(cls, name: str, birth_date: str) -> 'Author':
+        identity = (name, birth_date)
+        author = cls._registry.get(identity)
+        if author is None:
+            with cls._registry_lock:
+                author = cls._registry.get(identity)
+                if author is None:
+                    author = super().__new__(cls)
+                    author.name = name
+                    author.birth_date = birth_date
+                    author.key = normalize_key(name)
+                    author._hash = hash(identity)
+                    cls._registry[identity] = author
+        return author
+    
+    def __hash__(self) -> int:
+        return self._hash
+    
+    def __reduce__(self) -> tuple:
+        return Author, (self.name, self.birth_date)
     
     def get_name(self) -> str:
         return self.name
@@ -25,11 +96,38 @@ class Author:
 
 
 class Book:
+    """Libro canónico: una sola instancia por (título, año, autor).
     
-    def __init__(self, title: str, year: int, author: Author):
-        self.title = title
-        self.year = year
-        self.author = author
+    ``title_key`` es (título normalizado, año), la clave de las búsquedas por
+    título de Library.
+    """
+    
+    __slots__ = ('title', 'year', 'author', 'title_key', '_hash', '__weakref__')
+    
+    _registry: 'weakref.WeakValueDictionary[Tuple[str, int, Author], Book]' = weakref.WeakValueDictionary()
+    _registry_lock = threading.Lock()
+    
+    def __new__(cls, title: str, year: int, author: Author) -> 'Book':
+        identity = (title, year, author)
+        book = cls._registry.get(identity)
+        if book is None:
+            with cls._registry_lock:
+                book = cls._registry.get(identity)
+                if book is None:
+                    book = super().__new__(cls)
+                    book.title = title
+                    book.year = year
+                    book.author = author
+                    book.title_key = (normalize_key(title), year)
+                    book._hash = hash(identity)
+                    cls._registry[identity] = book
+        return book
+    
+    def __hash__(self) -> int:
+        return self._hash
+    
+    def __reduce__(self) -> tuple:
+        return Book, (self.title, self.year, self.author)
     
     def get_title(self) -> str:
         return self.title
@@ -46,10 +144,16 @@ class Book:
 
 class BookCopy:
     
+    # _store y _row solo los usan las copias guardadas en un CompactCopyStore
+    # (ver _CopyView): al estar en el mismo layout, una copia agregada al
+    # almacén pasa a ser una vista de su fila sin cambiar de identidad.
+    __slots__ = ('copy_id', 'book', 'status', '_status_listeners', '_store', '_row')
+    
     def __init__(self, copy_id: str, book: Book):
         self.copy_id = copy_id
         self.book = book
         self.status = CopyStatus.AVAILABLE
+        self._status_listeners: List[Callable[['BookCopy', CopyStatus], None]] = []
     
     def get_id(self) -> str:
         return self.copy_id
@@ -61,12 +165,318 @@ class BookCopy:
         return self.status
     
     def set_status(self, status: CopyStatus) -> None:
+        previous = self.status
         self.status = status
+        if previous != status:
+            for listener in self._status_listeners:
+                listener(self, previous)
+    
+    def add_status_listener(self, listener: Callable[['BookCopy', CopyStatus], None]) -> None:
+        """Registra una función que se llama con (copia, estado anterior) en cada cambio."""
+        self._status_listeners.append(listener)
     
     def is_available(self) -> bool:
         return self.status == CopyStatus.AVAILABLE
 
 
+class _CopyView(BookCopy):
+    """Vista ligera de una fila de CompactCopyStore con la interfaz de BookCopy.
+    
+    La fila es la única fuente de verdad: las vistas no guardan estado propio,
+    así que todas las de una misma fila (incluida la copia original que se
+    agregó al almacén) ven y hacen los mismos cambios.
+    """
+    
+    __slots__ = ()
+    
+    def __init__(self, store: 'CompactCopyStore', row: int):
+        self._store = store
+        self._row = row
+    
+    @property
+    def copy_id(self) -> str:
+        return self._store._ids[self._row]
+    
+    @property
+    def book(self) -> Book:
+        return self._store._books[self._store._book_refs[self._row]]
+    
+    @property
+    def status(self) -> CopyStatus:
+        return CompactCopyStore.STATUSES[self._store._statuses[self._row]]
+    
+    def set_status(self, status: CopyStatus) -> None:
+        self._store.set_status(self._row, status)
+    
+    def add_status_listener(self, listener: Callable[[BookCopy, CopyStatus], None]) -> None:
+        self._store._copy_listeners.setdefault(self._row, []).append(listener)
+    
+    def __eq__(self, other: object) -> bool:
+        return (isinstance(other, _CopyView) and other._store is self._store
+                and other._row == self._row)
+    
+    def __hash__(self) -> int:
+        return hash((id(self._store), self._row))
+
+
+class CompactCopyStore:
+    """Almacén columnar de copias: ids internados, libros por índice y estados en uint8."""
+    
+    STATUSES: List[CopyStatus] = list(CopyStatus)
+    STATUS_CODES: Dict[CopyStatus, int] = {status: code for code, status in enumerate(CopyStatus)}
+    _IN_CIRCULATION = frozenset({CopyStatus.BORROWED, CopyStatus.DELAYED, CopyStatus.RESERVED})
+    
+    def __init__(self):
+        self._ids: List[str] = []
+        self._books: List[Book] = []
+        self._book_rows: Dict[Book, int] = {}
+        self._book_refs = array('I')
+        self._statuses = array('B')
+        self._row_listeners: List[Callable[[int, BookCopy, CopyStatus], None]] = []
+        self._copy_listeners: Dict[int, List[Callable[[BookCopy, CopyStatus], None]]] = {}
+    
+    def append(self, copy: BookCopy) -> int:
+        """Guarda la copia como una fila nueva y devuelve su posición.
+        
+        Un BookCopy común pasa a ser una vista de la fila: desde ahí sus
+        lecturas y cambios de estado van a la fila, igual que los de
+        ``store[row]``, y es igual (==, hash) a cualquier otra vista de ella.
+        Por eso no se aceptan copias prestadas, atrasadas o reservadas: ya son
+        clave de préstamos y reservas, y con el hash nuevo se perderían ahí.
+        """
+        if type(copy) is BookCopy and copy.get_status() in self._IN_CIRCULATION:
+            raise ValueError(f"Copy {copy.get_id()} is {copy.get_status().value}; "
+                             "return it before adding it to a compact store")
+        row = self.append_row(copy.get_id(), copy.get_book(), copy.get_status())
+        if type(copy) is BookCopy:
+            listeners = copy._status_listeners
+            del copy.copy_id, copy.book, copy.status, copy._status_listeners
+            copy.__class__ = _CopyView
+            copy._store = self
+            copy._row = row
+            if listeners:
+                self._copy_listeners.setdefault(row, []).extend(listeners)
+        return row
+    
+    def append_row(self, copy_id: str, book: Book, status: CopyStatus) -> int:
+        """Guarda una fila sin necesidad de construir un BookCopy."""
+        book_row = self._book_rows.get(book)
+        if book_row is None:
+            book_row = self._book_rows[book] = len(self._books)
+            self._books.append(book)
+        row = len(self._ids)
+        self._ids.append(sys.intern(copy_id))
+        self._book_refs.append(book_row)
+        self._statuses.append(self.STATUS_CODES[status])
+        return row
+    
+    def set_status(self, row: int, status: CopyStatus) -> None:
+        previous = self.STATUSES[self._statuses[row]]
+        if previous == status:
+            return
+        self._statuses[row] = self.STATUS_CODES[status]
+        view = _CopyView(self, row)
+        for listener in self._row_listeners:
+            listener(row, view, previous)
+        for listener in self._copy_listeners.get(row, ()):
+            listener(view, previous)
+    
+    def add_row_listener(self, listener: Callable[[int, BookCopy, CopyStatus], None]) -> None:
+        """Registra una función que se llama con (fila, copia, estado anterior)."""
+        self._row_listeners.append(listener)
+    
+    def export_columns(self, start: int = 0) -> Tuple[array, array]:
+        """Copia de las columnas (referencia al libro, código de estado) desde ``start``."""
+        return self._book_refs[start:], self._statuses[start:]
+    
+    def _status_bytes(self) -> bytes:
+        return self._statuses.tobytes()
+    
+    def rows_with_status(self, status: CopyStatus) -> List[int]:
+        """Filas de las copias en ese estado, buscando el código en la columna de estados."""
+        statuses = self._status_bytes()
+        code = bytes([self.STATUS_CODES[status]])
+        rows = []
+        row = statuses.find(code)
+        while row != -1:
+            rows.append(row)
+            row = statuses.find(code, row + 1)
+        return rows
+    
+    def iter_statuses(self) -> Iterator[Tuple[int, str, int]]:
+        """(fila, copy_id, código de estado) de cada copia, en orden."""
+        ids, statuses = self._ids, self._statuses
+        for row in range(len(self)):
+            yield row, ids[row], statuses[row]
+    
+    def book_count(self) -> int:
+        return len(self._books)
+    
+    def book_at(self, book_ref: int) -> Book:
+        """Libro al que apunta una referencia de export_columns()."""
+        return self._books[book_ref]
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+    def __getitem__(self, row: int) -> BookCopy:
+        if row < 0:
+            row += len(self._ids)
+        if not 0 <= row < len(self._ids):
+            raise IndexError("copy index out of range")
+        return _CopyView(self, row)
+    
+    def __iter__(self) -> Iterator[BookCopy]:
+        for row in range(len(self._ids)):
+            yield _CopyView(self, row)
+
+
+class _AuthorBooks:
+    """Libros distintos de un autor en orden de alta; la lista solo crece.
+    
+    El ordinal de un libro (su índice en ``books``) no cambia, así que un
+    cursor de paginación retoma directo desde ahí aunque se agreguen libros.
+    """
+    __slots__ = ('books', '_keys')
+    
+    def __init__(self):
+        self.books: List[Book] = []
+        self._keys: Set[Tuple[str, int]] = set()
+    
+    def add(self, book: Book) -> None:
+        key = (book.get_title(), book.get_year())
+        if key not in self._keys:
+            self._keys.add(key)
+            self.books.append(book)
+
+
+class _AvailabilityPool:
+    """Posiciones de las copias disponibles de un mismo (título, año), en orden de catálogo."""
+    
+    def __init__(self, available: Sequence[int] = ()):
+        # ``available`` viene ordenado, así que ya es un heap válido.
+        self._available: Set[int] = set(available)
+        self._heap: List[int] = list(available)
+        self._lock = threading.Lock()
+    
+    def release(self, position: int) -> None:
+        with self._lock:
+            if position in self._available:
+                return
+            self._available.add(position)
+            heapq.heappush(self._heap, position)
+            if len(self._heap) > 2 * len(self._available) + 16:
+                # Demasiadas entradas obsoletas: se reconstruye el heap.
+                self._heap = sorted(self._available)
+    
+    def acquire(self, position: int) -> None:
+        with self._lock:
+            self._available.discard(position)
+    
+    def peek(self) -> Optional[int]:
+        with self._lock:
+            heap = self._heap
+            # Las entradas de copias que ya no están disponibles se descartan aquí.
+            while heap and heap[0] not in self._available:
+                heapq.heappop(heap)
+            return heap[0] if heap else None
+    
+    def __len__(self) -> int:
+        return len(self._available)
+
+
+class _ResultCache:
+    """Caché LRU de resultados por autor, con contadores de aciertos y fallos.
+    
+    Cada autor tiene un número de versión que sube al invalidarlo; un
+    resultado calculado con una versión vieja no se guarda.
+    """
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Tuple[str, str], tuple]' = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._kinds: Set[str] = set()
+        self._lock = threading.Lock()
+    
+    def get(self, kind: str, author_key: str) -> Tuple[Optional[tuple], int]:
+        """Devuelve (resultado o None, versión actual del autor)."""
+        with self._lock:
+            entry = self._entries.get((kind, author_key))
+            if entry is None:
+                self.misses += 1
+                return None, self._versions.get(author_key, 0)
+            self.hits += 1
+            self._entries.move_to_end((kind, author_key))
+            return entry, 0
+    
+    def put(self, kind: str, author_key: str, version: int, result: tuple) -> None:
+        with self._lock:
+            if self._versions.get(author_key, 0) != version:
+                return
+            self._kinds.add(kind)
+            self._entries[(kind, author_key)] = result
+            self._entries.move_to_end((kind, author_key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, author_key: str) -> None:
+        with self._lock:
+            self._versions[author_key] = self._versions.get(author_key, 0) + 1
+            for kind in self._kinds:
+                self._entries.pop((kind, author_key), None)
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "max_entries": self.max_entries}
+
+
+CatalogSource = Union[str, os.PathLike, IO[str], Iterable[Union[str, Dict[str, str]]]]
+
+
+def _iter_catalog_rows(source: CatalogSource, fmt: str) -> Iterator[Dict[str, str]]:
+    """Recorre las filas de un archivo, un archivo abierto o un iterador, sin cargarlas todas."""
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported format: {fmt}")
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8") as handle:
+            yield from _iter_catalog_rows(handle, fmt)
+        return
+    lines = iter(source)
+    first = next(lines, None)
+    if first is None:
+        return
+    lines = chain([first], lines)
+    if isinstance(first, dict):
+        yield from lines
+    elif fmt == "csv":
+        yield from csv.DictReader(lines)
+    else:
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+
+
+ScanSource = Union[str, os.PathLike, IO[str], Iterable[str]]
+
+
+def _iter_scanned_ids(source: ScanSource) -> Iterator[str]:
+    """Ids leídos de un archivo (uno por línea), un archivo abierto o un iterador."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as handle:
+            yield from _iter_scanned_ids(handle)
+        return
+    for line in source:
+        copy_id = line.strip()
+        if copy_id:
+            yield copy_id
+
+
 class Reader:
     
     MAX_BORROWED_BOOKS = 3
@@ -75,8 +485,18 @@ class Reader:
     def __init__(self, name: str, email: str):
         self.name = name
         self.email = email
-        self.borrowed_books: List[BookCopy] = []
+        # Conjunto ordenado por orden de préstamo: pertenencia y devolución en O(1).
+        self.borrowed_books: Dict[BookCopy, None] = {}
         self.penalty_days = 0
+        self._listeners: List[Callable[['Reader', ReaderEvent, object], None]] = []
+    
+    def add_listener(self, listener: Callable[['Reader', ReaderEvent, object], None]) -> None:
+        """Registra una función que se llama con (lector, evento, copia o días de multa)."""
+        self._listeners.append(listener)
+    
+    def _notify(self, event: ReaderEvent, value: object) -> None:
+        for listener in self._listeners:
+            listener(self, event, value)
     
     def can_borrow(self) -> bool:
         """Verifica si el lector puede pedir prestado un libro."""
@@ -85,24 +505,39 @@ class Reader:
     def borrow_book(self, copy: BookCopy) -> bool:
         """Intenta pedir prestado un libro."""
         if self.can_borrow() and copy.is_available():
-            self.borrowed_books.append(copy)
-            copy.set_status(CopyStatus.BORROWED)
+            self._take(copy)
             return True
         return False
     
     def return_book(self, copy: BookCopy) -> None:
         """Devuelve un libro prestado."""
         if copy in self.borrowed_books:
-            self.borrowed_books.remove(copy)
-            copy.set_status(CopyStatus.AVAILABLE)
+            self._release(copy)
+    
+    def _take(self, copy: BookCopy) -> None:
+        self.borrowed_books[copy] = None
+        copy.set_status(CopyStatus.BORROWED)
+        self._notify(ReaderEvent.BORROW, copy)
+    
+    def _add_loan(self, copy: BookCopy) -> None:
+        """Anota el préstamo de una copia que ya quedó BORROWED por otro camino."""
+        self.borrowed_books[copy] = None
+        self._notify(ReaderEvent.BORROW, copy)
+    
+    def _release(self, copy: BookCopy, status: CopyStatus = CopyStatus.AVAILABLE) -> None:
+        del self.borrowed_books[copy]
+        copy.set_status(status)
+        self._notify(ReaderEvent.RETURN, copy)
     
     def add_penalty(self, delay_days: int) -> None:
         """Agrega días de multa (2 días de multa por cada día de retraso)."""
         self.penalty_days += delay_days * self.PENALTY_MULTIPLIER
+        self._notify(ReaderEvent.PENALTY, self.penalty_days)
     
     def reduce_penalty(self, days: int) -> None:
         """Reduce días de multa."""
         self.penalty_days = max(0, self.penalty_days - days)
+        self._notify(ReaderEvent.PENALTY, self.penalty_days)
     
     def get_name(self) -> str:
         return self.name
@@ -111,7 +546,13 @@ class Reader:
         return self.email
     
     def get_borrowed_books(self) -> List[BookCopy]:
-        return self.borrowed_books.copy()
+        return list(self.borrowed_books)
+    
+    def has_borrowed(self, copy: BookCopy) -> bool:
+        return copy in self.borrowed_books
+    
+    def borrowed_count(self) -> int:
+        return len(self.borrowed_books)
     
     def get_penalty_days(self) -> int:
         return self.penalty_days
@@ -124,7 +565,13 @@ class BioAlert:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(BioAlert, cls).__new__(cls)
-            cls._instance.subscriptions: Dict[str, List[str]] = {}
+            # Conjuntos ordenados por inserción: título -> {email: None} y su inverso.
+            cls._instance.subscriptions: Dict[str, Dict[str, None]] = {}
+            cls._instance._titles_by_email: Dict[str, Dict[str, None]] = {}
+            # (título, email) -> instante de la última suscripción, del más antiguo al más nuevo.
+            cls._instance._subscribed_at: Dict[Tuple[str, str], float] = {}
+            cls._instance.subscription_ttl: Optional[float] = None
+            cls._instance.dispatcher: Optional['NotificationDispatcher'] = None
         return cls._instance
     
     @classmethod
@@ -133,85 +580,1138 @@ class BioAlert:
             cls._instance = BioAlert()
         return cls._instance
     
-    def subscribe(self, book_title: str, email: str) -> None:
-        if book_title not in self.subscriptions:
-            self.subscriptions[book_title] = []
-        if email not in self.subscriptions[book_title]:
-            self.subscriptions[book_title].append(email)
+    def subscribe(self, book_title: str, email: str, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self.subscriptions.setdefault(book_title, {})[email] = None
+        self._titles_by_email.setdefault(email, {})[book_title] = None
+        key = (book_title, email)
+        self._subscribed_at.pop(key, None)
+        self._subscribed_at[key] = now
+        if self.subscription_ttl is not None:
+            self.expire_stale(now)
+    
+    def subscribe_many(self, book_title: str, emails: Iterable[str]) -> None:
+        now = time.time()
+        for email in emails:
+            self.subscribe(book_title, email, now)
+    
+    def unsubscribe(self, book_title: str, email: str) -> bool:
+        """Quita una suscripción; devuelve False si no existía."""
+        emails = self.subscriptions.get(book_title)
+        if emails is None or email not in emails:
+            return False
+        del emails[email]
+        if not emails:
+            del self.subscriptions[book_title]
+        titles = self._titles_by_email[email]
+        del titles[book_title]
+        if not titles:
+            del self._titles_by_email[email]
+        del self._subscribed_at[(book_title, email)]
+        return True
+    
+    def unsubscribe_all(self, email: str) -> List[str]:
+        """Quita todas las suscripciones de un email y devuelve sus títulos."""
+        titles = list(self._titles_by_email.get(email, ()))
+        for book_title in titles:
+            self.unsubscribe(book_title, email)
+        return titles
+    
+    def get_subscriptions(self, email: str) -> List[str]:
+        return list(self._titles_by_email.get(email, ()))
+    
+    def set_subscription_ttl(self, seconds: Optional[float]) -> None:
+        """Hace que las suscripciones más viejas que ``seconds`` caduquen (None desactiva)."""
+        self.subscription_ttl = seconds
+    
+    def expire_stale(self, now: Optional[float] = None) -> int:
+        """Elimina las suscripciones caducadas y devuelve cuántas fueron."""
+        if self.subscription_ttl is None:
+            return 0
+        cutoff = (time.time() if now is None else now) - self.subscription_ttl
+        expired = []
+        for key, subscribed_at in self._subscribed_at.items():
+            if subscribed_at > cutoff:
+                break
+            expired.append(key)
+        for book_title, email in expired:
+            self.unsubscribe(book_title, email)
+        return len(expired)
+    
+    def set_dispatcher(self, dispatcher: Optional['NotificationDispatcher']) -> None:
+        """Envía los avisos en segundo plano con el dispatcher (None vuelve al envío directo)."""
+        self.dispatcher = dispatcher
     
     def notify_availability(self, book_title: str) -> List[str]:
-        emails = self.subscriptions.get(book_title, [])
+        emails = list(self.subscriptions.get(book_title, ()))
+        if self.dispatcher is not None:
+            for email in emails:
+                self.dispatcher.submit(email, book_title)
+            return emails
         for email in emails:
             self._send_email(email, book_title)
         return emails
     
+    def notify_availability_many(self, book_titles: Iterable[str]) -> Dict[str, List[str]]:
+        """Avisa de varios títulos a la vez (sin repetir títulos)."""
+        return {title: self.notify_availability(title) for title in dict.fromkeys(book_titles)}
+    
+    def notify_hold(self, book_title: str, email: str) -> None:
+        """Avisa solo a ``email`` que tiene una copia reservada de ``book_title``."""
+        if self.dispatcher is not None:
+            self.dispatcher.submit(email, book_title)
+        else:
+            self._send_email(email, book_title)
+    
     def _send_email(self, email: str, book_title: str) -> None:
         print(f"Email sent to {email}: '{book_title}' is now available")
     
     def is_subscribed(self, book_title: str, email: str) -> bool:
-        return email in self.subscriptions.get(book_title, [])
+        return email in self.subscriptions.get(book_title, ())
     
     def get_subscribers(self, book_title: str) -> List[str]:
-        return self.subscriptions.get(book_title, []).copy()
+        return list(self.subscriptions.get(book_title, ()))
+
+
+class _Loan:
+    """Préstamo abierto: lector, copia, vencimiento y días de retraso ya cobrados."""
+    
+    __slots__ = ('reader', 'copy', 'due', 'charged_days')
+    
+    def __init__(self, reader: Reader, copy: BookCopy, due: float, charged_days: int = 0):
+        self.reader = reader
+        self.copy = copy
+        self.due = due
+        self.charged_days = charged_days
+
+
+class _Hold:
+    """Copia reservada para un lector hasta ``expires``."""
+    
+    __slots__ = ('reader', 'copy', 'expires')
+    
+    def __init__(self, reader: Reader, copy: BookCopy, expires: float):
+        self.reader = reader
+        self.copy = copy
+        self.expires = expires
+
+
+# Estado previo de un lote: préstamos del lector y (estado, préstamo, reserva) por copia.
+_BatchState = Tuple[Dict[BookCopy, None],
+                    Dict[BookCopy, Tuple[CopyStatus, Optional[_Loan], Optional[_Hold]]]]
+
+
+class _HoldQueue:
+    """Lectores que esperan un mismo (título, año), en orden de llegada.
+    
+    Cancelar es O(1): el lector sale de ``_waiting`` y su entrada en la cola
+    se descarta al llegar al frente.
+    """
+    
+    def __init__(self):
+        self._entries: Deque[Tuple[int, Reader]] = deque()
+        self._waiting: Dict[Reader, int] = {}
+        self._tickets = count()
+    
+    def add(self, reader: Reader) -> bool:
+        if reader in self._waiting:
+            return False
+        ticket = self._waiting[reader] = next(self._tickets)
+        self._entries.append((ticket, reader))
+        return True
+    
+    def remove(self, reader: Reader) -> bool:
+        return self._waiting.pop(reader, None) is not None
+    
+    def put_back(self, reader: Reader) -> None:
+        """Devuelve al frente de la cola a un lector cuya reserva se deshizo."""
+        if reader in self._waiting:
+            return
+        ticket = self._entries[0][0] - 1 if self._entries else next(self._tickets)
+        self._waiting[reader] = ticket
+        self._entries.appendleft((ticket, reader))
+    
+    def pop_eligible(self, is_eligible: Callable[[Reader], bool]) -> Optional[Reader]:
+        """Saca al primer lector que cumple ``is_eligible``; los salteados conservan su lugar."""
+        entries = self._entries
+        skipped = []
+        chosen = None
+        while entries:
+            ticket, reader = entries.popleft()
+            if self._waiting.get(reader) != ticket:
+                continue
+            if is_eligible(reader):
+                del self._waiting[reader]
+                chosen = reader
+                break
+            skipped.append((ticket, reader))
+        entries.extendleft(reversed(skipped))
+        return chosen
+    
+    def position(self, reader: Reader) -> Optional[int]:
+        ticket = self._waiting.get(reader)
+        if ticket is None:
+            return None
+        return sum(1 for entry_ticket, entry_reader in self._entries
+                   if entry_ticket < ticket and self._waiting.get(entry_reader) == entry_ticket)
+    
+    def __len__(self) -> int:
+        return len(self._waiting)
 
 
 class Library:
     
     MAX_LOAN_DAYS = 30
+    HOLD_DAYS = 3
+    DAY_SECONDS = 86400
     
-    def __init__(self):
+    def __init__(self, compact: bool = False, concurrent: bool = False, lock_stripes: int = 64,
+                 cache_size: int = 1024):
         self.books: List[Book] = []
-        self.copies: List[BookCopy] = []
+        self.copies: Union[List[BookCopy], CompactCopyStore] = []
         self.readers: List[Reader] = []
+        # Libros de self.books, para no repetirlos; se arma en el primer uso.
+        self._book_set: Optional[Set[Book]] = set()
+        # email -> posición en self.readers. Con un snapshot abierto se arma
+        # recién en el primer uso, desde los emails guardados.
+        self._reader_rows: Optional[Dict[str, int]] = {}
+        self._reader_emails: Optional[Sequence[str]] = None
         self.bio_alert = BioAlert.get_instance()
+        # Índices secundarios por clave normalizada (en minúsculas). Guardan
+        # posiciones dentro de self.copies, no las copias mismas.
+        self._copies_by_author: Dict[str, array] = {}
+        self._books_by_author: Dict[str, _AuthorBooks] = {}
+        self._pools_by_title_year: Dict[Tuple[str, int], _AvailabilityPool] = {}
+        # Las copias en posiciones >= _indexed_upto todavía no están en los índices.
+        self._indexed_upto = 0
+        self._index_lock = threading.Lock()
+        self._journal = None
+        self._search: Optional['SearchIndex'] = None
+        # Resultados de get_all_books_by_author y list_copies_details por autor
+        # (cache_size=0 lo desactiva).
+        self._cache = _ResultCache(cache_size) if cache_size > 0 else None
+        self._stats: Optional['InventoryStats'] = None
+        # Préstamos abiertos y un heap (vencimiento, secuencia, préstamo) con
+        # borrado perezoso: las entradas de préstamos ya cerrados se descartan
+        # al salir del heap.
+        self.clock: Callable[[], float] = time.time
+        self._loans: Dict[BookCopy, _Loan] = {}
+        self._due_heap: List[Tuple[float, int, _Loan]] = []
+        self._loan_sequence = count()
+        self._loan_lock = threading.Lock()
+        self._loan_loader: Optional[Callable[[], None]] = None
+        # Colas de reserva por (título, año) y copias reservadas esperando a
+        # su lector, con un heap (vencimiento, secuencia, reserva) de borrado
+        # perezoso como el de los préstamos.
+        self._hold_queues: Dict[Tuple[str, int], _HoldQueue] = {}
+        self._holds: Dict[BookCopy, _Hold] = {}
+        # Copias reservadas de cada lector, en el orden en que se reservaron.
+        self._holds_by_reader: Dict[Reader, Dict[BookCopy, None]] = {}
+        self._hold_heap: List[Tuple[float, int, _Hold]] = []
+        self._hold_sequence = count()
+        self._hold_lock = threading.RLock()
+        # En modo concurrente los préstamos y devoluciones toman el candado del
+        # lector y luego el de la copia; cada uno sale de un arreglo de candados
+        # repartidos por hash, así que operaciones no relacionadas no se bloquean.
+        # Los de copia son reentrantes: _hand_off los toma y también corre
+        # dentro de una devolución que ya los tiene.
+        self.concurrent = concurrent
+        self._reader_locks = [threading.Lock() for _ in range(lock_stripes if concurrent else 0)]
+        self._copy_locks = [threading.RLock() for _ in range(lock_stripes if concurrent else 0)]
+        if compact:
+            self._use_store(CompactCopyStore())
     
-    def add_book(self, book: Book) -> None:
+    def _use_store(self, store: CompactCopyStore) -> None:
+        self.copies = store
+        store.add_row_listener(self._on_copy_status_change)
+    
+    _normalize = staticmethod(normalize_key)
+    
+    def _register_book(self, book: Book) -> bool:
+        """Agrega el libro a self.books si no estaba; devuelve si era nuevo."""
+        if self._book_set is None:
+            self._book_set = set(self.books)
+        if book in self._book_set:
+            return False
+        self._book_set.add(book)
         self.books.append(book)
+        return True
+    
+    def add_book(self, book: Book) -> None:
+        if not self._register_book(book):
+            return
+        self._invalidate_author(book)
+        if self._search is not None:
+            self._search.add_book(book)
     
     def add_copy(self, copy: BookCopy) -> None:
         self.copies.append(copy)
+        self._sync_indexes()
+    
+    def _sync_indexes(self) -> None:
+        """Indexa las copias agregadas desde la última sincronización."""
+        copies = self.copies
+        if self._indexed_upto == len(copies):
+            return
+        with self._index_lock:
+            for position in range(self._indexed_upto, len(copies)):
+                self._index_copy(position, copies[position])
+                self._indexed_upto = position + 1
+    
+    def _index_copy(self, position: int, copy: BookCopy) -> None:
+        """Registra la copia en los índices por autor y por (título, año)."""
+        if not isinstance(self.copies, CompactCopyStore):
+            copy.add_status_listener(partial(self._on_copy_status_change, position))
+        book = copy.get_book()
+        author_key = book.get_author().key
+        if author_key not in self._copies_by_author:
+            self._copies_by_author[author_key] = array('I')
+        self._copies_by_author[author_key].append(position)
+        books = self._books_by_author.get(author_key)
+        if books is None:
+            books = self._books_by_author[author_key] = _AuthorBooks()
+        books.add(book)
+        pool = self._pools_by_title_year.setdefault(self._title_key(book), _AvailabilityPool())
+        if copy.is_available():
+            pool.release(position)
+        if self._search is not None:
+            self._search.add_book(book)
+        if self._cache is not None:
+            self._cache.invalidate(author_key)
+    
+    def _invalidate_author(self, book: Book) -> None:
+        if self._cache is not None:
+            self._cache.invalidate(book.get_author().key)
+    
+    def bulk_load(self, source: CatalogSource, fmt: str = "csv", chunk_size: int = 10000,
+                  progress: Optional[Callable[[int, float], None]] = None) -> Dict[str, float]:
+        """Carga autores, libros y copias desde CSV o JSONL procesando por bloques.
+        
+        Cada fila trae author, birth_date, title, year, copy_id y opcionalmente
+        status. Autores y libros repetidos se reutilizan, y los índices se
+        construyen una sola vez al final. ``progress`` recibe (filas, filas/s)
+        tras cada bloque.
+        """
+        started = time.perf_counter()
+        authors: Dict[Tuple[str, str], Author] = {}
+        books: Dict[Tuple[str, int, Tuple[str, str]], Book] = {}
+        for book in self.books:
+            author = book.get_author()
+            author_key = (author.get_name(), author.get_birth_date())
+            authors.setdefault(author_key, author)
+            books.setdefault((book.get_title(), book.get_year(), author_key), book)
+        compact = isinstance(self.copies, CompactCopyStore)
+        rows = 0
+        try:
+            reader = _iter_catalog_rows(source, fmt)
+            while True:
+                chunk = list(islice(reader, chunk_size))
+                if not chunk:
+                    break
+                for row in chunk:
+                    author_key = (row["author"], row["birth_date"])
+                    author = authors.get(author_key)
+                    if author is None:
+                        author = authors[author_key] = Author(*author_key)
+                    year = int(row["year"])
+                    book_key = (row["title"], year, author_key)
+                    book = books.get(book_key)
+                    if book is None:
+                        book = books[book_key] = Book(row["title"], year, author)
+                        self._register_book(book)
+                    status = CopyStatus(row.get("status") or CopyStatus.AVAILABLE.value)
+                    if compact:
+                        self.copies.append_row(row["copy_id"], book, status)
+                    else:
+                        copy = BookCopy(row["copy_id"], book)
+                        copy.status = status
+                        self.copies.append(copy)
+                rows += len(chunk)
+                if progress is not None:
+                    progress(rows, rows / max(time.perf_counter() - started, 1e-9))
+        finally:
+            self._sync_indexes()
+        elapsed = time.perf_counter() - started
+        return {
+            "rows": rows,
+            "authors": len(authors),
+            "books": len(books),
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed if elapsed > 0 else float(rows),
+        }
+    
+    def save_snapshot(self, path: Union[str, os.PathLike]) -> None:
+        """Guarda libros, copias, lectores y suscripciones en un snapshot binario."""
+        from library_snapshot import save_snapshot
+        save_snapshot(self, path)
+    
+    @classmethod
+    def open_snapshot(cls, path: Union[str, os.PathLike], writable: bool = False) -> 'Library':
+        """Abre un snapshot mapeado en memoria; los objetos se crean al accederlos.
+        
+        Con ``writable=True`` los cambios de estado de las copias y de días de
+        multa se escriben directamente en el archivo. Los índices vienen en el
+        snapshot y cada autor o (título, año) se carga en su primera consulta.
+        """
+        from library_snapshot import load_snapshot
+        library = cls()
+        store, books, readers, emails, subscriptions, loans = load_snapshot(
+            path, writable, library._on_reader_event)
+        library._use_store(store)
+        library.books = books
+        library._book_set = None
+        library.readers = readers
+        library._reader_rows, library._reader_emails = None, emails
+        for book_title, email in subscriptions:
+            library.bio_alert.subscribe(book_title, email)
+        # Los vencimientos se cargan recién cuando se consultan los préstamos;
+        # los préstamos hechos después de abrir el snapshot no se pisan.
+        library._loan_loader = lambda: [library._start_loan(*loan) for loan in loans()
+                                        if loan[1] not in library._loans]
+        # Los índices guardados se cargan por clave; solo las copias que se
+        # agreguen después de abrir pasan por _sync_indexes.
+        library._copies_by_author, library._books_by_author, library._pools_by_title_year = \
+            store.lazy_indexes()
+        library._indexed_upto = len(store)
+        library._release_orphaned_reservations()
+        return library
+    
+    @staticmethod
+    def open_database(path: Union[str, os.PathLike], **options: object) -> 'SqliteLibrary':
+        """Abre (o crea) una biblioteca guardada en un archivo SQLite; ver library_storage."""
+        from library_storage import SqliteLibrary
+        return SqliteLibrary(path, **options)
+    
+    def _title_key(self, book: Book) -> Tuple[str, int]:
+        return book.title_key
+    
+    def _on_copy_status_change(self, position: int, copy: BookCopy, previous: CopyStatus) -> None:
+        if self._journal is not None:
+            self._journal.record_status(copy)
+        if self._stats is not None:
+            self._stats.on_status_change(position, copy)
+        if position >= self._indexed_upto:
+            return
+        self._invalidate_author(copy.get_book())
+        pool = self._pools_by_title_year[self._title_key(copy.get_book())]
+        if copy.is_available():
+            pool.release(position)
+        elif previous == CopyStatus.AVAILABLE:
+            pool.acquire(position)
+    
+    def _reader_index(self) -> Dict[str, int]:
+        if self._reader_rows is None:
+            emails = self._reader_emails
+            self._reader_rows = {emails[row]: row for row in range(len(emails))}
+            self._reader_emails = None
+        return self._reader_rows
     
     def register_reader(self, reader: Reader) -> None:
+        """Registra al lector; su email no puede estar ya registrado."""
+        rows = self._reader_index()
+        if reader.get_email() in rows:
+            raise ValueError(f"Reader {reader.get_email()} is already registered")
+        rows[reader.get_email()] = len(self.readers)
         self.readers.append(reader)
+        reader.add_listener(self._on_reader_event)
+        if self._journal is not None:
+            self._journal.record_registration(reader)
+    
+    def _on_reader_event(self, reader: Reader, event: ReaderEvent, value: object) -> None:
+        due = None
+        if event == ReaderEvent.BORROW:
+            due = self._start_loan(reader, value)
+        elif event == ReaderEvent.RETURN:
+            with self._loan_lock:
+                self._loans.pop(value, None)
+        if self._journal is not None:
+            self._journal.record_reader_event(reader, event, value, due)
+        if event == ReaderEvent.RETURN and self._hold_queues:
+            self._hand_off(value)
+    
+    def get_reader(self, email: str) -> Optional[Reader]:
+        row = self._reader_index().get(email)
+        return self.readers[row] if row is not None else None
+    
+    def get_borrower(self, copy: BookCopy) -> Optional[Reader]:
+        """Lector que tiene prestada la copia, o None."""
+        self._load_pending_loans()
+        loan = self._loans.get(copy)
+        return loan.reader if loan is not None else None
+    
+    def _start_loan(self, reader: Reader, copy: BookCopy, due: Optional[float] = None,
+                    charged_days: int = 0) -> float:
+        if due is None:
+            due = self.clock() + self.MAX_LOAN_DAYS * self.DAY_SECONDS
+        loan = _Loan(reader, copy, due, charged_days)
+        with self._loan_lock:
+            self._loans[copy] = loan
+            heapq.heappush(self._due_heap, (due, next(self._loan_sequence), loan))
+        return due
+    
+    def _load_pending_loans(self) -> None:
+        loader, self._loan_loader = self._loan_loader, None
+        if loader is not None:
+            loader()
+    
+    def _record_charge(self, copy: BookCopy, days: int) -> None:
+        """Registra los días ya cobrados de un préstamo; solo se llama cuando cambian."""
+        if self._journal is not None:
+            self._journal.record_charge(copy, days)
+    
+    def _set_charged_days(self, copy: BookCopy, days: int) -> None:
+        loan = self._loans.get(copy)
+        if loan is not None:
+            loan.charged_days = days
+    
+    def get_loan_due(self, copy: BookCopy) -> Optional[float]:
+        """Instante (timestamp) en que vence el préstamo de la copia, o None."""
+        self._load_pending_loans()
+        loan = self._loans.get(copy)
+        return loan.due if loan is not None else None
+    
+    def process_overdue(self, now: Optional[float] = None) -> List[BookCopy]:
+        """Marca como DELAYED los préstamos vencidos y cobra las multas de los días nuevos.
+        
+        Solo recorre los préstamos cuyo próximo cobro ya llegó. Cada día completo
+        de retraso suma una multa con Reader.add_penalty. Devuelve las copias
+        que pasaron a DELAYED en esta llamada.
+        """
+        self._load_pending_loans()
+        now = self.clock() if now is None else now
+        expired = []
+        with self._loan_lock:
+            while self._due_heap and self._due_heap[0][0] <= now:
+                expired.append(heapq.heappop(self._due_heap)[2])
+        delayed = []
+        for loan in expired:
+            with self._locks_for(loan.reader, loan.copy):
+                if self._loans.get(loan.copy) is not loan:
+                    continue
+                days_late = int((now - loan.due) // self.DAY_SECONDS)
+                if loan.copy.get_status() != CopyStatus.DELAYED:
+                    loan.copy.set_status(CopyStatus.DELAYED)
+                    delayed.append(loan.copy)
+                if days_late > loan.charged_days:
+                    loan.reader.add_penalty(days_late - loan.charged_days)
+                    loan.charged_days = days_late
+                    self._record_charge(loan.copy, days_late)
+            with self._loan_lock:
+                if self._loans.get(loan.copy) is loan:
+                    next_charge = loan.due + (loan.charged_days + 1) * self.DAY_SECONDS
+                    heapq.heappush(self._due_heap, (next_charge, next(self._loan_sequence), loan))
+        return delayed
+    
+    def place_hold(self, reader: Reader, title: str, year: int) -> bool:
+        """Pone al lector en la cola de reserva del libro; False si ya estaba.
+        
+        Si hay una copia disponible se reserva en el momento para el primero
+        de la cola que pueda llevarla.
+        """
+        key = (self._normalize(title), year)
+        with self._hold_lock:
+            queue = self._hold_queues.get(key)
+            if queue is None:
+                queue = self._hold_queues[key] = _HoldQueue()
+            if not queue.add(reader):
+                return False
+        copy = self.find_available_copy(title, year)
+        if copy is not None:
+            self._hand_off(copy)
+        return True
+    
+    def cancel_hold(self, reader: Reader, title: str, year: int) -> bool:
+        """Saca al lector de la cola y libera la copia que tuviera reservada de ese libro."""
+        key = (self._normalize(title), year)
+        with self._hold_lock:
+            queue = self._hold_queues.get(key)
+            cancelled = queue is not None and queue.remove(reader)
+            held = [copy for copy in self._holds_by_reader.get(reader, ())
+                    if self._title_key(copy.get_book()) == key]
+            for copy in held:
+                self._end_hold(copy)
+        for copy in held:
+            self._hand_off(copy)
+        return cancelled or bool(held)
+    
+    def hold_position(self, reader: Reader, title: str, year: int) -> Optional[int]:
+        """Lectores delante en la cola (0 es el primero), o None si no está en ella."""
+        queue = self._hold_queues.get((self._normalize(title), year))
+        return queue.position(reader) if queue is not None else None
+    
+    def count_holds(self, title: str, year: int) -> int:
+        queue = self._hold_queues.get((self._normalize(title), year))
+        return len(queue) if queue is not None else 0
+    
+    def get_reserved_copies(self, reader: Reader) -> List[BookCopy]:
+        """Copias reservadas para el lector que todavía no retiró."""
+        with self._hold_lock:
+            return list(self._holds_by_reader.get(reader, ()))
+    
+    def _can_hold(self, reader: Reader) -> bool:
+        """Sin multas y con lugar para una copia más contando las reservas que ya tiene."""
+        return (reader.get_penalty_days() == 0 and
+                len(reader.borrowed_books) + len(self._holds_by_reader.get(reader, ())) < reader.MAX_BORROWED_BOOKS)
+    
+    def _hand_off(self, copy: BookCopy) -> None:
+        """Reserva la copia para el siguiente lector que pueda llevarla, o la deja disponible.
+        
+        Toma el candado de la copia antes que el de reservas, en el mismo orden
+        que borrow_book, para que un préstamo no se cruce con la reserva.
+        """
+        with self._locks_for(None, copy), self._hold_lock:
+            status = copy.get_status()
+            if copy in self._holds or status not in (CopyStatus.AVAILABLE, CopyStatus.RESERVED):
+                return
+            queue = self._hold_queues.get(self._title_key(copy.get_book()))
+            reader = queue.pop_eligible(self._can_hold) if queue is not None else None
+            if reader is None:
+                if status == CopyStatus.RESERVED:
+                    copy.set_status(CopyStatus.AVAILABLE)
+                return
+            hold = _Hold(reader, copy, self.clock() + self.HOLD_DAYS * self.DAY_SECONDS)
+            self._holds[copy] = hold
+            self._holds_by_reader.setdefault(reader, {})[copy] = None
+            heapq.heappush(self._hold_heap, (hold.expires, next(self._hold_sequence), hold))
+            copy.set_status(CopyStatus.RESERVED)
+        # Solo se avisa al lector que recibió la copia, no a todos los suscriptores.
+        self.bio_alert.notify_hold(copy.get_book().get_title(), reader.get_email())
+    
+    def _end_hold(self, copy: BookCopy) -> Optional[_Hold]:
+        hold = self._holds.pop(copy, None)
+        if hold is not None:
+            held = self._holds_by_reader[hold.reader]
+            del held[copy]
+            if not held:
+                del self._holds_by_reader[hold.reader]
+        return hold
+    
+    def _pick_up(self, reader: Reader, copy: BookCopy) -> bool:
+        """Presta una copia reservada, solo al lector que la reservó."""
+        with self._hold_lock:
+            hold = self._holds.get(copy)
+            if hold is None or hold.reader is not reader or not reader.can_borrow():
+                return False
+            self._end_hold(copy)
+            reader._take(copy)
+        return True
+    
+    def process_expired_holds(self, now: Optional[float] = None) -> List[BookCopy]:
+        """Pasa al siguiente de la cola las copias reservadas que nadie retiró a tiempo."""
+        now = self.clock() if now is None else now
+        expired = []
+        with self._hold_lock:
+            while self._hold_heap and self._hold_heap[0][0] <= now:
+                hold = heapq.heappop(self._hold_heap)[2]
+                if self._holds.get(hold.copy) is hold:
+                    self._end_hold(hold.copy)
+                    expired.append(hold.copy)
+        for copy in expired:
+            self._hand_off(copy)
+        return expired
+    
+    def _release_orphaned_reservations(self) -> List[BookCopy]:
+        """Deja AVAILABLE las copias RESERVED que no tienen una reserva en memoria.
+        
+        Las colas de reserva no se guardan en snapshots, journal ni base, así
+        que al cargar una biblioteca sus copias reservadas quedarían sin
+        lector que las retire. Devuelve las copias liberadas.
+        """
+        if isinstance(self.copies, CompactCopyStore):
+            positions = self.copies.rows_with_status(CopyStatus.RESERVED)
+        else:
+            positions = [position for position, copy in enumerate(self.copies)
+                         if copy.get_status() == CopyStatus.RESERVED]
+        released = []
+        for position in positions:
+            copy = self.copies[position]
+            with self._locks_for(None, copy), self._hold_lock:
+                if copy in self._holds or copy.get_status() != CopyStatus.RESERVED:
+                    continue
+                copy.set_status(CopyStatus.AVAILABLE)
+            released.append(copy)
+        return released
+    
+    def _iter_copy_statuses(self) -> Iterator[Tuple[int, str, CopyStatus]]:
+        """(posición, copy_id, estado) de cada copia sin armar objetos BookCopy."""
+        if isinstance(self.copies, CompactCopyStore):
+            statuses = CompactCopyStore.STATUSES
+            for position, copy_id, code in self.copies.iter_statuses():
+                yield position, copy_id, statuses[code]
+        else:
+            for position, copy in enumerate(self.copies):
+                yield position, copy.get_id(), copy.get_status()
+    
+    def reconcile(self, scanned: ScanSource, missing_status: Optional[CopyStatus] = None,
+                  found_status: Optional[CopyStatus] = None) -> Dict[str, object]:
+        """Compara los ids escaneados en un inventario con el catálogo.
+    
+        ``scanned`` es un iterador de ids o un archivo con un id por línea; se
+        lee una sola vez y se guarda como conjunto, y el catálogo se recorre una
+        sola vez contra él. El reporte separa:
+    
+        - missing: copias AVAILABLE o RESERVED que no se escanearon.
+        - on_shelf_while_loaned: copias escaneadas que figuran BORROWED o DELAYED.
+        - unknown: ids escaneados que no están en el catálogo.
+        - duplicate_scans: ids escaneados más de una vez, con la cantidad.
+    
+        Con ``missing_status`` o ``found_status`` las copias de missing o de
+        on_shelf_while_loaned pasan a ese estado al final de la misma pasada.
+        Una copia encontrada con préstamo abierto se devuelve por el camino de
+        return_book, así que el préstamo se cierra sea cual sea el estado
+        nuevo; si queda AVAILABLE pasa a la cola de reservas del libro. Las
+        copias que cambiaron de estado entre la pasada y la corrección no se
+        tocan.
+        """
+        started = time.perf_counter()
+        scans: Dict[str, int] = {}
+        total = 0
+        for copy_id in _iter_scanned_ids(scanned):
+            scans[copy_id] = scans.get(copy_id, 0) + 1
+            total += 1
+        matched: Set[str] = set()
+        missing: List[int] = []
+        found: List[int] = []
+        for position, copy_id, status in self._iter_copy_statuses():
+            if copy_id in scans:
+                matched.add(copy_id)
+                if status in (CopyStatus.BORROWED, CopyStatus.DELAYED):
+                    found.append(position)
+            elif status in (CopyStatus.AVAILABLE, CopyStatus.RESERVED):
+                missing.append(position)
+        copies = self.copies
+        report: Dict[str, object] = {
+            "scanned": total,
+            "matched": len(matched),
+            "missing": [copies[position].get_id() for position in missing],
+            "on_shelf_while_loaned": [copies[position].get_id() for position in found],
+            "unknown": [copy_id for copy_id in scans if copy_id not in matched],
+            "duplicate_scans": {copy_id: times for copy_id, times in scans.items() if times > 1},
+        }
+        corrected = 0
+        if missing_status is not None:
+            for position in missing:
+                corrected += self._correct_missing(copies[position], missing_status)
+        if found_status is not None:
+            for position in found:
+                corrected += self._correct_found(copies[position], found_status)
+        report["corrected"] = corrected
+        report["seconds"] = time.perf_counter() - started
+        return report
+    
+    def _correct_missing(self, copy: BookCopy, status: CopyStatus) -> bool:
+        with self._locks_for(None, copy):
+            if copy.get_status() not in (CopyStatus.AVAILABLE, CopyStatus.RESERVED):
+                return False
+            if self._holds:
+                with self._hold_lock:
+                    self._end_hold(copy)
+            copy.set_status(status)
+        return True
+    
+    def _correct_found(self, copy: BookCopy, status: CopyStatus) -> bool:
+        reader = self.get_borrower(copy)
+        with self._locks_for(reader, copy):
+            if copy.get_status() not in (CopyStatus.BORROWED, CopyStatus.DELAYED):
+                return False
+            if reader is not None and copy in reader.borrowed_books:
+                # El evento RETURN cierra el préstamo y, si queda AVAILABLE, la reserva.
+                reader._release(copy, status)
+            else:
+                copy.set_status(status)
+                if status == CopyStatus.AVAILABLE and self._hold_queues:
+                    self._hand_off(copy)
+        return True
+    
+    def attach_journal(self, journal: Optional['Journal']) -> None:
+        """Registra en el journal cada cambio de copias y lectores (None lo desactiva)."""
+        self._journal = journal
     
     def count_copies_by_author(self, author_name: str) -> int:
-        return sum(1 for copy in self.copies 
-                   if copy.get_book().get_author().get_name().lower() == author_name.lower())
+        self._sync_indexes()
+        return len(self._copies_by_author.get(self._normalize(author_name), ()))
     
     def find_copies_by_author(self, author_name: str) -> List[BookCopy]:
-        return [copy for copy in self.copies 
-                if copy.get_book().get_author().get_name().lower() == author_name.lower()]
+        self._sync_indexes()
+        copies = self.copies
+        return [copies[position]
+                for position in self._copies_by_author.get(self._normalize(author_name), ())]
     
     def find_available_copy(self, title: str, year: int) -> Optional[BookCopy]:
-        for copy in self.copies:
-            book = copy.get_book()
-            if (book.get_title().lower() == title.lower() and 
-                book.get_year() == year and 
-                copy.is_available()):
-                return copy
-        return None
+        self._sync_indexes()
+        pool = self._pools_by_title_year.get((self._normalize(title), year))
+        position = pool.peek() if pool is not None else None
+        return self.copies[position] if position is not None else None
+    
+    def count_available(self, title: str, year: int) -> int:
+        self._sync_indexes()
+        pool = self._pools_by_title_year.get((self._normalize(title), year))
+        return len(pool) if pool is not None else 0
     
     def borrow_book(self, reader: Reader, copy: BookCopy) -> bool:
+        if self._holds and copy in self._holds:
+            with self._locks_for(reader, copy):
+                return self._pick_up(reader, copy)
+        if self.concurrent:
+            with self._locks_for(reader, copy):
+                return reader.borrow_book(copy)
         if reader.can_borrow() and copy.is_available():
             return reader.borrow_book(copy)
         return False
     
+    def return_book(self, reader: Reader, copy: BookCopy) -> None:
+        """Devuelve la copia; en modo concurrente, con los mismos candados que borrow_book."""
+        with self._locks_for(reader, copy):
+            reader.return_book(copy)
+    
+    @contextmanager
+    def _locks_for(self, reader: Optional[Reader], *copies: BookCopy) -> Iterator[None]:
+        """Toma el candado del lector (si hay) y luego los de las copias en orden creciente."""
+        if not self.concurrent:
+            yield
+            return
+        stripes = len(self._reader_locks)
+        copy_stripes = sorted({hash(copy) % stripes for copy in copies})
+        with ExitStack() as stack:
+            if reader is not None:
+                stack.enter_context(self._reader_locks[hash(reader) % stripes])
+            for stripe in copy_stripes:
+                stack.enter_context(self._copy_locks[stripe])
+            yield
+    
+    def borrow_many(self, reader: Reader,
+                    copies: List[BookCopy]) -> List[Tuple[BookCopy, BatchResult]]:
+        """Presta todas las copias o ninguna.
+        
+        El límite y las multas se validan una sola vez para todo el lote. Las
+        copias reservadas para el lector cuentan como disponibles. Si algo
+        falla, las copias con problema llevan su motivo y el resto ABORTED.
+        """
+        with self._locks_for(reader, *copies), ExitStack() as stack:
+            if self._holds:
+                # Las reservas del lector no pueden vencer entre validarlas y cerrarlas.
+                stack.enter_context(self._hold_lock)
+            if reader.get_penalty_days() > 0:
+                return [(copy, BatchResult.PENALTY) for copy in copies]
+            if len(reader.borrowed_books) + len(copies) > reader.MAX_BORROWED_BOOKS:
+                return [(copy, BatchResult.LIMIT_REACHED) for copy in copies]
+            results = self._validate_batch(
+                copies, lambda copy: copy.is_available() or self._is_held_for(reader, copy),
+                BatchResult.UNAVAILABLE)
+            if results is not None:
+                return results
+            saved = self._batch_state(reader, copies)
+            self._apply_batch(copies, lambda copy: self._check_out(reader, copy),
+                              lambda copy: self._restore_copy(reader, copy, saved))
+        return [(copy, BatchResult.OK) for copy in copies]
+    
+    def return_many(self, reader: Reader,
+                    copies: List[BookCopy]) -> List[Tuple[BookCopy, BatchResult]]:
+        """Devuelve todas las copias o ninguna y avisa a BioAlert de una vez."""
+        with self._locks_for(reader, *copies):
+            results = self._validate_batch(copies, lambda copy: copy in reader.borrowed_books,
+                                           BatchResult.NOT_BORROWED)
+            if results is not None:
+                return results
+            saved = self._batch_state(reader, copies)
+            self._apply_batch(copies, reader._release,
+                              lambda copy: self._restore_copy(reader, copy, saved))
+        # Las copias que pasaron a una reserva ya avisaron a su lector.
+        self.bio_alert.notify_availability_many(copy.get_book().get_title() for copy in copies
+                                                if copy.is_available())
+        return [(copy, BatchResult.OK) for copy in copies]
+    
+    @staticmethod
+    def _validate_batch(copies: List[BookCopy], is_valid: Callable[[BookCopy], bool],
+                        failure: BatchResult) -> Optional[List[Tuple[BookCopy, BatchResult]]]:
+        """Devuelve los resultados del rechazo, o None si todo el lote es válido."""
+        seen: Set[BookCopy] = set()
+        results = []
+        for copy in copies:
+            if copy in seen:
+                results.append((copy, BatchResult.DUPLICATE))
+            elif not is_valid(copy):
+                results.append((copy, failure))
+            else:
+                results.append((copy, BatchResult.OK))
+            seen.add(copy)
+        if all(result == BatchResult.OK for _, result in results):
+            return None
+        return [(copy, BatchResult.ABORTED if result == BatchResult.OK else result)
+                for copy, result in results]
+    
+    @staticmethod
+    def _apply_batch(copies: List[BookCopy], apply: Callable[[BookCopy], None],
+                     undo: Callable[[BookCopy], None]) -> None:
+        applied = []
+        try:
+            for copy in copies:
+                # Se anota antes de aplicar para deshacer también un cambio a medias.
+                applied.append(copy)
+                apply(copy)
+        except Exception:
+            for copy in reversed(applied):
+                undo(copy)
+            raise
+    
+    def _is_held_for(self, reader: Reader, copy: BookCopy) -> bool:
+        hold = self._holds.get(copy)
+        return hold is not None and hold.reader is reader
+    
+    def _check_out(self, reader: Reader, copy: BookCopy) -> None:
+        """Presta la copia; si estaba reservada para el lector, cierra la reserva como _pick_up."""
+        if copy in self._holds:
+            with self._hold_lock:
+                self._end_hold(copy)
+        reader._take(copy)
+    
+    def _batch_state(self, reader: Reader, copies: List[BookCopy]) -> _BatchState:
+        """Préstamos del lector y estado, préstamo y reserva de cada copia antes del lote."""
+        self._load_pending_loans()
+        return (dict(reader.borrowed_books),
+                {copy: (copy.get_status(), self._loans.get(copy), self._holds.get(copy))
+                 for copy in copies})
+    
+    def _restore_copy(self, reader: Reader, copy: BookCopy, saved: _BatchState) -> None:
+        """Deja la copia como estaba antes del lote, con el mismo préstamo y la misma reserva.
+        
+        No pasa por Reader._take ni Reader._release: eso abriría un préstamo
+        nuevo (otro vencimiento, días cobrados en cero) en vez de reponer el anterior.
+        """
+        borrowed, states = saved
+        status, loan, hold = states[copy]
+        books = reader.borrowed_books
+        if copy not in borrowed:
+            books.pop(copy, None)
+        elif copy not in books:
+            books[copy] = None
+            if len(books) == len(borrowed):
+                # Con todas las copias de vuelta se recupera también su orden.
+                books.clear()
+                books.update(borrowed)
+        with self._loan_lock:
+            changed = self._loans.get(copy) is not loan
+            if changed and loan is None:
+                del self._loans[copy]
+            elif changed:
+                self._loans[copy] = loan
+                if not any(entry[2] is loan for entry in self._due_heap):
+                    # Desde el último día cobrado: process_overdue no vuelve a cobrarlo.
+                    charged_upto = loan.due + loan.charged_days * self.DAY_SECONDS
+                    heapq.heappush(self._due_heap, (charged_upto, next(self._loan_sequence), loan))
+        if changed:
+            self._record_loan(reader, copy, loan)
+        with self._hold_lock:
+            current = self._holds.get(copy)
+            if current is not hold:
+                if current is not None:
+                    # La devolución ya había pasado la copia al siguiente de la cola.
+                    self._end_hold(copy)
+                    self._hold_queues[self._title_key(copy.get_book())].put_back(current.reader)
+                if hold is not None:
+                    self._holds[copy] = hold
+                    self._holds_by_reader.setdefault(hold.reader, {})[copy] = None
+                    if not any(entry[2] is hold for entry in self._hold_heap):
+                        heapq.heappush(self._hold_heap, (hold.expires, next(self._hold_sequence), hold))
+            if copy.get_status() != status:
+                copy.set_status(status)
+    
+    def _record_loan(self, reader: Reader, copy: BookCopy, loan: Optional[_Loan]) -> None:
+        """Registra un préstamo repuesto (o quitado) al deshacer un lote, con su vencimiento y cobros."""
+        if self._journal is None:
+            return
+        if loan is None:
+            self._journal.record_reader_event(reader, ReaderEvent.RETURN, copy)
+            return
+        # Se vuelven a anotar todos los préstamos del lector para que el replay
+        # los deje en el mismo orden.
+        for borrowed in reader.borrowed_books:
+            open_loan = self._loans.get(borrowed)
+            if open_loan is None:
+                continue
+            self._journal.record_reader_event(reader, ReaderEvent.RETURN, borrowed)
+            self._journal.record_reader_event(reader, ReaderEvent.BORROW, borrowed, open_loan.due)
+            if open_loan.charged_days:
+                self._journal.record_charge(borrowed, open_loan.charged_days)
+    
     def subscribe_to_book(self, book_title: str, email: str) -> None:
         self.bio_alert.subscribe(book_title, email)
     
     def get_all_books_by_author(self, author_name: str) -> List[Book]:
-        seen = set()
-        result = []
-        for copy in self.copies:
-            book = copy.get_book()
-            if book.get_author().get_name().lower() == author_name.lower():
-                key = (book.get_title(), book.get_year())
-                if key not in seen:
-                    seen.add(key)
-                    result.append(book)
+        return list(self._cached("books", author_name, self._books_by_author_uncached))
+    
+    def _books_by_author_uncached(self, author_key: str) -> tuple:
+        books = self._books_by_author.get(author_key)
+        return tuple(books.books) if books is not None else ()
+    
+    def _cached(self, kind: str, author_name: str, compute: Callable[[str], tuple]) -> tuple:
+        """Resultado de ``compute`` para el autor, desde la caché si está vigente."""
+        self._sync_indexes()
+        author_key = self._normalize(author_name)
+        if self._cache is None:
+            return compute(author_key)
+        result, version = self._cache.get(kind, author_key)
+        if result is None:
+            result = compute(author_key)
+            self._cache.put(kind, author_key, version, result)
         return result
     
+    def cache_stats(self) -> Dict[str, int]:
+        """Aciertos, fallos y desalojos de la caché de consultas por autor."""
+        if self._cache is None:
+            return {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "max_entries": 0}
+        return self._cache.stats()
+    
+    def enable_search(self) -> None:
+        """Crea el índice de búsqueda; desde ahí se actualiza con cada libro o copia nueva."""
+        from library_search import SearchIndex
+        self._sync_indexes()
+        with self._index_lock:
+            if self._search is not None:
+                return
+            search = SearchIndex()
+            search.add_books(self.books)
+            for books in self._books_by_author.values():
+                search.add_books(books.books)
+            self._search = search
+    
+    def search(self, query: str, limit: int = 20, fuzzy: bool = True) -> List[Tuple[Book, int]]:
+        """Busca libros por palabras del título o del autor, con prefijos y errores de tipeo.
+        
+        Devuelve pares (libro, copias disponibles) del más al menos relevante.
+        """
+        if self._search is None:
+            self.enable_search()
+        self._sync_indexes()
+        return [(book, self.count_available(book.get_title(), book.get_year()))
+                for book, _ in self._search.search(query, limit, fuzzy)]
+    
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Sugerencias de palabras para la última palabra escrita."""
+        if self._search is None:
+            self.enable_search()
+        return self._search.complete(prefix, limit)
+    
+    def stats(self) -> Dict[str, object]:
+        """Reporte de inventario: copias por estado, autor, año y título, uso y multas.
+        
+        La primera llamada arma las columnas del catálogo; las siguientes solo
+        agregan las copias nuevas.
+        """
+        if self._stats is None:
+            from library_stats import InventoryStats
+            self._stats = InventoryStats(self)
+        return self._stats.report()
+    
     def list_copies_details(self, author_name: str) -> List[str]:
-        copies = self.find_copies_by_author(author_name)
-        return [f"{copy.get_book().get_full_info()} - Copy {copy.get_id()}" 
-                for copy in copies]
\ No newline at end of file
+        return list(self._cached("details", author_name, self._copies_details_uncached))
+    
+    def _copies_details_uncached(self, author_key: str) -> tuple:
+        copies = self.copies
+        return tuple(self._copy_detail(copies[position])
+                     for position in self._copies_by_author.get(author_key, ()))
+    
+    @staticmethod
+    def _copy_detail(copy: BookCopy) -> str:
+        return f"{copy.get_book().get_full_info()} - Copy {copy.get_id()}"
+    
+    # Paginación: los cursores son opacos para quien llama; por dentro guardan
+    # el tipo de listado, la última posición entregada y el autor. Como las
+    # copias y los libros solo se agregan al final, un cursor sigue siendo
+    # válido aunque el catálogo crezca entre una página y la siguiente.
+    
+    @staticmethod
+    def _encode_cursor(kind: str, author_key: str, value: int) -> str:
+        return base64.urlsafe_b64encode(f"{kind}|{value}|{author_key}".encode("utf-8")).decode("ascii")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str, kind: str, author_key: str) -> int:
+        try:
+            cursor_kind, value, cursor_author = \
+                base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 2)
+            if cursor_kind == kind and cursor_author == author_key:
+                return int(value)
+        except ValueError:
+            pass
+        raise ValueError("Invalid cursor for this listing")
+    
+    def _scan_author_copies(self, author_key: str, after: Optional[int], status: Optional[CopyStatus],
+                            year: Optional[int]) -> Iterator[Tuple[int, BookCopy]]:
+        """(posición, copia) del autor después de ``after``, filtrando mientras recorre."""
+        self._sync_indexes()
+        positions = self._copies_by_author.get(author_key, ())
+        copies = self.copies
+        start = bisect_right(positions, after) if after is not None else 0
+        for index in range(start, len(positions)):
+            position = positions[index]
+            copy = copies[position]
+            if status is not None and copy.get_status() != status:
+                continue
+            if year is not None and copy.get_book().get_year() != year:
+                continue
+            yield position, copy
+    
+    def _scan_author_books(self, author_key: str, after: Optional[int],
+                           year: Optional[int]) -> Iterator[Tuple[int, Book]]:
+        self._sync_indexes()
+        entry = self._books_by_author.get(author_key)
+        if entry is None:
+            return
+        books = entry.books
+        # Se avanza por índice sobre la lista: los libros agregados entre
+        # páginas quedan al final y el cursor no vuelve a recorrer el inicio.
+        ordinal = after + 1 if after is not None else 0
+        while ordinal < len(books):
+            book = books[ordinal]
+            if year is None or book.get_year() == year:
+                yield ordinal, book
+            ordinal += 1
+    
+    def iter_copies_by_author(self, author_name: str, status: Optional[CopyStatus] = None,
+                              year: Optional[int] = None) -> Iterator[BookCopy]:
+        """Como find_copies_by_author, pero de a una copia y con filtros opcionales."""
+        for _, copy in self._scan_author_copies(self._normalize(author_name), None, status, year):
+            yield copy
+    
+    def iter_books_by_author(self, author_name: str, year: Optional[int] = None) -> Iterator[Book]:
+        for _, book in self._scan_author_books(self._normalize(author_name), None, year):
+            yield book
+    
+    def iter_copies_details(self, author_name: str, status: Optional[CopyStatus] = None,
+                            year: Optional[int] = None) -> Iterator[str]:
+        for copy in self.iter_copies_by_author(author_name, status, year):
+            yield self._copy_detail(copy)
+    
+    def _page(self, kind: str, author_name: str, cursor: Optional[str], limit: int,
+              scan: Callable[[str, Optional[int]], Iterator[Tuple[int, object]]]
+              ) -> Tuple[List[object], Optional[str]]:
+        """Hasta ``limit`` resultados desde el cursor y el cursor de la página siguiente."""
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        author_key = self._normalize(author_name)
+        after = self._decode_cursor(cursor, kind, author_key) if cursor is not None else None
+        # Se pide uno más para saber si hay otra página.
+        rows = list(islice(scan(author_key, after), limit + 1))
+        if len(rows) <= limit:
+            return [item for _, item in rows], None
+        rows.pop()
+        return [item for _, item in rows], self._encode_cursor(kind, author_key, rows[-1][0])
+    
+    def page_copies_by_author(self, author_name: str, limit: int = 20, cursor: Optional[str] = None,
+                              status: Optional[CopyStatus] = None,
+                              year: Optional[int] = None) -> Tuple[List[BookCopy], Optional[str]]:
+        """Una página de copias del autor y el cursor de la siguiente (None si no hay más)."""
+        return self._page("copies", author_name, cursor, limit,
+                          lambda key, after: self._scan_author_copies(key, after, status, year))
+    
+    def page_books_by_author(self, author_name: str, limit: int = 20, cursor: Optional[str] = None,
+                             year: Optional[int] = None) -> Tuple[List[Book], Optional[str]]:
+        return self._page("books", author_name, cursor, limit,
+                          lambda key, after: self._scan_author_books(key, after, year))
+    
+    def page_copies_details(self, author_name: str, limit: int = 20, cursor: Optional[str] = None,
+                            status: Optional[CopyStatus] = None,
+                            year: Optional[int] = None) -> Tuple[List[str], Optional[str]]:
+        """Como page_copies_by_author; solo se arma el texto de las filas de la página."""
+        copies, next_cursor = self.page_copies_by_author(author_name, limit, cursor, status, year)
+        return [self._copy_detail(copy) for copy in copies], next_cursor
\ No newline at end of file
@@ -0,0 +1,207 @@
+# test_library_journal.py
+import time
+
+import pytest
+from library_system import Author, Book, BookCopy, Reader, Library, CopyStatus
+from library_journal import Journal
+
+
+def build_catalog(library):
+    """Catálogo base que se reconstruye igual en cada 'arranque'."""
+    somerville = Author("Somerville", "1950-01-01")
+    book = Book("Software Engineering", 2020, somerville)
+    library.add_book(book)
+    for i in range(1, 5):
+        library.add_copy(BookCopy(f"C00{i}", book))
+    return library
+
+
+def state_of(library):
+    return (
+        [(c.get_id(), c.get_status()) for c in library.copies],
+        [(r.get_email(), r.get_penalty_days(), [c.get_id() for c in r.get_borrowed_books()])
+         for r in library.readers],
+    )
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return tmp_path / "circulation.journal"
+
+
+class TestJournal:
+    """Tests para el journal de circulación."""
+
+    def test_replay_rebuilds_circulation_state(self, journal_path):
+        library = build_catalog(Library())
+        journal = Journal(journal_path, max_batch=2, max_delay=0)
+        library.attach_journal(journal)
+        student = Reader("Estudiante", "estudiante@uni.edu")
+        teacher = Reader("Profesor", "profesor@uni.edu")
+        library.register_reader(student)
+        library.register_reader(teacher)
+
+        library.borrow_book(student, library.copies[0])
+        library.borrow_book(student, library.copies[1])
+        library.borrow_book(teacher, library.copies[2])
+        student.return_book(library.copies[0])
+        library.copies[3].set_status(CopyStatus.IN_REPAIR)
+        teacher.add_penalty(4)
+        teacher.reduce_penalty(3)
+        journal.close()
+
+        restored = build_catalog(Library())
+        count = Journal(journal_path).replay(restored)
+
+        assert count > 0
+        assert state_of(restored) == state_of(library)
+        assert restored.find_available_copy("Software Engineering", 2020).get_id() == "C001"
+
+    def test_replay_is_idempotent(self, journal_path):
+        library = build_catalog(Library())
+        journal = Journal(journal_path, max_delay=0)
+        library.attach_journal(journal)
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        library.borrow_book(reader, library.copies[0])
+        reader.add_penalty(1)
+        journal.close()
+
+        restored = build_catalog(Library())
+        replayer = Journal(journal_path)
+        replayer.replay(restored)
+        replayer.replay(restored)
+        assert state_of(restored) == state_of(library)
+
+    def test_uncommitted_and_torn_records_are_ignored(self, journal_path):
+        library = build_catalog(Library())
+        journal = Journal(journal_path, max_batch=1000, max_delay=0)
+        library.attach_journal(journal)
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        library.borrow_book(reader, library.copies[0])
+        journal.commit()
+        library.borrow_book(reader, library.copies[1])  # Queda en el buffer
+        committed_size = journal_path.stat().st_size
+        with open(journal_path, "ab") as handle:
+            handle.write(b"\x10\x00\x00\x00garbage")
+
+        restored = build_catalog(Library())
+        reopened = Journal(journal_path)
+        reopened.replay(restored)
+        assert journal_path.stat().st_size == committed_size
+        assert [c.get_id() for c in restored.readers[0].get_borrowed_books()] == ["C001"]
+
+    def test_group_commit_by_time(self, journal_path):
+        library = build_catalog(Library())
+        journal = Journal(journal_path, max_batch=1000, max_delay=0.01)
+        library.attach_journal(journal)
+        library.copies[0].set_status(CopyStatus.IN_REPAIR)
+        deadline = time.monotonic() + 2
+        while journal_path.stat().st_size == 0 and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+        restored = build_catalog(Library())
+        assert Journal(journal_path).replay(restored) == 1
+        assert restored.copies[0].get_status() == CopyStatus.IN_REPAIR
+
+    def test_compact_folds_journal_into_checkpoint(self, journal_path, tmp_path):
+        checkpoint = tmp_path / "checkpoint.snap"
+        library = build_catalog(Library())
+        journal = Journal(journal_path, max_delay=0)
+        library.attach_journal(journal)
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        library.borrow_book(reader, library.copies[0])
+
+        journal.compact(library, checkpoint)
+        assert journal_path.stat().st_size == 0
+        reader.add_penalty(2)
+        journal.close()
+
+        restored = Library.open_snapshot(checkpoint)
+        Journal(journal_path).replay(restored)
+        assert state_of(restored) == state_of(library)
+
+    def test_replay_restores_due_dates_and_charges(self, journal_path):
+        day = Library.DAY_SECONDS
+        library = build_catalog(Library())
+        library.clock = lambda: 1000.0
+        journal = Journal(journal_path, max_delay=0)
+        library.attach_journal(journal)
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        library.borrow_book(reader, library.copies[0])
+        due = library.get_loan_due(library.copies[0])
+        library.process_overdue(due + 2 * day)
+        journal.close()
+
+        restored = build_catalog(Library())
+        Journal(journal_path).replay(restored)
+        assert restored.get_loan_due(restored.copies[0]) == due
+        assert state_of(restored) == state_of(library)
+
+        restored.process_overdue(due + 3 * day)
+        assert restored.readers[0].get_penalty_days() == 3 * Reader.PENALTY_MULTIPLIER
+
+    def test_replay_after_rolled_back_batch(self, journal_path):
+        day = Library.DAY_SECONDS
+        library = build_catalog(Library())
+        library.clock = lambda: 1000.0
+        journal = Journal(journal_path, max_delay=0)
+        library.attach_journal(journal)
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        copies = library.copies[:2]
+        library.borrow_many(reader, copies)
+        due = library.get_loan_due(copies[0])
+        library.process_overdue(due + 2 * day)
+
+        def failing_listener(copy, previous):
+            if copy.get_status() == CopyStatus.AVAILABLE:
+                raise RuntimeError("fallo al registrar")
+
+        copies[1].add_status_listener(failing_listener)
+        with pytest.raises(RuntimeError):
+            library.return_many(reader, copies)
+        journal.close()
+
+        restored = build_catalog(Library())
+        Journal(journal_path).replay(restored)
+        assert state_of(restored) == state_of(library)
+        assert restored.get_loan_due(restored.copies[0]) == due
+        restored.process_overdue(due + 2 * day)
+        assert restored.readers[0].get_penalty_days() == reader.get_penalty_days()
+
+    def test_replay_releases_reserved_copies(self, journal_path):
+        library = build_catalog(Library())
+        journal = Journal(journal_path, max_batch=1, max_delay=0)
+        library.attach_journal(journal)
+        first, second = Reader("Uno", "uno@uni.edu"), Reader("Dos", "dos@uni.edu")
+        library.register_reader(first)
+        library.register_reader(second)
+        for copy in library.copies[:3]:
+            library.borrow_book(first, copy)
+        library.copies[3].set_status(CopyStatus.IN_REPAIR)
+        library.place_hold(second, "Software Engineering", 2020)
+        first.return_book(library.copies[0])
+        assert library.copies[0].get_status() == CopyStatus.RESERVED
+        journal.close()
+
+        restored = build_catalog(Library())
+        replayed = Journal(journal_path)
+        restored.attach_journal(replayed)
+        replayed.replay(restored)
+        assert restored.copies[0].get_status() == CopyStatus.AVAILABLE
+        assert restored.find_available_copy("Software Engineering", 2020).get_id() == "C001"
+        replayed.close()
+
+    def test_replay_rejects_unknown_copy(self, journal_path):
+        library = build_catalog(Library())
+        journal = Journal(journal_path, max_delay=0)
+        library.attach_journal(journal)
+        library.copies[0].set_status(CopyStatus.IN_REPAIR)
+        journal.close()
+
+        with pytest.raises(ValueError):
+            Journal(journal_path).replay(Library())
@@ -0,0 +1,118 @@
+# test_library_metrics.py
+import pytest
+from library_system import Author, Book, BookCopy, Reader, Library, BioAlert
+from library_metrics import (
+    CallbackCollector, InMemoryCollector, PrometheusFileCollector, instrument, profile, uninstrument
+)
+
+
+@pytest.fixture
+def library():
+    """Biblioteca con dos copias y un lector; se desinstrumenta al terminar."""
+    library = Library()
+    book = Book("Software Engineering", 2020, Author("Somerville", "1950-01-01"))
+    for i in range(2):
+        library.add_copy(BookCopy(f"C00{i}", book))
+    library.register_reader(Reader("Estudiante", "estudiante@uni.edu"))
+    yield library
+    uninstrument(library)
+    uninstrument(library.bio_alert)
+
+
+class TestInstrumentation:
+    """Tests para instrument() y los collectors."""
+
+    def test_counts_latency_and_result_sizes(self, library):
+        collector = InMemoryCollector()
+        instrument(library, collector)
+        library.find_copies_by_author("Somerville")
+        library.find_copies_by_author("Nadie")
+        library.count_copies_by_author("Somerville")
+
+        calls = collector.snapshot()["calls"]
+        stats = calls["Library.find_copies_by_author"]
+        assert stats["calls"] == 2
+        assert stats["mean_size"] == 1.0
+        assert stats["max_size"] == 2
+        assert sum(stats["latency_buckets"].values()) == 2
+        assert calls["Library.count_copies_by_author"]["max_size"] is None
+
+    def test_rejected_borrows_by_reason(self, library):
+        collector = InMemoryCollector()
+        instrument(library, collector)
+        reader = library.readers[0]
+        other = Reader("Otro", "otro@uni.edu")
+        library.borrow_book(reader, library.copies[0])
+        library.borrow_book(other, library.copies[0])
+        for i in range(Reader.MAX_BORROWED_BOOKS - 1):
+            reader.borrowed_books[BookCopy(f"X{i}", library.copies[1].get_book())] = None
+        library.borrow_book(reader, library.copies[1])
+        other.add_penalty(2)
+        library.borrow_many(other, [library.copies[1]])
+
+        events = collector.snapshot()["events"]
+        assert events == {"borrow_rejected[reason=unavailable]": 1,
+                          "borrow_rejected[reason=limit_reached]": 1,
+                          "borrow_rejected[reason=penalty]": 1}
+
+    def test_bio_alert_is_instrumented(self, library):
+        calls = []
+        instrument(library.bio_alert, CallbackCollector(lambda *call: calls.append(call)))
+        library.subscribe_to_book("Software Engineering", "a@uni.edu")
+        BioAlert.get_instance().notify_availability("Software Engineering")
+        assert [(method, size) for method, _, size in calls] == \
+            [("BioAlert.subscribe", None), ("BioAlert.notify_availability", 1)]
+
+    def test_errors_are_counted_and_raised(self, library):
+        events = []
+        instrument(library, CallbackCollector(lambda *call: None,
+                                              lambda *event: events.append(event)))
+        with pytest.raises(ValueError):
+            library.bulk_load([], fmt="xml")
+        assert events == [("call_errors", 1, {"method": "Library.bulk_load"})]
+
+    def test_uninstrument_restores_class_methods(self, library):
+        instrument(library, InMemoryCollector())
+        assert "borrow_book" in vars(library)
+        uninstrument(library)
+        assert "borrow_book" not in vars(library)
+        assert library.borrow_book.__func__ is Library.borrow_book
+
+    def test_prometheus_text_file(self, library, tmp_path):
+        path = tmp_path / "library.prom"
+        collector = PrometheusFileCollector(str(path))
+        instrument(library, collector)
+        library.find_available_copy("Software Engineering", 2020)
+        library.borrow_book(Reader("Otro", "otro@uni.edu"), library.copies[0])
+        library.borrow_book(Reader("Otro2", "otro2@uni.edu"), library.copies[0])
+        collector.write()
+
+        text = path.read_text()
+        assert 'library_call_seconds_count{method="Library.find_available_copy"} 1' in text
+        assert 'library_call_seconds_bucket{method="Library.borrow_book",le="+Inf"} 2' in text
+        assert 'library_borrow_rejected_total{reason="unavailable"} 1' in text
+
+
+class TestProfile:
+    """Tests para el perfilador de un pedido."""
+
+    def test_trace_is_nested_and_temporary(self, library):
+        with profile(library, library.bio_alert) as trace:
+            library.list_copies_details("Somerville")
+            library.subscribe_to_book("Software Engineering", "a@uni.edu")
+        assert [(entry.method, entry.depth) for entry in trace] == [
+            ("Library.list_copies_details", 0),
+            ("Library.subscribe_to_book", 0),
+            ("BioAlert.subscribe", 1),
+        ]
+        assert trace[0].size == 2
+        assert "list_copies_details" not in vars(library)
+
+    def test_profile_keeps_existing_collectors(self, library):
+        collector = InMemoryCollector()
+        instrument(library, collector)
+        with profile(library) as trace:
+            library.count_available("Software Engineering", 2020)
+        library.count_available("Software Engineering", 2020)
+        assert len(trace) == 1
+        assert collector.snapshot()["calls"]["Library.count_available"]["calls"] == 2
@@ -0,0 +1,110 @@
+# test_library_notifications.py
+import queue
+import threading
+
+import pytest
+from library_system import BioAlert
+from library_notifications import DeliveryBackend, NotificationDispatcher, OutboxBackend, PrintBackend
+
+
+@pytest.fixture
+def bio_alert():
+    """BioAlert con el envío directo restaurado al terminar."""
+    instance = BioAlert.get_instance()
+    yield instance
+    instance.set_dispatcher(None)
+
+
+class TestNotificationDispatcher:
+    """Tests para el envío asíncrono de avisos."""
+
+    def test_notify_availability_queues_and_returns(self, bio_alert):
+        backend = OutboxBackend()
+        dispatcher = NotificationDispatcher(backend, workers=2)
+        bio_alert.set_dispatcher(dispatcher)
+        for i in range(50):
+            bio_alert.subscribe("Async Book", f"reader{i}@example.com")
+
+        emails = bio_alert.notify_availability("Async Book")
+        dispatcher.join()
+        dispatcher.close()
+
+        assert len(emails) == 50
+        assert backend.delivered() == 50
+        assert dispatcher.stats["sent"] == 50
+        assert {recipient for recipient, _, _ in backend.outbox} == set(emails)
+        assert len(dispatcher.latencies) == 50
+
+    def test_messages_for_same_recipient_are_batched(self):
+        backend = OutboxBackend()
+        dispatcher = NotificationDispatcher(backend, workers=1, max_batch=10)
+        started = threading.Event()
+        release = threading.Event()
+        original = backend.send_batch
+        backend.send_batch = lambda recipient, titles: (
+            started.set(), release.wait(), original(recipient, titles))
+
+        dispatcher.submit("first@example.com", "Warm up")
+        started.wait()  # El hilo queda ocupado mientras se encolan los demás
+        for title in ("Book A", "Book B", "Book C"):
+            dispatcher.submit("reader@example.com", title)
+        release.set()
+        dispatcher.join()
+        dispatcher.close()
+
+        assert ("reader@example.com", ["Book A", "Book B", "Book C"]) in \
+            [(recipient, titles) for recipient, titles, _ in backend.outbox]
+
+    def test_failed_sends_are_retried(self):
+        backend = OutboxBackend(failures=2)
+        dispatcher = NotificationDispatcher(backend, workers=1, backoff=0.001)
+
+        dispatcher.submit("reader@example.com", "Flaky Book")
+        dispatcher.join()
+        dispatcher.close()
+
+        assert backend.delivered() == 1
+        assert dispatcher.stats["retries"] == 2
+        assert dispatcher.stats["failed"] == 0
+
+    def test_gives_up_after_max_retries(self):
+        backend = OutboxBackend(failures=10)
+        dispatcher = NotificationDispatcher(backend, workers=1, max_retries=1, backoff=0.001)
+
+        dispatcher.submit("reader@example.com", "Broken Book")
+        dispatcher.join()
+        dispatcher.close()
+
+        assert dispatcher.stats["failed"] == 1
+        assert dispatcher.failed == [("reader@example.com", ["Broken Book"])]
+
+    def test_full_queue_applies_back_pressure(self):
+        release = threading.Event()
+        backend = OutboxBackend()
+        backend.send_batch = lambda recipient, titles: release.wait()
+        dispatcher = NotificationDispatcher(backend, workers=1, max_queue=1, max_batch=1,
+                                            submit_timeout=0.05)
+
+        dispatcher.submit("a@example.com", "Book")  # Lo toma el hilo y queda bloqueado
+        with pytest.raises(queue.Full):
+            for _ in range(3):
+                dispatcher.submit("b@example.com", "Book")
+        release.set()
+        dispatcher.join()
+        dispatcher.close()
+
+    def test_print_backend_keeps_email_format(self, capsys):
+        dispatcher = NotificationDispatcher(PrintBackend(), workers=1)
+        dispatcher.submit("test@example.com", "Test Book")
+        dispatcher.join()
+        dispatcher.close()
+
+        captured = capsys.readouterr()
+        assert "Email sent to test@example.com: 'Test Book' is now available" in captured.out
+
+    def test_backend_must_implement_send_batch(self):
+        class Incomplete(DeliveryBackend):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
@@ -0,0 +1,115 @@
+# test_library_search.py
+import pytest
+from library_system import Author, Book, BookCopy, Library, CopyStatus
+from library_search import SearchIndex, bounded_edit_distance, tokenize
+
+
+@pytest.fixture
+def library():
+    """Biblioteca con varios libros y autores para las búsquedas."""
+    library = Library()
+    somerville = Author("Somerville", "1950-01-01")
+    pressman = Author("Pressman", "1940-05-12")
+    books = [Book("Software Engineering", 2015, somerville),
+             Book("Ingeniería de Software", 2020, somerville),
+             Book("Software Engineering: A Practitioner's Approach", 2014, pressman),
+             Book("Engineering Mathematics", 2010, Author("Stroud", "1930-01-01"))]
+    for i, book in enumerate(books + [books[0], books[1]], start=1):
+        library.add_copy(BookCopy(f"C00{i}", book))
+    library.copies[1].set_status(CopyStatus.BORROWED)
+    library.enable_search()
+    return library
+
+
+class TestTokenizer:
+    """Tests para la normalización de textos."""
+
+    def test_tokenize_folds_case_and_accents(self):
+        assert tokenize("Ingeniería de SOFTWARE") == ["ingenieria", "de", "software"]
+        assert tokenize("STRASSE") == tokenize("Straße")
+
+    def test_bounded_edit_distance(self):
+        assert bounded_edit_distance("somervile", "somerville", 2) == 1
+        assert bounded_edit_distance("pressman", "somerville", 2) is None
+        assert bounded_edit_distance("abc", "abc", 0) == 0
+
+
+class TestSearch:
+    """Tests para la búsqueda de libros en Library."""
+
+    def test_multi_term_query_ranks_best_match_first(self, library):
+        results = library.search("software engineering")
+        titles = [book.get_title() for book, _ in results]
+        assert titles[0] == "Software Engineering"
+        assert "Engineering Mathematics" not in titles
+        assert len(titles) == 2
+
+    def test_results_include_available_copies(self, library):
+        results = dict((book.get_full_info(), available)
+                       for book, available in library.search("somerville"))
+        assert results["Software Engineering (2015) - Somerville"] == 2
+        assert results["Ingeniería de Software (2020) - Somerville"] == 1
+
+    def test_ties_keep_catalog_order(self, library):
+        titles = [book.get_title() for book, _ in library.search("engineering", fuzzy=False)]
+        assert titles == ["Software Engineering",
+                          "Software Engineering: A Practitioner's Approach",
+                          "Engineering Mathematics"]
+        assert len(library.search("engineering", limit=2)) == 2
+
+    def test_prefix_matching(self, library):
+        titles = [book.get_title() for book, _ in library.search("mathem")]
+        assert titles == ["Engineering Mathematics"]
+
+    def test_fuzzy_matching(self, library):
+        results = library.search("Somervile")
+        assert {book.get_author().get_name() for book, _ in results} == {"Somerville"}
+        assert library.search("Somervile", fuzzy=False) == []
+
+    def test_accent_insensitive(self, library):
+        titles = [book.get_title() for book, _ in library.search("ingenieria")]
+        assert titles == ["Ingeniería de Software"]
+
+    def test_no_match(self, library):
+        assert library.search("cocina") == []
+        assert library.search("   ") == []
+
+    def test_complete_prefers_frequent_tokens(self, library):
+        assert library.complete("eng") == ["engineering"]
+        assert library.complete("software eng") == ["engineering"]
+        assert library.complete("s")[:2] == ["software", "somerville"]
+
+    def test_index_is_incremental(self, library):
+        book = Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))
+        library.add_book(book)
+        assert [b for b, _ in library.search("refactor")] == [book]
+        library.add_copy(BookCopy("C100", book))
+        assert library.search("fowler") == [(book, 1)]
+
+    def test_search_enables_index_lazily(self):
+        library = Library(compact=True)
+        library.bulk_load([{"author": "Somerville", "birth_date": "1950-01-01",
+                            "title": "Software Engineering", "year": "2020",
+                            "copy_id": f"C{i:03d}", "status": ""} for i in range(3)])
+        [(book, available)] = library.search("software")
+        assert book.get_full_info() == "Software Engineering (2020) - Somerville"
+        assert available == 3
+
+
+class TestSearchIndex:
+    """Tests para SearchIndex por separado."""
+
+    def test_duplicate_books_are_indexed_once(self):
+        index = SearchIndex()
+        author = Author("Somerville", "1950-01-01")
+        first = index.add_book(Book("Software Engineering", 2015, author))
+        second = index.add_book(Book("software engineering", 2015, Author("somerville", "")))
+        assert first == second
+        assert len(index) == 1
+
+    def test_same_title_different_year_are_distinct(self):
+        index = SearchIndex()
+        author = Author("Somerville", "1950-01-01")
+        index.add_books([Book("Software Engineering", 2015, author),
+                         Book("Software Engineering", 2020, author)])
+        assert len(index.search("software")) == 2
@@ -0,0 +1,137 @@
+# test_library_sharding.py
+import random
+
+import pytest
+from library_system import Author, Book, BookCopy, Reader, Library, CopyStatus
+from library_sharding import ShardedLibrary
+
+
+def catalog_rows(count, seed=3):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        title = rng.randrange(40)
+        rows.append({"author": f"Author {title % 7}", "birth_date": "1950-01-01",
+                     "title": f"Title {title}", "year": str(2000 + title % 3),
+                     "copy_id": f"C{i:04d}", "status": rng.choice(["", "", "borrowed", "in_repair"])})
+    return rows
+
+
+@pytest.fixture(params=["author", "book"])
+def sharded(request):
+    """Biblioteca de 3 shards repartida por autor o por libro."""
+    library = ShardedLibrary(shards=3, partition=request.param, cache_size=16)
+    yield library
+    library.close()
+
+
+class TestShardedQueries:
+    """Los resultados coinciden con los de una Library de un solo proceso."""
+
+    def test_same_results_as_single_library(self, sharded):
+        rows = catalog_rows(400)
+        single = Library()
+        expected = single.bulk_load(rows)
+        summary = sharded.bulk_load(rows, chunk_size=64)
+        assert {key: summary[key] for key in ("rows", "authors", "books")} == \
+            {key: expected[key] for key in ("rows", "authors", "books")}
+        assert summary["rows_per_second"] > 0
+        assert len(sharded) == 400
+        assert sum(sharded.shard_sizes()) == 400
+
+        for author in [f"author {i}" for i in range(8)]:
+            assert sharded.count_copies_by_author(author) == single.count_copies_by_author(author)
+            assert [b.get_full_info() for b in sharded.get_all_books_by_author(author)] == \
+                [b.get_full_info() for b in single.get_all_books_by_author(author)]
+            assert sharded.list_copies_details(author) == single.list_copies_details(author)
+        for title in range(41):
+            for year in (2000, 2001, 2002):
+                expected = single.find_available_copy(f"Title {title}", year)
+                found = sharded.find_available_copy(f"title {title}", year)
+                assert (found and found.get_id()) == (expected and expected.get_id())
+                assert sharded.count_available(f"Title {title}", year) == \
+                    single.count_available(f"Title {title}", year)
+
+    def test_books_keep_caller_objects(self, sharded):
+        author = Author("Somerville", "1950-01-01")
+        book = Book("Software Engineering", 2015, author)
+        sharded.add_copy(BookCopy("C001", book))
+        sharded.add_copy(BookCopy("C002", book))
+
+        assert sharded.get_all_books_by_author("SOMERVILLE") == [book]
+        assert sharded.find_available_copy("Software Engineering", 2015).get_book() is book
+
+    @pytest.mark.parametrize("partition", ["author", "book"])
+    def test_routing_uses_library_normalization(self, partition):
+        book = Book("Straße", 2001, Author("Straße", "1950-01-01"))
+        with ShardedLibrary(shards=5, partition=partition) as library:
+            library.add_copy(BookCopy("C001", book))
+            assert library.count_copies_by_author("STRASSE") == 1
+            assert library.count_available("STRASSE", 2001) == 1
+
+    def test_shard_errors_are_raised_in_caller(self, sharded):
+        sharded.add_copy(BookCopy("C001", Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))))
+        copy = sharded.find_available_copy("Refactoring", 2018)
+        copy._position = 99
+        with pytest.raises(IndexError):
+            copy.get_status()
+
+
+class TestShardedCirculation:
+    """Préstamos y devoluciones sobre copias guardadas en los shards."""
+
+    def setup_library(self, sharded):
+        book = Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))
+        sharded.add_copies([BookCopy("C001", book), BookCopy("C002", book)])
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        sharded.register_reader(reader)
+        return reader
+
+    def test_borrow_and_return(self, sharded):
+        reader = self.setup_library(sharded)
+        copy = sharded.find_available_copy("Refactoring", 2018)
+
+        assert sharded.borrow_book(reader, copy) is True
+        assert copy.get_status() == CopyStatus.BORROWED
+        assert reader.get_borrowed_books() == [copy]
+        assert sharded.find_available_copy("Refactoring", 2018).get_id() == "C002"
+        assert sharded.borrow_book(Reader("Otro", "otro@uni.edu"), copy) is False
+
+        sharded.return_book(reader, copy)
+        assert copy.is_available()
+        assert reader.get_borrowed_books() == []
+        assert sharded.count_available("Refactoring", 2018) == 2
+
+    def test_borrow_makes_a_single_shard_call(self, sharded, monkeypatch):
+        reader = self.setup_library(sharded)
+        copy = sharded.find_available_copy("Refactoring", 2018)
+        calls = []
+        call = type(copy._shard).call
+        monkeypatch.setattr(type(copy._shard), "call",
+                            lambda shard, name, *args: calls.append(name) or call(shard, name, *args))
+
+        assert sharded.borrow_book(reader, copy) is True
+        assert calls == ["claim"]
+        assert reader.get_borrowed_books() == [copy]
+
+    def test_copies_reject_status_listeners(self, sharded):
+        self.setup_library(sharded)
+        copy = sharded.find_available_copy("Refactoring", 2018)
+        with pytest.raises(TypeError):
+            copy.add_status_listener(lambda c, previous: None)
+
+    def test_penalty_blocks_borrow(self, sharded):
+        reader = self.setup_library(sharded)
+        reader.add_penalty(1)
+        copy = sharded.find_available_copy("Refactoring", 2018)
+        assert sharded.borrow_book(reader, copy) is False
+        assert copy.is_available()
+
+    def test_rejects_foreign_copies(self, sharded):
+        reader = self.setup_library(sharded)
+        with pytest.raises(ValueError):
+            sharded.borrow_book(reader, BookCopy("X", Book("Otro", 2000, Author("A", ""))))
+
+    def test_invalid_partition(self):
+        with pytest.raises(ValueError):
+            ShardedLibrary(partition="title")
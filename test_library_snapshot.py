@@ -0,0 +1,205 @@
+# test_library_snapshot.py
+import pytest
+from library_system import Author, Book, BookCopy, Reader, Library, CopyStatus
+from library_snapshot import SnapshotCopyStore
+
+
+@pytest.fixture
+def populated_library():
+    """Biblioteca con libros, copias en varios estados, lectores y suscripciones."""
+    library = Library()
+    somerville = Author("Somerville", "1950-01-01")
+    pressman = Author("Pressman", "1940-05-12")
+    book_2015 = Book("Software Engineering", 2015, somerville)
+    book_2020 = Book("Ingeniería de Software", 2020, somerville)
+    other = Book("Software Engineering", 2014, pressman)
+    library.add_book(book_2015)
+    library.add_book(other)
+    for i, book in enumerate([book_2015, book_2015, book_2020, other, book_2020], start=1):
+        library.add_copy(BookCopy(f"C00{i}", book))
+    library.copies[3].set_status(CopyStatus.IN_REPAIR)
+
+    student = Reader("Estudiante", "estudiante@uni.edu")
+    teacher = Reader("Profesor", "profesor@uni.edu")
+    library.register_reader(student)
+    library.register_reader(teacher)
+    library.borrow_book(student, library.copies[0])
+    library.borrow_book(student, library.copies[2])
+    teacher.add_penalty(3)
+    library.subscribe_to_book("Snapshot Book", "estudiante@uni.edu")
+    return library
+
+
+def assert_same_library(original, restored):
+    assert [b.get_full_info() for b in restored.books] == \
+        [b.get_full_info() for b in original.books]
+    assert [(c.get_id(), c.get_book().get_full_info(), c.get_status()) for c in restored.copies] == \
+        [(c.get_id(), c.get_book().get_full_info(), c.get_status()) for c in original.copies]
+    assert len(restored.readers) == len(original.readers)
+    for restored_reader, reader in zip(restored.readers, original.readers):
+        assert restored_reader.get_name() == reader.get_name()
+        assert restored_reader.get_email() == reader.get_email()
+        assert restored_reader.get_penalty_days() == reader.get_penalty_days()
+        assert [c.get_id() for c in restored_reader.get_borrowed_books()] == \
+            [c.get_id() for c in reader.get_borrowed_books()]
+    for author in ("Somerville", "pressman", "Unknown"):
+        assert restored.count_copies_by_author(author) == original.count_copies_by_author(author)
+        assert restored.list_copies_details(author) == original.list_copies_details(author)
+        assert [b.get_full_info() for b in restored.get_all_books_by_author(author)] == \
+            [b.get_full_info() for b in original.get_all_books_by_author(author)]
+    for title, year in [("Software Engineering", 2015), ("Ingeniería de Software", 2020),
+                        ("Software Engineering", 2014)]:
+        expected = original.find_available_copy(title, year)
+        restored_copy = restored.find_available_copy(title, year)
+        assert (restored_copy and restored_copy.get_id()) == (expected and expected.get_id())
+        assert restored.count_available(title, year) == original.count_available(title, year)
+
+
+class TestSnapshotRoundTrip:
+    """Tests de ida y vuelta entre el modelo en memoria y el snapshot."""
+
+    def test_round_trip_object_library(self, populated_library, tmp_path):
+        path = tmp_path / "library.snap"
+        populated_library.save_snapshot(path)
+
+        restored = Library.open_snapshot(path)
+        assert isinstance(restored.copies, SnapshotCopyStore)
+        assert_same_library(populated_library, restored)
+        assert restored.bio_alert.is_subscribed("Snapshot Book", "estudiante@uni.edu")
+
+    def test_round_trip_compact_library(self, tmp_path):
+        library = Library(compact=True)
+        library.bulk_load([{"author": "Somerville", "birth_date": "1950-01-01",
+                            "title": "Software Engineering", "year": "2020",
+                            "copy_id": f"C{i:03d}", "status": "borrowed" if i % 2 else ""}
+                           for i in range(10)])
+        path = tmp_path / "compact.snap"
+        library.save_snapshot(path)
+
+        assert_same_library(library, Library.open_snapshot(path))
+
+    def test_round_trip_empty_library(self, tmp_path):
+        path = tmp_path / "empty.snap"
+        Library().save_snapshot(path)
+
+        restored = Library.open_snapshot(path)
+        assert len(restored.copies) == 0
+        assert len(restored.readers) == 0
+        assert restored.find_available_copy("Software Engineering", 2020) is None
+
+    def test_snapshot_of_restored_library(self, populated_library, tmp_path):
+        first = tmp_path / "first.snap"
+        second = tmp_path / "second.snap"
+        populated_library.save_snapshot(first)
+        Library.open_snapshot(first).save_snapshot(second)
+
+        assert_same_library(populated_library, Library.open_snapshot(second))
+
+
+class TestSnapshotUpdates:
+    """Tests para las actualizaciones sobre un snapshot abierto."""
+
+    def test_writable_snapshot_updates_in_place(self, populated_library, tmp_path):
+        path = tmp_path / "library.snap"
+        populated_library.save_snapshot(path)
+
+        library = Library.open_snapshot(path, writable=True)
+        library.copies[3].set_status(CopyStatus.AVAILABLE)
+        library.readers[1].reduce_penalty(2)
+        library.copies.flush()
+
+        reopened = Library.open_snapshot(path)
+        assert reopened.copies[3].get_status() == CopyStatus.AVAILABLE
+        assert reopened.find_available_copy("Software Engineering", 2014).get_id() == "C004"
+        assert reopened.readers[1].get_penalty_days() == 4
+
+    def test_read_only_snapshot_keeps_file_unchanged(self, populated_library, tmp_path):
+        path = tmp_path / "library.snap"
+        populated_library.save_snapshot(path)
+
+        library = Library.open_snapshot(path)
+        library.readers[0].return_book(library.readers[0].get_borrowed_books()[0])
+        assert library.copies[0].get_status() == CopyStatus.AVAILABLE
+        assert library.find_available_copy("Software Engineering", 2015).get_id() == "C001"
+
+        assert Library.open_snapshot(path).copies[0].get_status() == CopyStatus.BORROWED
+
+    def test_reserved_copy_is_released_on_open(self, populated_library, tmp_path):
+        path = tmp_path / "library.snap"
+        teacher = populated_library.readers[1]
+        teacher.reduce_penalty(teacher.get_penalty_days())
+        populated_library.place_hold(teacher, "Software Engineering", 2015)
+        assert populated_library.copies[1].get_status() == CopyStatus.RESERVED
+        populated_library.save_snapshot(path)
+
+        library = Library.open_snapshot(path)
+        assert library.copies[1].get_status() == CopyStatus.AVAILABLE
+        assert library.find_available_copy("Software Engineering", 2015).get_id() == "C002"
+
+    def test_copies_added_after_open(self, populated_library, tmp_path):
+        path = tmp_path / "library.snap"
+        populated_library.save_snapshot(path)
+
+        library = Library.open_snapshot(path)
+        book = library.books[0]
+        library.add_copy(BookCopy("C006", book))
+        assert len(library.copies) == 6
+        assert library.copies[5].get_book() is book
+        assert library.count_copies_by_author("Somerville") == 5
+        assert library.count_available("Software Engineering", 2015) == 2
+
+    def test_indexes_load_per_key(self, populated_library, tmp_path):
+        path = tmp_path / "library.snap"
+        populated_library.save_snapshot(path)
+
+        library = Library.open_snapshot(path)
+        assert library.count_copies_by_author("SOMERVILLE") == 4
+        assert list(dict.keys(library._copies_by_author)) == ["somerville"]
+        # Un cambio de estado sobre un (título, año) sin cargar se ve al cargarlo.
+        library.copies[1].set_status(CopyStatus.IN_REPAIR)
+        assert library.find_available_copy("Software Engineering", 2015) is None
+        library.copies[3].set_status(CopyStatus.AVAILABLE)
+        assert library.find_available_copy("software engineering", 2014).get_id() == "C004"
+        assert library.count_available("Ingeniería de Software", 2020) == 1
+        assert library.count_copies_by_author("Nadie") == 0
+
+    def test_reader_registry_after_open(self, populated_library, tmp_path):
+        path = tmp_path / "library.snap"
+        populated_library.save_snapshot(path)
+
+        library = Library.open_snapshot(path)
+        teacher = library.get_reader("profesor@uni.edu")
+        assert teacher is library.readers[1]
+        with pytest.raises(ValueError):
+            library.register_reader(Reader("Otro", "estudiante@uni.edu"))
+        library.register_reader(Reader("Nuevo", "nuevo@uni.edu"))
+        assert library.get_reader("nuevo@uni.edu") is library.readers[2]
+        assert library.get_borrower(library.copies[0]) is library.get_reader("estudiante@uni.edu")
+
+    def test_loan_due_dates_survive_snapshot(self, tmp_path):
+        day = Library.DAY_SECONDS
+        library = Library()
+        library.clock = lambda: 5000.0
+        book = Book("Software Engineering", 2020, Author("Somerville", "1950-01-01"))
+        for i in range(2):
+            library.add_copy(BookCopy(f"C00{i}", book))
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        library.borrow_book(reader, library.copies[0])
+        due = library.get_loan_due(library.copies[0])
+        library.process_overdue(due + 1.5 * day)
+        path = tmp_path / "loans.snap"
+        library.save_snapshot(path)
+
+        restored = Library.open_snapshot(path)
+        assert restored.get_loan_due(restored.copies[0]) == due
+        assert restored.get_loan_due(restored.copies[1]) is None
+        restored.process_overdue(due + 2.5 * day)
+        assert restored.readers[0].get_penalty_days() == 2 * Reader.PENALTY_MULTIPLIER
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "not_a_snapshot.bin"
+        path.write_bytes(b"\0" * 64)
+
+        with pytest.raises(ValueError):
+            Library.open_snapshot(path)
@@ -0,0 +1,133 @@
+# test_library_stats.py
+import random
+
+import pytest
+import library_stats
+from library_system import Author, Book, BookCopy, Reader, Library, CopyStatus
+from library_stats import penalty_distribution
+
+
+@pytest.fixture(params=["stdlib", "numpy"])
+def backend(request, monkeypatch):
+    """Corre cada test con y sin NumPy."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(library_stats, "np", None)
+    return request.param
+
+
+def build_library(compact):
+    library = Library(compact=compact)
+    somerville = Author("Somerville", "1950-01-01")
+    pressman = Author("Pressman", "1940-05-12")
+    books = [Book("Software Engineering", 2015, somerville),
+             Book("Software Engineering", 2014, pressman),
+             Book("Ingeniería de Software", 2020, somerville)]
+    for i, book in enumerate([books[0], books[0], books[1], books[2], books[2]], start=1):
+        library.add_copy(BookCopy(f"C00{i}", book))
+    library.copies[1].set_status(CopyStatus.BORROWED)
+    library.copies[3].set_status(CopyStatus.DELAYED)
+    library.copies[4].set_status(CopyStatus.IN_REPAIR)
+    for name, days in [("Ana", 0), ("Beto", 3), ("Carla", 3), ("Dario", 10)]:
+        reader = Reader(name, f"{name.lower()}@uni.edu")
+        library.register_reader(reader)
+        reader.add_penalty(days)
+    return library
+
+
+def expected_counts(library, key):
+    """Conteos calculados copia por copia, para comparar."""
+    expected = {}
+    for copy in library.copies:
+        group = expected.setdefault(key(copy.get_book()), {s: 0 for s in CopyStatus})
+        group[copy.get_status()] += 1
+    return expected
+
+
+class TestInventoryReport:
+    """Tests para Library.stats()."""
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_group_by_counts(self, backend, compact):
+        library = build_library(compact)
+        report = library.stats()
+
+        assert report["copies"] == 5
+        assert report["books"] == 3
+        assert report["by_status"][CopyStatus.AVAILABLE] == 2
+        assert report["by_status"][CopyStatus.RESERVED] == 0
+        assert report["utilization"] == pytest.approx(2 / 5)
+        assert report["by_author"].get("Somerville") == \
+            {CopyStatus.AVAILABLE: 1, CopyStatus.BORROWED: 1, CopyStatus.RESERVED: 0,
+             CopyStatus.DELAYED: 1, CopyStatus.IN_REPAIR: 1}
+        assert report["by_author"].total("Pressman") == 1
+        assert report["by_year"].total(2020) == 2
+        assert report["by_title"].total("Software Engineering") == 3
+        assert report["by_title"].utilization("Software Engineering") == pytest.approx(1 / 3)
+        assert report["by_title"].top(1) == [("Software Engineering", 3)]
+        assert report["by_author"].get("Unknown")[CopyStatus.AVAILABLE] == 0
+
+    def test_groups_are_found_by_normalized_key(self, backend):
+        report = build_library(True).stats()
+        assert report["by_author"].get("SOMERVILLE") == report["by_author"].get("Somerville")
+        assert report["by_author"].total("pressman") == 1
+        assert report["by_title"].utilization("software ENGINEERING") == pytest.approx(1 / 3)
+
+    def test_penalty_distribution(self, backend):
+        penalties = build_library(False).stats()["penalties"]
+        assert penalties["readers"] == 4
+        assert penalties["with_penalty"] == 3
+        assert penalties["total_days"] == 16 * Reader.PENALTY_MULTIPLIER
+        assert penalties["max_days"] == 10 * Reader.PENALTY_MULTIPLIER
+        assert penalties["percentiles"][50] == 3 * Reader.PENALTY_MULTIPLIER
+        assert penalties["histogram"] == {0: 1, 3 * Reader.PENALTY_MULTIPLIER: 2,
+                                          10 * Reader.PENALTY_MULTIPLIER: 1}
+
+    def test_empty_library(self, backend):
+        report = Library().stats()
+        assert report["copies"] == 0
+        assert report["utilization"] == 0.0
+        assert len(report["by_author"]) == 0
+        assert penalty_distribution(iter(()))["mean_days"] == 0.0
+
+    @pytest.mark.parametrize("compact", [False, True])
+    def test_incremental_refresh(self, backend, compact):
+        library = build_library(compact)
+        library.stats()
+        reader = library.readers[0]
+        library.borrow_book(reader, library.copies[0])
+        library.add_copy(BookCopy("C006", Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))))
+        library.copies[5].set_status(CopyStatus.RESERVED)
+        report = library.stats()
+
+        assert report["copies"] == 6
+        assert report["by_status"][CopyStatus.AVAILABLE] == 1
+        assert report["by_status"][CopyStatus.BORROWED] == 2
+        assert report["by_author"].get("Fowler")[CopyStatus.RESERVED] == 1
+
+    def test_random_changes_match_recount(self, backend):
+        library = Library(compact=True)
+        rng = random.Random(5)
+        statuses = list(CopyStatus)
+        for step in range(4):
+            library.bulk_load([{"author": f"Author {rng.randrange(6)}", "birth_date": "",
+                                "title": f"Title {rng.randrange(9)}", "year": str(2000 + rng.randrange(4)),
+                                "copy_id": f"C{step}-{i}", "status": ""} for i in range(100)])
+            for _ in range(80):
+                library.copies[rng.randrange(len(library.copies))].set_status(rng.choice(statuses))
+            report = library.stats()
+            for name, key in [("by_author", lambda b: b.get_author().get_name()),
+                              ("by_title", lambda b: b.get_title()),
+                              ("by_year", lambda b: b.get_year())]:
+                for label, counts in expected_counts(library, key).items():
+                    assert report[name].get(label) == counts
+
+    def test_columns_export(self, backend):
+        library = build_library(True)
+        library.stats()
+        columns = library._stats.columns()
+        assert list(columns["status"]) == [0, 1, 0, 3, 4]
+        assert list(columns["book_id"]) == [0, 0, 1, 2, 2]
+        assert list(columns["author_id"]) == [0, 0, 1, 0, 0]
+        assert list(columns["year"]) == [2015, 2015, 2014, 2020, 2020]
@@ -0,0 +1,302 @@
+# test_library_storage.py
+import random
+
+import pytest
+from library_system import Author, Book, BookCopy, Reader, Library, CopyStatus
+from library_storage import SqliteLibrary
+
+
+def catalog_rows(count, seed=5):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        title = rng.randrange(30)
+        rows.append({"author": f"Author {title % 6}", "birth_date": "1950-01-01",
+                     "title": f"Title {title}", "year": str(2000 + title % 3),
+                     "copy_id": f"C{i:04d}", "status": rng.choice(["", "", "borrowed", "in_repair"])})
+    return rows
+
+
+@pytest.fixture
+def database(tmp_path):
+    return tmp_path / "library.db"
+
+
+@pytest.fixture
+def library(database):
+    library = Library.open_database(database, object_cache_size=8, commit_every=5)
+    yield library
+    library.close()
+
+
+class TestSqliteQueries:
+    """Las consultas sobre la base dan lo mismo que una Library en memoria."""
+
+    def test_same_results_as_memory_library(self, library):
+        rows = catalog_rows(300)
+        memory = Library()
+        memory.bulk_load(rows)
+        summary = library.bulk_load(rows, chunk_size=64)
+        assert summary["rows"] == 300
+        assert summary["books"] == len(memory.books)
+        assert len(library.copies) == 300
+        assert [b.get_full_info() for b in library.books] == [b.get_full_info() for b in memory.books]
+
+        for author in [f"author {i}" for i in range(7)]:
+            assert library.count_copies_by_author(author) == memory.count_copies_by_author(author)
+            assert [c.get_id() for c in library.find_copies_by_author(author)] == \
+                [c.get_id() for c in memory.find_copies_by_author(author)]
+            assert library.get_all_books_by_author(author) == memory.get_all_books_by_author(author)
+            assert library.list_copies_details(author) == memory.list_copies_details(author)
+        for title in range(31):
+            for year in (2000, 2001, 2002):
+                expected = memory.find_available_copy(f"Title {title}", year)
+                found = library.find_available_copy(f"TITLE {title}", year)
+                assert (found and found.get_id()) == (expected and expected.get_id())
+                assert library.count_available(f"Title {title}", year) == \
+                    memory.count_available(f"Title {title}", year)
+
+    def test_books_support_slices(self, library):
+        library.bulk_load(catalog_rows(100))
+        books = list(library.books)
+        assert library.books[:1] == books[:1]
+        assert library.books[2:9:3] == books[2:9:3]
+        assert library.books[-2:] == books[-2:]
+        assert library.books[5:2] == []
+
+    def test_bulk_load_commits_once_per_chunk(self, library):
+        commits = []
+        commit = library.copies.commit
+        library.copies.commit = lambda: commits.append(1) or commit()
+        library.bulk_load(catalog_rows(300), chunk_size=64)
+        assert len(commits) == 5
+
+    def test_pagination_matches_memory_library(self, library):
+        rows = catalog_rows(200)
+        memory = Library()
+        memory.bulk_load(rows)
+        library.bulk_load(rows)
+
+        for status in (None, CopyStatus.AVAILABLE):
+            pages, cursor = [], None
+            while True:
+                page, cursor = library.page_copies_by_author("Author 1", limit=7, cursor=cursor, status=status)
+                pages.extend(c.get_id() for c in page)
+                if cursor is None:
+                    break
+            assert pages == [c.get_id() for c in memory.iter_copies_by_author("Author 1", status=status)]
+        books, _ = library.page_books_by_author("author 2", limit=50, year=2002)
+        assert books == list(memory.iter_books_by_author("author 2", year=2002))
+
+    def test_status_changes_update_queries(self, library):
+        book = Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))
+        library.add_copy(BookCopy("C001", book))
+        library.add_copy(BookCopy("C002", book))
+        details = library.list_copies_details("Fowler")
+
+        library.find_available_copy("Refactoring", 2018).set_status(CopyStatus.IN_REPAIR)
+        assert library.find_available_copy("Refactoring", 2018).get_id() == "C002"
+        assert library.count_available("Refactoring", 2018) == 1
+        assert library.list_copies_details("Fowler") == details
+        assert library.stats()["by_status"][CopyStatus.IN_REPAIR] == 1
+
+    def test_search_covers_stored_books(self, library):
+        memory = Library()
+        for target in (memory, library):
+            target.bulk_load(catalog_rows(50))
+        library.add_copy(BookCopy("X1", Book("Domain Driven Design", 2003, Author("Evans", "1962-01-01"))))
+        assert library.search("domain")[0][0].get_title() == "Domain Driven Design"
+        assert library.search("autor", limit=50) == memory.search("autor", limit=50)
+
+
+class TestSqlitePersistence:
+    """Copias, lectores, préstamos y multas se recuperan al reabrir el archivo."""
+
+    def test_reopen_keeps_catalog_and_loans(self, database):
+        library = SqliteLibrary(database, commit_every=1000)
+        book = Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))
+        library.add_book(book)
+        library.add_copy(BookCopy("C001", book))
+        library.add_copy(BookCopy("C002", book))
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        copy = library.find_available_copy("Refactoring", 2018)
+        assert library.borrow_book(reader, copy)
+        due = library.get_loan_due(copy)
+        library.close()
+
+        reopened = Library.open_database(database)
+        reader = reopened.get_reader("estudiante@uni.edu")
+        assert [b.get_full_info() for b in reopened.books] == [book.get_full_info()]
+        assert [c.get_id() for c in reader.get_borrowed_books()] == ["C001"]
+        copy = reader.get_borrowed_books()[0]
+        assert copy.get_status() == CopyStatus.BORROWED
+        assert reopened.get_borrower(copy) is reader
+        assert reopened.get_loan_due(copy) == due
+
+        reopened.return_book(reader, copy)
+        assert reopened.count_available("Refactoring", 2018) == 2
+        reopened.close()
+        assert Library.open_database(database).get_reader("estudiante@uni.edu").get_borrowed_books() == []
+
+    def test_loan_of_added_copy_is_saved(self, database):
+        library = SqliteLibrary(database)
+        copy = BookCopy("C001", Book("Refactoring", 2018, Author("Fowler", "1963-12-18")))
+        library.add_copy(copy)
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        assert library.borrow_book(reader, copy)
+        library.close()
+
+        reopened = SqliteLibrary(database)
+        reader = reopened.get_reader("estudiante@uni.edu")
+        assert [c.get_id() for c in reader.get_borrowed_books()] == ["C001"]
+        assert reopened.get_borrower(reopened.copies[0]) is reader
+        reopened.close()
+
+    def test_overdue_charges_are_not_repeated(self, database):
+        library = SqliteLibrary(database)
+        library.clock = lambda: 0.0
+        library.add_copy(BookCopy("C001", Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))))
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        library.borrow_book(reader, library.copies[0])
+        late = (Library.MAX_LOAN_DAYS + 2) * Library.DAY_SECONDS
+        assert library.process_overdue(late) == [library.copies[0]]
+        assert reader.get_penalty_days() == 4
+        library.close()
+
+        reopened = SqliteLibrary(database)
+        reader = reopened.get_reader("estudiante@uni.edu")
+        assert reader.get_penalty_days() == 4
+        assert reopened.copies[0].get_status() == CopyStatus.DELAYED
+        assert reopened.process_overdue(late) == []
+        assert reader.get_penalty_days() == 4
+        reopened.close()
+
+    def test_only_new_charges_are_written(self, library):
+        library.clock = lambda: 0.0
+        library.add_copy(BookCopy("C001", Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))))
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        library.borrow_book(reader, library.copies[0])
+        late = (Library.MAX_LOAN_DAYS + 2) * Library.DAY_SECONDS
+        library.process_overdue(late)
+
+        writes = []
+        write = library.copies._write
+        library.copies._write = lambda sql, params=(): writes.append(sql) or write(sql, params)
+        library.process_overdue(late + 60)
+        assert writes == []
+
+    def test_borrow_order_survives_sessions(self, database):
+        library = SqliteLibrary(database)
+        library.clock = lambda: 0.0
+        book = Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))
+        for i in range(3):
+            library.add_copy(BookCopy(f"S{i}", book))
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        library.borrow_book(reader, library.copies[0])
+        for day in range(40):
+            library.process_overdue(day * Library.DAY_SECONDS)
+        reader.reduce_penalty(reader.get_penalty_days())
+        library.borrow_book(reader, library.copies[1])
+        library.close()
+
+        library = SqliteLibrary(database)
+        library.borrow_book(library.get_reader("estudiante@uni.edu"), library.copies[2])
+        library.close()
+        reopened = SqliteLibrary(database)
+        assert [c.get_id() for c in reopened.get_reader("estudiante@uni.edu").get_borrowed_books()] == \
+            ["S0", "S1", "S2"]
+        reopened.close()
+
+    def test_rolled_back_return_keeps_stored_loans(self, database):
+        library = SqliteLibrary(database)
+        library.clock = lambda: 0.0
+        book = Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))
+        for i in range(2):
+            library.add_copy(BookCopy(f"S{i}", book))
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        copies = [library.copies[0], library.copies[1]]
+        library.borrow_many(reader, copies)
+        due = library.get_loan_due(copies[0])
+        library.process_overdue(due + 2 * Library.DAY_SECONDS)
+
+        def failing_listener(copy, previous):
+            if copy.get_status() == CopyStatus.AVAILABLE:
+                raise RuntimeError("fallo al registrar")
+
+        copies[1].add_status_listener(failing_listener)
+        with pytest.raises(RuntimeError):
+            library.return_many(reader, copies)
+        penalty = reader.get_penalty_days()
+        library.close()
+
+        reopened = SqliteLibrary(database)
+        reader = reopened.get_reader("estudiante@uni.edu")
+        assert [c.get_id() for c in reader.get_borrowed_books()] == ["S0", "S1"]
+        assert reopened.get_loan_due(reopened.copies[0]) == due
+        reopened.process_overdue(due + 2 * Library.DAY_SECONDS)
+        assert reader.get_penalty_days() == penalty
+        reopened.close()
+
+    def test_duplicate_reader_is_rejected(self, library):
+        library.register_reader(Reader("Uno", "uno@uni.edu"))
+        with pytest.raises(ValueError):
+            library.register_reader(Reader("Otro", "uno@uni.edu"))
+        assert len(library.readers) == 1
+
+    def test_holds_work_on_stored_copies(self, library):
+        library.add_copy(BookCopy("C001", Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))))
+        first, second = Reader("Uno", "uno@uni.edu"), Reader("Dos", "dos@uni.edu")
+        library.register_reader(first)
+        library.register_reader(second)
+        copy = library.find_available_copy("Refactoring", 2018)
+        library.borrow_book(first, copy)
+        assert library.place_hold(second, "Refactoring", 2018)
+
+        library.return_book(first, copy)
+        assert copy.get_status() == CopyStatus.RESERVED
+        assert library.find_available_copy("Refactoring", 2018) is None
+        assert library.borrow_book(second, copy)
+
+    def test_reserved_copy_is_released_on_reopen(self, database):
+        library = SqliteLibrary(database)
+        library.add_copy(BookCopy("C001", Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))))
+        first, second = Reader("Uno", "uno@uni.edu"), Reader("Dos", "dos@uni.edu")
+        library.register_reader(first)
+        library.register_reader(second)
+        library.borrow_book(first, library.copies[0])
+        library.place_hold(second, "Refactoring", 2018)
+        library.return_book(first, library.copies[0])
+        assert library.copies[0].get_status() == CopyStatus.RESERVED
+        library.close()
+
+        reopened = SqliteLibrary(database)
+        assert reopened.copies[0].get_status() == CopyStatus.AVAILABLE
+        assert reopened.count_available("Refactoring", 2018) == 1
+        reopened.close()
+
+    def test_reconcile_corrections_are_saved(self, database):
+        library = SqliteLibrary(database)
+        book = Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))
+        for i in range(3):
+            library.add_copy(BookCopy(f"C{i:03d}", book))
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        library.borrow_book(reader, library.copies[0])
+
+        report = library.reconcile(iter(["C000", "C001", "X"]), missing_status=CopyStatus.IN_REPAIR,
+                                   found_status=CopyStatus.AVAILABLE)
+        assert (report["missing"], report["on_shelf_while_loaned"], report["unknown"]) == \
+            (["C002"], ["C000"], ["X"])
+        library.close()
+
+        reopened = SqliteLibrary(database)
+        assert [c.get_status() for c in reopened.copies] == \
+            [CopyStatus.AVAILABLE, CopyStatus.AVAILABLE, CopyStatus.IN_REPAIR]
+        assert reopened.get_reader("estudiante@uni.edu").get_borrowed_books() == []
+        reopened.close()
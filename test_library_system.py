@@ -1,7 +1,14 @@
 # test_library_system.py
+import gc
+import pickle
+import random
+import threading
+import weakref
+
 import pytest
 from library_system import (
-    Author, Book, BookCopy, Reader, BioAlert, Library, CopyStatus
+    Author, Book, BookCopy, Reader, BioAlert, Library, CopyStatus,
+    CompactCopyStore, BatchResult
 )
 
 
@@ -12,6 +19,20 @@ class TestAuthor:
         author = Author("Somerville", "1950-01-01")
         assert author.get_name() == "Somerville"
         assert author.get_birth_date() == "1950-01-01"
+    
+    def test_equal_authors_share_instance(self):
+        author = Author("Somerville", "1950-01-01")
+        assert Author("Somerville", "1950-01-01") is author
+        assert Author("Somerville", "1951-01-01") is not author
+        assert author.key == "somerville"
+        assert pickle.loads(pickle.dumps(author)) is author
+    
+    def test_unused_authors_are_released(self):
+        author = Author("Temporary Author", "2000-01-01")
+        reference = weakref.ref(author)
+        del author
+        gc.collect()
+        assert reference() is None
 
 
 class TestBook:
@@ -31,6 +52,24 @@ class TestBook:
         
         expected = "Software Engineering (2020) - Somerville"
         assert book.get_full_info() == expected
+    
+    def test_equal_books_share_instance(self):
+        book = Book("Straße", 2020, Author("Somerville", "1950-01-01"))
+        assert Book("Straße", 2020, Author("Somerville", "1950-01-01")) is book
+        assert Book("Straße", 2021, Author("Somerville", "1950-01-01")) is not book
+        assert book.title_key == ("strasse", 2020)
+        assert pickle.loads(pickle.dumps([book, book.get_author()])) == [book, book.get_author()]
+    
+    def test_library_keeps_one_entry_per_book(self):
+        library = Library()
+        for i in range(5):
+            book = Book("Straße", 2020, Author("Somerville", "1950-01-01"))
+            library.add_book(book)
+            library.add_copy(BookCopy(f"C00{i}", book))
+        
+        assert library.books == [book]
+        assert library.get_all_books_by_author("SOMERVILLE") == [book]
+        assert library.count_available("STRASSE", 2020) == 5
 
 
 class TestBookCopy:
@@ -63,6 +102,18 @@ class TestBookCopy:
             copy.set_status(status)
             assert copy.get_status() == status
 
+    def test_status_listener_called_on_transition(self):
+        author = Author("Somerville", "1950-01-01")
+        copy = BookCopy("C001", Book("Software Engineering", 2020, author))
+        changes = []
+        copy.add_status_listener(lambda c, previous: changes.append((previous, c.get_status())))
+
+        copy.set_status(CopyStatus.BORROWED)
+        copy.set_status(CopyStatus.BORROWED)  # Sin cambio, no notifica
+        copy.set_status(CopyStatus.AVAILABLE)
+        assert changes == [(CopyStatus.AVAILABLE, CopyStatus.BORROWED),
+                           (CopyStatus.BORROWED, CopyStatus.AVAILABLE)]
+
 
 class TestReader:
     """Tests para la clase Reader."""
@@ -124,6 +175,21 @@ class TestReader:
         assert len(reader.get_borrowed_books()) == 0
         assert copy.get_status() == CopyStatus.AVAILABLE
     
+    def test_borrowed_books_keep_order(self):
+        reader = Reader("John Doe", "john@example.com")
+        book = Book("Software Engineering", 2020, Author("Somerville", "1950-01-01"))
+        copies = [BookCopy(f"C00{i}", book) for i in range(1, 4)]
+        for copy in copies:
+            reader.borrow_book(copy)
+        reader.return_book(copies[1])
+        reader.borrow_book(copies[1])
+
+        assert reader.get_borrowed_books() == [copies[0], copies[2], copies[1]]
+        assert reader.has_borrowed(copies[2]) is True
+        assert reader.borrowed_count() == 3
+        reader.return_book(copies[2])
+        assert reader.has_borrowed(copies[2]) is False
+    
     def test_penalty_calculation(self):
         reader = Reader("John Doe", "john@example.com")
         reader.add_penalty(3)  # 3 días de retraso = 6 días de multa
@@ -175,6 +241,49 @@ class TestBioAlert:
         assert "test@example.com" in captured.out
         assert "Test Book" in captured.out
 
+    def test_subscribe_keeps_order_without_duplicates(self):
+        bio_alert = BioAlert.get_instance()
+        bio_alert.subscribe_many("Ordered Book", ["b@example.com", "a@example.com", "b@example.com"])
+        bio_alert.subscribe("Ordered Book", "a@example.com")
+
+        assert bio_alert.get_subscribers("Ordered Book") == ["b@example.com", "a@example.com"]
+
+    def test_unsubscribe(self):
+        bio_alert = BioAlert.get_instance()
+        bio_alert.subscribe("Unsubscribe Book", "leaver@example.com")
+
+        assert bio_alert.unsubscribe("Unsubscribe Book", "leaver@example.com") is True
+        assert bio_alert.unsubscribe("Unsubscribe Book", "leaver@example.com") is False
+        assert not bio_alert.is_subscribed("Unsubscribe Book", "leaver@example.com")
+        assert bio_alert.get_subscribers("Unsubscribe Book") == []
+
+    def test_reverse_index_and_unsubscribe_all(self):
+        bio_alert = BioAlert.get_instance()
+        bio_alert.subscribe("Reverse Book 1", "fan@example.com")
+        bio_alert.subscribe("Reverse Book 2", "fan@example.com")
+        bio_alert.subscribe("Reverse Book 2", "other@example.com")
+
+        assert bio_alert.get_subscriptions("fan@example.com") == ["Reverse Book 1", "Reverse Book 2"]
+        assert bio_alert.unsubscribe_all("fan@example.com") == ["Reverse Book 1", "Reverse Book 2"]
+        assert bio_alert.get_subscriptions("fan@example.com") == []
+        assert bio_alert.get_subscribers("Reverse Book 2") == ["other@example.com"]
+
+    def test_stale_subscriptions_expire(self):
+        bio_alert = BioAlert.get_instance()
+        future = 4_000_000_000.0
+        bio_alert.set_subscription_ttl(60)
+        try:
+            bio_alert.subscribe("Expiring Book", "old@example.com", now=future)
+            bio_alert.subscribe("Expiring Book", "new@example.com", now=future + 50)
+            assert bio_alert.get_subscribers("Expiring Book") == ["old@example.com", "new@example.com"]
+
+            bio_alert.subscribe("Other Book", "late@example.com", now=future + 70)
+            assert bio_alert.get_subscribers("Expiring Book") == ["new@example.com"]
+            assert bio_alert.expire_stale(now=future + 200) == 2
+            assert bio_alert.get_subscriptions("late@example.com") == []
+        finally:
+            bio_alert.set_subscription_ttl(None)
+
 
 class TestLibrary:
     """Tests para la clase Library."""
@@ -205,6 +314,30 @@ class TestLibrary:
         assert len(library.readers) == 1
         assert library.readers[0] == reader
     
+    def test_reader_registry_by_email(self, setup_library):
+        library, _ = setup_library
+        reader = Reader("John Doe", "john@example.com")
+        library.register_reader(reader)
+        
+        assert library.get_reader("john@example.com") is reader
+        assert library.get_reader("jane@example.com") is None
+        with pytest.raises(ValueError):
+            library.register_reader(Reader("Otro John", "john@example.com"))
+        assert len(library.readers) == 1
+    
+    def test_get_borrower(self, setup_library):
+        library, somerville = setup_library
+        copy = BookCopy("C001", Book("Software Engineering", 2020, somerville))
+        library.add_copy(copy)
+        reader = Reader("John Doe", "john@example.com")
+        library.register_reader(reader)
+        
+        assert library.get_borrower(copy) is None
+        library.borrow_book(reader, copy)
+        assert library.get_borrower(copy) is reader
+        library.return_book(reader, copy)
+        assert library.get_borrower(copy) is None
+    
     def test_count_copies_by_author(self, setup_library):
         library, somerville = setup_library
         book1 = Book("Software Engineering", 2015, somerville)
@@ -324,6 +457,939 @@ class TestLibrary:
         assert "C001" in details[0]
         assert "C002" in details[1]
 
+    def test_author_indexes_keep_first_seen_order(self, setup_library):
+        library, somerville = setup_library
+        pressman = Author("Pressman", "1950-01-01")
+        book1 = Book("Software Engineering", 2015, somerville)
+        book2 = Book("Software Engineering", 2015, somerville)  # Igual a book1
+        book3 = Book("Requirements Engineering", 2018, somerville)
+        other = Book("Software Engineering", 2014, pressman)
+
+        library.add_copy(BookCopy("C001", book3))
+        library.add_copy(BookCopy("C002", other))
+        library.add_copy(BookCopy("C003", book1))
+        library.add_copy(BookCopy("C004", book2))
+
+        copies = library.find_copies_by_author("SOMERVILLE")
+        assert [c.get_id() for c in copies] == ["C001", "C003", "C004"]
+        assert library.get_all_books_by_author("somerville") == [book3, book1]
+        assert library.count_copies_by_author("Unknown") == 0
+        assert library.get_all_books_by_author("Unknown") == []
+
+    def test_find_available_copy_case_insensitive_title(self, setup_library):
+        library, somerville = setup_library
+        book = Book("Software Engineering", 2020, somerville)
+        library.add_copy(BookCopy("C001", Book("Software Engineering", 2015, somerville)))
+        library.add_copy(BookCopy("C002", book))
+
+        copy = library.find_available_copy("software ENGINEERING", 2020)
+        assert copy.get_id() == "C002"
+
+    def test_available_pool_follows_borrow_and_return(self, setup_library):
+        library, somerville = setup_library
+        book = Book("Software Engineering", 2020, somerville)
+        copies = [BookCopy(f"C00{i}", book) for i in range(1, 4)]
+        reader = Reader("John Doe", "john@example.com")
+        for copy in copies:
+            library.add_copy(copy)
+        assert library.count_available("Software Engineering", 2020) == 3
+
+        assert library.borrow_book(reader, library.find_available_copy("Software Engineering", 2020))
+        assert library.borrow_book(reader, library.find_available_copy("Software Engineering", 2020))
+        assert library.count_available("software engineering", 2020) == 1
+        assert library.find_available_copy("Software Engineering", 2020) is copies[2]
+
+        reader.return_book(copies[0])
+        assert library.count_available("Software Engineering", 2020) == 2
+        assert library.find_available_copy("Software Engineering", 2020) is copies[0]
+
+    def test_available_pool_ignores_non_available_statuses(self, setup_library):
+        library, somerville = setup_library
+        book = Book("Software Engineering", 2020, somerville)
+        copy = BookCopy("C001", book)
+        library.add_copy(copy)
+
+        for status in (CopyStatus.RESERVED, CopyStatus.DELAYED, CopyStatus.IN_REPAIR):
+            copy.set_status(status)
+            assert library.find_available_copy("Software Engineering", 2020) is None
+            assert library.count_available("Software Engineering", 2020) == 0
+        copy.set_status(CopyStatus.AVAILABLE)
+        assert library.find_available_copy("Software Engineering", 2020) is copy
+        assert library.count_available("Software Engineering", 1999) == 0
+
+
+class TestBulkLoad:
+    """Tests para la carga masiva de catálogo."""
+
+    CSV_ROWS = [
+        "author,birth_date,title,year,copy_id,status",
+        "Somerville,1950-01-01,Software Engineering,2015,C001,",
+        "Somerville,1950-01-01,Software Engineering,2015,C002,borrowed",
+        "Somerville,1950-01-01,Requirements Engineering,2018,C003,",
+        "Pressman,1940-01-01,Software Engineering,2015,C004,available",
+    ]
+
+    def test_bulk_load_csv_file(self, tmp_path):
+        path = tmp_path / "catalog.csv"
+        path.write_text("\n".join(self.CSV_ROWS) + "\n", encoding="utf-8")
+        library = Library()
+        progress = []
+
+        report = library.bulk_load(str(path), chunk_size=2,
+                                   progress=lambda rows, rate: progress.append(rows))
+
+        assert report["rows"] == 4
+        assert report["authors"] == 2
+        assert report["books"] == 3
+        assert report["rows_per_second"] > 0
+        assert progress == [2, 4]
+        assert len(library.books) == 3
+        assert library.count_copies_by_author("somerville") == 3
+        assert library.copies[1].get_status() == CopyStatus.BORROWED
+        assert library.copies[0].get_book() is library.copies[1].get_book()
+        assert library.find_available_copy("Software Engineering", 2015).get_id() == "C001"
+
+    def test_bulk_load_jsonl_iterator_reuses_existing_books(self):
+        library = Library()
+        somerville = Author("Somerville", "1950-01-01")
+        book = Book("Software Engineering", 2015, somerville)
+        library.add_book(book)
+        lines = iter([
+            '{"author": "Somerville", "birth_date": "1950-01-01", '
+            '"title": "Software Engineering", "year": 2015, "copy_id": "C001"}',
+            "",
+            '{"author": "Somerville", "birth_date": "1950-01-01", '
+            '"title": "Software Engineering", "year": 2015, "copy_id": "C002"}',
+        ])
+
+        report = library.bulk_load(lines, fmt="jsonl")
+
+        assert report["rows"] == 2
+        assert library.books == [book]
+        assert all(c.get_book() is book for c in library.copies)
+        library.copies[0].set_status(CopyStatus.BORROWED)
+        assert library.count_available("Software Engineering", 2015) == 1
+
+    def test_bulk_load_dict_rows_in_compact_mode(self):
+        library = Library(compact=True)
+        rows = [{"author": "Somerville", "birth_date": "1950-01-01",
+                 "title": "Software Engineering", "year": "2020", "copy_id": f"C00{i}"}
+                for i in range(1, 4)]
+
+        library.bulk_load(rows, chunk_size=1)
+
+        assert len(library.copies) == 3
+        assert library.count_available("Software Engineering", 2020) == 3
+        assert [b.get_year() for b in library.get_all_books_by_author("Somerville")] == [2020]
+
+    def test_bulk_load_rejects_unknown_format(self):
+        with pytest.raises(ValueError):
+            Library().bulk_load([], fmt="xml")
+
+
+class TestBatchCheckout:
+    """Tests para préstamos y devoluciones por lote."""
+
+    @pytest.fixture
+    def setup_batch(self):
+        library = Library()
+        somerville = Author("Somerville", "1950-01-01")
+        book = Book("Batch Engineering", 2020, somerville)
+        other = Book("Batch Requirements", 2018, somerville)
+        copies = [BookCopy(f"C00{i}", book) for i in range(1, 4)] + [BookCopy("C004", other)]
+        for copy in copies:
+            library.add_copy(copy)
+        reader = Reader("John Doe", "john@example.com")
+        library.register_reader(reader)
+        return library, reader, copies
+
+    def test_borrow_many_success(self, setup_batch):
+        library, reader, copies = setup_batch
+        results = library.borrow_many(reader, copies[:3])
+
+        assert results == [(copy, BatchResult.OK) for copy in copies[:3]]
+        assert reader.get_borrowed_books() == copies[:3]
+        assert library.count_available("Batch Engineering", 2020) == 0
+
+    def test_borrow_many_checks_limit_once(self, setup_batch):
+        library, reader, copies = setup_batch
+        results = library.borrow_many(reader, copies)
+
+        assert {result for _, result in results} == {BatchResult.LIMIT_REACHED}
+        assert reader.get_borrowed_books() == []
+
+    def test_borrow_many_with_penalty(self, setup_batch):
+        library, reader, copies = setup_batch
+        reader.add_penalty(1)
+
+        results = library.borrow_many(reader, copies[:1])
+        assert results == [(copies[0], BatchResult.PENALTY)]
+
+    def test_borrow_many_is_all_or_nothing(self, setup_batch):
+        library, reader, copies = setup_batch
+        copies[1].set_status(CopyStatus.IN_REPAIR)
+
+        results = library.borrow_many(reader, [copies[0], copies[1], copies[0]])
+        assert [result for _, result in results] == \
+            [BatchResult.ABORTED, BatchResult.UNAVAILABLE, BatchResult.DUPLICATE]
+        assert reader.get_borrowed_books() == []
+        assert copies[0].is_available()
+
+    def test_borrow_many_rolls_back_on_error(self, setup_batch):
+        library, reader, copies = setup_batch
+
+        def failing_listener(copy, previous):
+            if copy is copies[1] and copy.get_status() == CopyStatus.BORROWED:
+                raise RuntimeError("fallo al registrar")
+
+        copies[1].add_status_listener(failing_listener)
+        with pytest.raises(RuntimeError):
+            library.borrow_many(reader, copies[:2])
+        assert reader.get_borrowed_books() == []
+        assert copies[0].is_available() and copies[1].is_available()
+        assert library.count_available("Batch Engineering", 2020) == 3
+
+    def test_borrow_many_picks_up_own_reservation(self, setup_batch):
+        library, reader, copies = setup_batch
+        library.place_hold(reader, "Batch Requirements", 2018)
+        assert copies[3].get_status() == CopyStatus.RESERVED
+
+        results = library.borrow_many(reader, [copies[0], copies[3]])
+
+        assert {result for _, result in results} == {BatchResult.OK}
+        assert reader.get_borrowed_books() == [copies[0], copies[3]]
+        assert copies[3].get_status() == CopyStatus.BORROWED
+        assert library.get_reserved_copies(reader) == []
+
+    def test_borrow_many_rejects_reservation_of_another_reader(self, setup_batch):
+        library, reader, copies = setup_batch
+        other = Reader("Jane Roe", "jane@example.com")
+        library.register_reader(other)
+        library.place_hold(other, "Batch Requirements", 2018)
+
+        results = library.borrow_many(reader, [copies[0], copies[3]])
+        assert results == [(copies[0], BatchResult.ABORTED), (copies[3], BatchResult.UNAVAILABLE)]
+        assert library.get_reserved_copies(other) == [copies[3]]
+
+    def test_borrow_many_rollback_keeps_reservation(self, setup_batch):
+        library, reader, copies = setup_batch
+        library.place_hold(reader, "Batch Requirements", 2018)
+
+        def failing_listener(copy, previous):
+            if copy.get_status() == CopyStatus.BORROWED:
+                raise RuntimeError("fallo al registrar")
+
+        copies[0].add_status_listener(failing_listener)
+        with pytest.raises(RuntimeError):
+            library.borrow_many(reader, [copies[3], copies[0]])
+
+        assert reader.get_borrowed_books() == []
+        assert copies[3].get_status() == CopyStatus.RESERVED
+        assert library.get_reserved_copies(reader) == [copies[3]]
+        assert library.borrow_book(reader, copies[3])
+
+    def test_return_many_rollback_keeps_the_same_loans(self, setup_batch):
+        library, reader, copies = setup_batch
+        day = Library.DAY_SECONDS
+        library.clock = lambda: 1000.0
+        library.borrow_many(reader, copies[:2])
+        due = library.get_loan_due(copies[0])
+        library.process_overdue(due + 2 * day)
+        penalty = reader.get_penalty_days()
+
+        def failing_listener(copy, previous):
+            if copy.get_status() == CopyStatus.AVAILABLE:
+                raise RuntimeError("fallo al registrar")
+
+        copies[1].add_status_listener(failing_listener)
+        with pytest.raises(RuntimeError):
+            library.return_many(reader, copies[:2])
+
+        assert reader.get_borrowed_books() == copies[:2]
+        assert [copy.get_status() for copy in copies[:2]] == [CopyStatus.DELAYED] * 2
+        assert [library.get_loan_due(copy) for copy in copies[:2]] == [due, due]
+        # Los días ya cobrados siguen cobrados: solo suma el día nuevo.
+        library.process_overdue(due + 3 * day)
+        assert reader.get_penalty_days() == penalty + 2 * Reader.PENALTY_MULTIPLIER
+
+    def test_return_many_rollback_undoes_hand_off(self, setup_batch):
+        library, reader, copies = setup_batch
+        waiting = Reader("Jane Roe", "jane@example.com")
+        library.register_reader(waiting)
+        library.borrow_many(reader, copies[:3])
+        library.place_hold(waiting, "Batch Engineering", 2020)
+
+        def failing_listener(copy, previous):
+            if copy.get_status() == CopyStatus.AVAILABLE:
+                raise RuntimeError("fallo al registrar")
+
+        copies[1].add_status_listener(failing_listener)
+        with pytest.raises(RuntimeError):
+            library.return_many(reader, copies[:2])
+
+        assert reader.get_borrowed_books() == copies[:3]
+        assert copies[0].get_status() == CopyStatus.BORROWED
+        assert library.get_reserved_copies(waiting) == []
+        assert library.hold_position(waiting, "Batch Engineering", 2020) == 0
+
+    def test_return_many_notifies_each_title_once(self, setup_batch, capsys):
+        library, reader, copies = setup_batch
+        library.borrow_many(reader, [copies[0], copies[1], copies[3]])
+        library.subscribe_to_book("Batch Engineering", "waiting@example.com")
+        library.subscribe_to_book("Batch Requirements", "waiting@example.com")
+
+        results = library.return_many(reader, [copies[0], copies[1], copies[3]])
+
+        assert {result for _, result in results} == {BatchResult.OK}
+        assert reader.get_borrowed_books() == []
+        output = capsys.readouterr().out
+        assert output.count("'Batch Engineering' is now available") == 1
+        assert output.count("'Batch Requirements' is now available") == 1
+
+    def test_return_many_rejects_copies_not_borrowed(self, setup_batch):
+        library, reader, copies = setup_batch
+        library.borrow_book(reader, copies[0])
+
+        results = library.return_many(reader, [copies[0], copies[1]])
+        assert results == [(copies[0], BatchResult.ABORTED), (copies[1], BatchResult.NOT_BORROWED)]
+        assert reader.get_borrowed_books() == [copies[0]]
+
+
+class TestOverdueLoans:
+    """Tests para los vencimientos de préstamos y las multas automáticas."""
+
+    DAY = Library.DAY_SECONDS
+
+    @pytest.fixture
+    def setup_loans(self):
+        library = Library()
+        library.clock = lambda: 1_000_000.0
+        book = Book("Software Engineering", 2020, Author("Somerville", "1950-01-01"))
+        copies = [BookCopy(f"C00{i}", book) for i in range(1, 4)]
+        for copy in copies:
+            library.add_copy(copy)
+        reader = Reader("John Doe", "john@example.com")
+        library.register_reader(reader)
+        return library, reader, copies
+
+    def test_borrow_sets_due_date(self, setup_loans):
+        library, reader, copies = setup_loans
+        library.borrow_book(reader, copies[0])
+
+        assert library.get_loan_due(copies[0]) == 1_000_000.0 + Library.MAX_LOAN_DAYS * self.DAY
+        assert library.get_loan_due(copies[1]) is None
+        reader.return_book(copies[0])
+        assert library.get_loan_due(copies[0]) is None
+
+    def test_process_overdue_flips_and_charges_incrementally(self, setup_loans):
+        library, reader, copies = setup_loans
+        library.borrow_book(reader, copies[0])
+        due = library.get_loan_due(copies[0])
+
+        assert library.process_overdue(due - 1) == []
+        assert library.process_overdue(due) == [copies[0]]
+        assert copies[0].get_status() == CopyStatus.DELAYED
+        assert reader.get_penalty_days() == 0
+
+        library.process_overdue(due + self.DAY)
+        assert reader.get_penalty_days() == 1 * Reader.PENALTY_MULTIPLIER
+        library.process_overdue(due + 3.5 * self.DAY)
+        library.process_overdue(due + 3.5 * self.DAY)
+        assert reader.get_penalty_days() == 3 * Reader.PENALTY_MULTIPLIER
+
+    def test_returned_loans_are_skipped(self, setup_loans):
+        library, reader, copies = setup_loans
+        library.borrow_book(reader, copies[0])
+        library.borrow_book(reader, copies[1])
+        due = library.get_loan_due(copies[0])
+        reader.return_book(copies[0])
+
+        assert library.process_overdue(due + 2 * self.DAY) == [copies[1]]
+        assert copies[0].get_status() == CopyStatus.AVAILABLE
+        assert reader.get_penalty_days() == 2 * Reader.PENALTY_MULTIPLIER
+
+        reader.return_book(copies[1])
+        assert copies[1].get_status() == CopyStatus.AVAILABLE
+        library.process_overdue(due + 10 * self.DAY)
+        assert reader.get_penalty_days() == 2 * Reader.PENALTY_MULTIPLIER
+
+    def test_only_expired_loans_are_touched(self, setup_loans):
+        library, _, _ = setup_loans
+        book = Book("Bulk Loans", 2020, Author("Somerville", "1950-01-01"))
+        readers = []
+        for i in range(30):
+            copy = BookCopy(f"L{i:03d}", book)
+            library.add_copy(copy)
+            reader = Reader(f"Reader {i}", f"reader{i}@example.com")
+            library.register_reader(reader)
+            library.clock = lambda i=i: 1_000_000.0 + i * self.DAY
+            library.borrow_book(reader, copy)
+            readers.append(reader)
+
+        first_due = 1_000_000.0 + Library.MAX_LOAN_DAYS * self.DAY
+        delayed = library.process_overdue(first_due + 4.5 * self.DAY)
+        assert [c.get_id() for c in delayed] == ["L000", "L001", "L002", "L003", "L004"]
+        assert [r.get_penalty_days() for r in readers[:6]] == [8, 6, 4, 2, 0, 0]
+
+
+class TestHoldQueues:
+    """Tests para las colas de reserva con CopyStatus.RESERVED."""
+
+    DAY = Library.DAY_SECONDS
+
+    @pytest.fixture
+    def setup_holds(self):
+        library = Library()
+        library.clock = lambda: 1_000_000.0
+        book = Book("Bestseller", 2024, Author("Popular", "1970-01-01"))
+        copy = BookCopy("C001", book)
+        library.add_copy(copy)
+        readers = [Reader(f"Reader {i}", f"reader{i}@example.com") for i in range(4)]
+        for reader in readers:
+            library.register_reader(reader)
+        library.borrow_book(readers[0], copy)
+        return library, readers, copy
+
+    def test_return_reserves_for_head_of_queue(self, setup_holds, capsys):
+        library, readers, copy = setup_holds
+        assert library.place_hold(readers[1], "Bestseller", 2024) is True
+        assert library.place_hold(readers[2], "bestseller", 2024) is True
+        assert library.place_hold(readers[1], "Bestseller", 2024) is False
+        assert library.hold_position(readers[2], "Bestseller", 2024) == 1
+        library.subscribe_to_book("Bestseller", "subscriber@example.com")
+        capsys.readouterr()
+
+        readers[0].return_book(copy)
+
+        assert copy.get_status() == CopyStatus.RESERVED
+        assert library.get_reserved_copies(readers[1]) == [copy]
+        assert library.find_available_copy("Bestseller", 2024) is None
+        output = capsys.readouterr().out
+        assert "reader1@example.com" in output
+        assert "reader2@example.com" not in output
+        assert "subscriber@example.com" not in output
+        assert library.hold_position(readers[2], "Bestseller", 2024) == 0
+
+    def test_only_holder_can_borrow_reserved_copy(self, setup_holds):
+        library, readers, copy = setup_holds
+        library.place_hold(readers[1], "Bestseller", 2024)
+        readers[0].return_book(copy)
+
+        assert library.borrow_book(readers[2], copy) is False
+        assert library.borrow_book(readers[1], copy) is True
+        assert copy.get_status() == CopyStatus.BORROWED
+        assert library.get_reserved_copies(readers[1]) == []
+
+    def test_skips_readers_with_penalty_or_at_limit(self, setup_holds):
+        library, readers, copy = setup_holds
+        readers[1].add_penalty(2)
+        for i in range(Reader.MAX_BORROWED_BOOKS):
+            other = BookCopy(f"X{i}", Book(f"Other {i}", 2000, Author("Otro", "")))
+            library.add_copy(other)
+            library.borrow_book(readers[2], other)
+        for reader in readers[1:]:
+            library.place_hold(reader, "Bestseller", 2024)
+
+        readers[0].return_book(copy)
+
+        assert library.get_reserved_copies(readers[3]) == [copy]
+        # Los salteados conservan su lugar en la cola.
+        assert library.hold_position(readers[1], "Bestseller", 2024) == 0
+        assert library.hold_position(readers[2], "Bestseller", 2024) == 1
+
+    def test_expired_hold_passes_to_next_reader(self, setup_holds):
+        library, readers, copy = setup_holds
+        library.place_hold(readers[1], "Bestseller", 2024)
+        library.place_hold(readers[2], "Bestseller", 2024)
+        readers[0].return_book(copy)
+        expires = 1_000_000.0 + Library.HOLD_DAYS * self.DAY
+
+        assert library.process_expired_holds(expires - 1) == []
+        assert library.process_expired_holds(expires) == [copy]
+        assert library.get_reserved_copies(readers[2]) == [copy]
+        # El reloj de la biblioteca no avanzó: la segunda reserva vence igual.
+        assert library.process_expired_holds(expires + self.DAY) == [copy]
+        assert copy.get_status() == CopyStatus.AVAILABLE
+        assert library.find_available_copy("Bestseller", 2024) is copy
+
+    def test_hold_on_available_copy_and_cancel(self, setup_holds):
+        library, readers, copy = setup_holds
+        readers[0].return_book(copy)
+        library.place_hold(readers[1], "Bestseller", 2024)
+        library.place_hold(readers[2], "Bestseller", 2024)
+        assert library.get_reserved_copies(readers[1]) == [copy]
+
+        assert library.cancel_hold(readers[1], "Bestseller", 2024) is True
+        assert library.get_reserved_copies(readers[2]) == [copy]
+        assert library.cancel_hold(readers[3], "Bestseller", 2024) is False
+        assert library.count_holds("Bestseller", 2024) == 0
+
+    def test_thousands_of_readers_in_order(self):
+        library = Library(compact=True)
+        book = Book("Bestseller", 2024, Author("Popular", "1970-01-01"))
+        library.add_copy(BookCopy("C001", book))
+        copy = library.copies[0]
+        owner = Reader("Owner", "owner@example.com")
+        library.register_reader(owner)
+        library.borrow_book(owner, copy)
+        readers = [Reader(f"Reader {i}", f"reader{i}@example.com") for i in range(5000)]
+        for reader in readers:
+            library.register_reader(reader)
+            library.place_hold(reader, "Bestseller", 2024)
+        for reader in readers[::2]:
+            library.cancel_hold(reader, "Bestseller", 2024)
+
+        holder = owner
+        served = []
+        for _ in range(50):
+            holder.return_book(copy)
+            holder = library._holds[copy].reader
+            served.append(holder)
+            library.borrow_book(holder, copy)
+        assert served == readers[1:100:2]
+        assert library.count_holds("Bestseller", 2024) == 2500 - 50
+
+
+class TestPagination:
+    """Tests para los listados por autor paginados con cursores."""
+
+    @pytest.fixture
+    def prolific(self):
+        library = Library(compact=True)
+        library.bulk_load([{"author": "Prolific", "birth_date": "1900-01-01",
+                            "title": f"Book {i % 10}", "year": str(2000 + i % 10),
+                            "copy_id": f"C{i:03d}", "status": "borrowed" if i % 3 == 0 else ""}
+                           for i in range(95)])
+        return library
+
+    def collect(self, page, **filters):
+        items, cursor = page("prolific", limit=20, **filters)
+        pages = [items]
+        while cursor is not None:
+            items, cursor = page("Prolific", limit=20, cursor=cursor, **filters)
+            pages.append(items)
+        return pages
+
+    def test_pages_cover_full_listing(self, prolific):
+        pages = self.collect(prolific.page_copies_by_author)
+        assert [len(page) for page in pages] == [20, 20, 20, 20, 15]
+        assert [c.get_id() for page in pages for c in page] == \
+            [c.get_id() for c in prolific.find_copies_by_author("Prolific")]
+
+        details = self.collect(prolific.page_copies_details)
+        assert [d for page in details for d in page] == prolific.list_copies_details("Prolific")
+
+    def test_filters_are_applied_while_scanning(self, prolific):
+        borrowed = self.collect(prolific.page_copies_by_author, status=CopyStatus.BORROWED)
+        assert [len(page) for page in borrowed] == [20, 12]
+        assert all(c.get_status() == CopyStatus.BORROWED for page in borrowed for c in page)
+
+        copies_2003 = list(prolific.iter_copies_by_author("Prolific", year=2003))
+        assert [c.get_id() for c in copies_2003] == [f"C{i:03d}" for i in range(3, 95, 10)]
+        assert [b.get_title() for b in prolific.iter_books_by_author("Prolific", year=2003)] == ["Book 3"]
+
+    def test_books_pages(self, prolific):
+        first, cursor = prolific.page_books_by_author("Prolific", limit=4)
+        second, cursor = prolific.page_books_by_author("Prolific", limit=4, cursor=cursor)
+        third, cursor = prolific.page_books_by_author("Prolific", limit=4, cursor=cursor)
+        assert first + second + third == prolific.get_all_books_by_author("Prolific")
+        assert len(third) == 2 and cursor is None
+
+    def test_cursor_survives_new_copies(self, prolific):
+        first, cursor = prolific.page_copies_by_author("Prolific", limit=90)
+        prolific.add_copy(BookCopy("C999", Book("Book 0", 2000, Author("Prolific", "1900-01-01"))))
+        rest, cursor = prolific.page_copies_by_author("Prolific", limit=90, cursor=cursor)
+        assert [c.get_id() for c in rest] == ["C090", "C091", "C092", "C093", "C094", "C999"]
+        assert cursor is None
+
+    def test_books_scan_survives_new_books(self, prolific):
+        books = prolific.iter_books_by_author("Prolific")
+        first = next(books)
+        prolific.add_copy(BookCopy("C999", Book("Book 10", 2010, Author("Prolific", "1900-01-01"))))
+        rest = list(books)
+        assert [first] + rest == prolific.get_all_books_by_author("Prolific")
+        assert rest[-1].get_title() == "Book 10"
+
+    def test_first_page_is_lazy(self, prolific):
+        details = prolific.iter_copies_details("Prolific")
+        assert next(details) == "Book 0 (2000) - Prolific - Copy C000"
+        assert prolific.page_copies_details("Nadie") == ([], None)
+
+    def test_rejects_foreign_cursor(self, prolific):
+        _, cursor = prolific.page_copies_by_author("Prolific", limit=5)
+        with pytest.raises(ValueError):
+            prolific.page_books_by_author("Prolific", cursor=cursor)
+        with pytest.raises(ValueError):
+            prolific.page_copies_by_author("Otro", cursor=cursor)
+        with pytest.raises(ValueError):
+            prolific.page_copies_by_author("Prolific", cursor="not a cursor")
+
+
+class TestReconcile:
+    """Tests para la conciliación del inventario contra los ids escaneados."""
+
+    @pytest.fixture(params=[(False, False), (True, False), (True, True)],
+                    ids=["objects", "compact", "concurrent"])
+    def stocktake(self, request):
+        compact, concurrent = request.param
+        library = Library(compact=compact, concurrent=concurrent)
+        book = Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))
+        for i in range(6):
+            library.add_copy(BookCopy(f"C{i:03d}", book))
+        reader = Reader("Estudiante", "estudiante@uni.edu")
+        library.register_reader(reader)
+        library.borrow_book(reader, library.copies[0])
+        library.borrow_book(reader, library.copies[1])
+        library.copies[1].set_status(CopyStatus.DELAYED)
+        library.copies[2].set_status(CopyStatus.IN_REPAIR)
+        return library, reader
+
+    def test_categorized_report(self, stocktake):
+        library, _ = stocktake
+        # C000 está prestada pero en el estante; C004 y C005 no aparecieron.
+        report = library.reconcile(["C000", "C003", "C003", "X999", ""])
+
+        assert report["scanned"] == 4
+        assert report["matched"] == 2
+        assert report["missing"] == ["C004", "C005"]
+        assert report["on_shelf_while_loaned"] == ["C000"]
+        assert report["unknown"] == ["X999"]
+        assert report["duplicate_scans"] == {"C003": 2}
+        assert report["corrected"] == 0
+        assert library.copies[4].is_available()
+
+    def test_applies_corrections(self, stocktake):
+        library, reader = stocktake
+        report = library.reconcile(["C000", "C001", "C003"], missing_status=CopyStatus.IN_REPAIR,
+                                   found_status=CopyStatus.AVAILABLE)
+
+        assert report["corrected"] == 4
+        assert [c.get_status() for c in library.copies] == [
+            CopyStatus.AVAILABLE, CopyStatus.AVAILABLE, CopyStatus.IN_REPAIR,
+            CopyStatus.AVAILABLE, CopyStatus.IN_REPAIR, CopyStatus.IN_REPAIR]
+        assert reader.get_borrowed_books() == []
+        assert library.get_borrower(library.copies[0]) is None
+        assert library.count_available("Refactoring", 2018) == 3
+
+    def test_found_copy_goes_to_next_hold(self, stocktake):
+        library, reader = stocktake
+        waiting = Reader("Otro", "otro@uni.edu")
+        library.register_reader(waiting)
+        for copy in list(library.copies)[3:]:
+            copy.set_status(CopyStatus.IN_REPAIR)
+        library.place_hold(waiting, "Refactoring", 2018)
+
+        library.reconcile(["C000"], found_status=CopyStatus.AVAILABLE)
+        assert library.get_reserved_copies(waiting) == [library.copies[0]]
+
+    def test_found_copy_without_loan_goes_to_next_hold(self, stocktake):
+        library, _ = stocktake
+        waiting = Reader("Otro", "otro@uni.edu")
+        library.register_reader(waiting)
+        for copy in list(library.copies)[3:]:
+            copy.set_status(CopyStatus.IN_REPAIR)
+        library.copies[2].set_status(CopyStatus.BORROWED)
+        library.place_hold(waiting, "Refactoring", 2018)
+
+        library.reconcile(["C002"], found_status=CopyStatus.AVAILABLE)
+        assert library.copies[2].get_status() == CopyStatus.RESERVED
+        assert library.get_reserved_copies(waiting) == [library.copies[2]]
+
+    def test_found_copy_loan_is_closed_for_any_status(self, stocktake):
+        library, reader = stocktake
+        late = library.get_loan_due(library.copies[0]) + 5 * Library.DAY_SECONDS
+        report = library.reconcile(["C000", "C001"], found_status=CopyStatus.IN_REPAIR)
+
+        assert report["corrected"] == 2
+        assert [c.get_status() for c in list(library.copies)[:2]] == [CopyStatus.IN_REPAIR] * 2
+        assert reader.get_borrowed_books() == []
+        assert library.get_borrower(library.copies[0]) is None
+        assert library.process_overdue(late) == []
+        assert reader.get_penalty_days() == 0
+
+    def test_reads_scan_file(self, stocktake, tmp_path):
+        library, _ = stocktake
+        scans = tmp_path / "scans.txt"
+        scans.write_text("C000\nC001\n\nC003\nC004\nC005\n", encoding="utf-8")
+        report = library.reconcile(scans)
+        assert report["missing"] == []
+        assert report["on_shelf_while_loaned"] == ["C000", "C001"]
+        with open(scans, encoding="utf-8") as handle:
+            assert library.reconcile(handle)["matched"] == 5
+
+
+class TestCompactCopyStore:
+    """Tests para el modo de almacenamiento compacto de copias."""
+
+    @pytest.fixture
+    def setup_compact(self):
+        library = Library(compact=True)
+        somerville = Author("Somerville", "1950-01-01")
+        book_2015 = Book("Software Engineering", 2015, somerville)
+        book_2020 = Book("Software Engineering", 2020, somerville)
+        for i, book in enumerate([book_2015, book_2015, book_2020], start=1):
+            library.add_copy(BookCopy(f"C00{i}", book))
+        return library, book_2015, book_2020
+
+    def test_views_expose_book_copy_api(self, setup_compact):
+        library, book_2015, book_2020 = setup_compact
+        assert isinstance(library.copies, CompactCopyStore)
+        assert len(library.copies) == 3
+        assert [c.get_id() for c in library.copies] == ["C001", "C002", "C003"]
+        assert library.copies[-1].get_book() is book_2020
+        assert library.copies[0] == library.copies[0]
+        assert library.copies[0].is_available() is True
+        with pytest.raises(IndexError):
+            library.copies[3]
+
+    def test_statuses_stored_as_uint8(self, setup_compact):
+        library, _, _ = setup_compact
+        library.copies[1].set_status(CopyStatus.IN_REPAIR)
+        assert library.copies._statuses.typecode == "B"
+        assert library.copies[1].get_status() == CopyStatus.IN_REPAIR
+        assert len(library.copies._books) == 2
+
+    def test_queries_and_borrowing_work_on_views(self, setup_compact):
+        library, _, _ = setup_compact
+        reader = Reader("John Doe", "john@example.com")
+        assert library.count_copies_by_author("somerville") == 3
+        assert len(library.get_all_books_by_author("Somerville")) == 2
+
+        copy = library.find_available_copy("Software Engineering", 2015)
+        assert copy.get_id() == "C001"
+        assert library.borrow_book(reader, copy) is True
+        assert library.copies[0].get_status() == CopyStatus.BORROWED
+        assert library.find_available_copy("Software Engineering", 2015).get_id() == "C002"
+
+        reader.return_book(copy)
+        assert library.count_available("Software Engineering", 2015) == 2
+
+    def test_original_copy_changes_are_mirrored(self):
+        library = Library(compact=True)
+        copy = BookCopy("C001", Book("Software Engineering", 2020, Author("Somerville", "1950-01-01")))
+        library.add_copy(copy)
+
+        copy.set_status(CopyStatus.BORROWED)
+        assert library.copies[0].get_status() == CopyStatus.BORROWED
+        assert library.find_available_copy("Software Engineering", 2020) is None
+
+    def test_original_copy_reads_its_row(self):
+        library = Library(compact=True)
+        copy = BookCopy("C001", Book("Software Engineering", 2020, Author("Somerville", "1950-01-01")))
+        library.add_copy(copy)
+        first, second = Reader("Uno", "uno@example.com"), Reader("Dos", "dos@example.com")
+
+        assert library.borrow_book(first, library.copies[0]) is True
+        assert copy.get_status() == CopyStatus.BORROWED
+        assert library.borrow_book(second, copy) is False
+        assert copy == library.copies[0] and first.has_borrowed(copy)
+        library.return_book(first, copy)
+        assert library.copies[0].is_available()
+
+    def test_borrowed_copy_is_rejected(self):
+        copy = BookCopy("C001", Book("Software Engineering", 2020, Author("Somerville", "1950-01-01")))
+        reader = Reader("Uno", "uno@example.com")
+        reader.borrow_book(copy)
+        library = Library(compact=True)
+
+        with pytest.raises(ValueError):
+            library.add_copy(copy)
+        assert len(library.copies) == 0
+        reader.return_book(copy)
+        assert reader.get_borrowed_books() == [] and copy.is_available()
+
+    def test_copies_have_no_instance_dict(self, setup_compact):
+        library, book_2015, _ = setup_compact
+        assert not hasattr(library.copies[0], "__dict__")
+        assert not hasattr(BookCopy("C009", book_2015), "__dict__")
+
+
+class TestResultCache:
+    """Tests para la caché de consultas por autor."""
+
+    @pytest.fixture
+    def setup_cache(self):
+        library = Library(cache_size=4)
+        somerville = Author("Somerville", "1950-01-01")
+        book = Book("Software Engineering", 2020, somerville)
+        library.add_copy(BookCopy("C001", book))
+        library.add_copy(BookCopy("C002", Book("Refactoring", 2018, Author("Fowler", "1963-12-18"))))
+        return library, somerville, book
+
+    def test_repeated_calls_hit_cache(self, setup_cache):
+        library, _, _ = setup_cache
+        first = library.list_copies_details("Somerville")
+        second = library.list_copies_details("somerville")
+        assert first == second == ["Software Engineering (2020) - Somerville - Copy C001"]
+        assert library.get_all_books_by_author("Somerville") == \
+            library.get_all_books_by_author("Somerville")
+        stats = library.cache_stats()
+        assert (stats["hits"], stats["misses"]) == (2, 2)
+
+    def test_add_copy_invalidates_only_that_author(self, setup_cache):
+        library, somerville, book = setup_cache
+        library.list_copies_details("Somerville")
+        library.list_copies_details("Fowler")
+        library.add_copy(BookCopy("C003", Book("Ingeniería de Software", 2020, somerville)))
+
+        assert library.list_copies_details("Somerville")[-1] == \
+            "Ingeniería de Software (2020) - Somerville - Copy C003"
+        assert len(library.get_all_books_by_author("Somerville")) == 2
+        library.list_copies_details("Fowler")
+        assert library.cache_stats()["hits"] == 1
+
+    def test_status_change_and_add_book_invalidate(self, setup_cache):
+        library, somerville, _ = setup_cache
+        library.list_copies_details("Somerville")
+        library.copies[0].set_status(CopyStatus.BORROWED)
+        library.list_copies_details("Somerville")
+        library.add_book(Book("Ingeniería de Software", 2020, somerville))
+        library.list_copies_details("Somerville")
+        assert library.cache_stats()["hits"] == 0
+
+    def test_returned_lists_are_independent(self, setup_cache):
+        library, _, _ = setup_cache
+        library.list_copies_details("Somerville").append("basura")
+        library.get_all_books_by_author("Somerville").clear()
+        assert library.list_copies_details("Somerville") == \
+            ["Software Engineering (2020) - Somerville - Copy C001"]
+        assert len(library.get_all_books_by_author("Somerville")) == 1
+
+    def test_lru_eviction(self, setup_cache):
+        library, _, _ = setup_cache
+        for name in ("Somerville", "Fowler", "A", "B"):
+            library.list_copies_details(name)
+        library.list_copies_details("Somerville")
+        library.list_copies_details("C")
+        stats = library.cache_stats()
+        assert stats["evictions"] == 1
+        assert stats["entries"] == 4
+        library.list_copies_details("Fowler")
+        assert library.cache_stats()["misses"] == 6
+
+    def test_cached_results_match_uncached(self):
+        rows = [{"author": f"Author {i % 7}", "birth_date": "1950-01-01",
+                 "title": f"Title {i % 13}", "year": str(2000 + i % 3),
+                 "copy_id": f"C{i:04d}", "status": ""} for i in range(200)]
+        cached, uncached = Library(compact=True), Library(compact=True, cache_size=0)
+        rng = random.Random(3)
+        for start in range(0, 200, 50):
+            for library in (cached, uncached):
+                library.bulk_load(rows[start:start + 50])
+            for _ in range(30):
+                name = f"author {rng.randrange(8)}"
+                assert cached.list_copies_details(name) == uncached.list_copies_details(name)
+                assert [b.get_full_info() for b in cached.get_all_books_by_author(name)] == \
+                    [b.get_full_info() for b in uncached.get_all_books_by_author(name)]
+        assert cached.cache_stats()["hits"] > 0
+        assert uncached.cache_stats()["hits"] == 0
+
+
+class TestConcurrentCheckout:
+    """Tests de estrés para el modo concurrente de Library."""
+
+    THREADS = 8
+    OPERATIONS = 1500
+
+    def build(self, copies=30, readers=24):
+        library = Library(concurrent=True, lock_stripes=8)
+        somerville = Author("Somerville", "1950-01-01")
+        book = Book("Software Engineering", 2020, somerville)
+        for i in range(copies):
+            library.add_copy(BookCopy(f"C{i:03d}", book))
+        for i in range(readers):
+            library.register_reader(Reader(f"Reader {i}", f"reader{i}@example.com"))
+        return library
+
+    def run_threads(self, worker):
+        errors = []
+
+        def guarded(seed):
+            try:
+                worker(random.Random(seed))
+            except Exception as error:  # pragma: no cover - se reporta abajo
+                errors.append(error)
+
+        threads = [threading.Thread(target=guarded, args=(seed,)) for seed in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+    def assert_consistent(self, library):
+        owners = {}
+        for reader in library.readers:
+            assert len(reader.get_borrowed_books()) <= Reader.MAX_BORROWED_BOOKS
+            for copy in reader.get_borrowed_books():
+                assert copy not in owners, "la misma copia quedó prestada a dos lectores"
+                owners[copy] = reader
+        for copy in library.copies:
+            assert (copy.get_status() == CopyStatus.BORROWED) == (copy in owners)
+        available = sum(1 for copy in library.copies if copy.is_available())
+        assert library.count_available("Software Engineering", 2020) == available
+
+    def test_no_double_checkout_under_contention(self):
+        library = self.build()
+        results = []
+
+        def worker(rng):
+            for _ in range(self.OPERATIONS):
+                reader = rng.choice(library.readers)
+                copy = library.copies[rng.randrange(len(library.copies))]
+                if library.borrow_book(reader, copy):
+                    results.append(copy)
+
+        self.run_threads(worker)
+        assert len(results) == len(set(results))
+        assert len(results) == sum(len(r.get_borrowed_books()) for r in library.readers)
+        self.assert_consistent(library)
+
+    def test_mixed_borrow_and_return(self):
+        library = self.build(copies=12, readers=10)
+
+        def worker(rng):
+            for _ in range(self.OPERATIONS):
+                reader = rng.choice(library.readers)
+                borrowed = reader.get_borrowed_books()
+                if borrowed and rng.random() < 0.4:
+                    library.return_book(reader, rng.choice(borrowed))
+                else:
+                    copy = library.find_available_copy("Software Engineering", 2020)
+                    if copy is not None:
+                        library.borrow_book(reader, copy)
+
+        self.run_threads(worker)
+        self.assert_consistent(library)
+
+    def test_holds_under_contention(self):
+        library = self.build(copies=6, readers=12)
+
+        def worker(rng):
+            for _ in range(self.OPERATIONS):
+                reader = rng.choice(library.readers)
+                borrowed = reader.get_borrowed_books()
+                action = rng.random()
+                if borrowed and action < 0.3:
+                    library.return_book(reader, rng.choice(borrowed))
+                elif action < 0.45:
+                    library.place_hold(reader, "Software Engineering", 2020)
+                elif action < 0.55:
+                    library.cancel_hold(reader, "Software Engineering", 2020)
+                else:
+                    reserved = library.get_reserved_copies(reader)
+                    copy = reserved[0] if reserved else library.copies[rng.randrange(len(library.copies))]
+                    library.borrow_book(reader, copy)
+
+        self.run_threads(worker)
+        owners = {copy: reader for reader in library.readers for copy in reader.get_borrowed_books()}
+        assert len(owners) == sum(len(r.get_borrowed_books()) for r in library.readers)
+        for copy in library.copies:
+            assert (copy.get_status() == CopyStatus.BORROWED) == (copy in owners)
+            assert (copy.get_status() == CopyStatus.RESERVED) == (copy in library._holds)
+            if copy in library._holds:
+                assert copy in library.get_reserved_copies(library._holds[copy].reader)
+
 
 # Test de integración completo
 class TestIntegration: